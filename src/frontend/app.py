@@ -1,4 +1,5 @@
 import streamlit as st
+from typing import Optional
 import sys
 import os
 
@@ -7,6 +8,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from sections import (
     render_password_section,
+    render_passphrase_section,
     render_rsa_section,
     render_ssh_section,
     render_pgp_section,
@@ -15,6 +17,14 @@ from sections import (
     render_about_section
 )
 from styles import get_styles
+from services.rsa_service import RSAService
+from services.rsa_key_pool import RSAKeyPool
+from services.pgp_service import PGPService
+from services.gpg_worker_pool import GPGWorkerPool
+from services.gnupg_homes import sweep_stale_homedirs
+from services.kdf_policy import get_kdf_policy
+from services.csr_service import CSRService
+from services.private_key_cache import PrivateKeyCache
 
 def set_page_config():
     st.set_page_config(
@@ -24,8 +34,56 @@ def set_page_config():
         initial_sidebar_state="expanded"
     )
 
+@st.cache_resource
+def get_rsa_key_pool() -> RSAKeyPool:
+    # One pool per server process, shared by all sessions
+    pool = RSAKeyPool(
+        sizes=[(2048, 65537), (3072, 65537), (4096, 65537)],
+        low_watermark=1,
+        high_watermark=2
+    )
+    return pool.start()
+
+@st.cache_resource
+def get_gpg_worker_pool() -> GPGWorkerPool:
+    # Long-lived GnuPG workers shared by all sessions; clear out homedirs
+    # left behind by earlier server processes first
+    sweep_stale_homedirs()
+    return GPGWorkerPool(size=2, max_jobs=100)
+
+@st.cache_resource
+def get_private_key_cache() -> Optional[PrivateKeyCache]:
+    # Unlocked CSR signing keys, kept in this server process only. The cache
+    # is shared by every session, so it is a server setting, not a per-user one
+    if os.environ.get("KEYGEN_CSR_KEY_CACHE", "").strip().lower() not in ("1", "true", "yes", "on"):
+        return None
+    return PrivateKeyCache(max_entries=32, ttl=300)
+
+def render_settings_sidebar():
+    st.sidebar.markdown("### ⚙️ Settings")
+    # The policy is process-wide, so it is a server setting, not a per-user one
+    try:
+        target_ms = get_kdf_policy().target_ms
+    except ValueError as e:
+        st.sidebar.error(str(e))
+    else:
+        st.sidebar.caption(
+            f"Password-protected private keys use key derivation work factors calibrated to "
+            f"{target_ms:g} ms (set by the server's KEYGEN_KDF_TARGET_MS)."
+        )
+
+    cache = CSRService.key_cache
+    if cache is not None:
+        st.sidebar.caption("Unlocked CSR signing keys are cached in server memory for 5 minutes.")
+        if st.sidebar.button("🧹 Purge cached keys", key="settings_csr_key_cache_purge_button"):
+            cache.purge()
+
 def main():
     set_page_config()
+    RSAService.key_pool = get_rsa_key_pool()
+    PGPService.worker_pool = get_gpg_worker_pool()
+    CSRService.key_cache = get_private_key_cache()
+    render_settings_sidebar()
     
     st.title("🔐 Secure Key Generator")
     st.markdown(get_styles(), unsafe_allow_html=True)
@@ -42,6 +100,8 @@ def main():
 
     with tab1:
         render_password_section()
+        st.markdown("---")
+        render_passphrase_section()
     with tab2:
         render_rsa_section()
     with tab3:
@@ -1,4 +1,4 @@
-from .password_section import render_password_section
+from .password_section import render_password_section, render_passphrase_section
 from .rsa_section import render_rsa_section
 from .ssh_section import render_ssh_section
 from .pgp_section import render_pgp_section
@@ -8,6 +8,7 @@ from .csr_sign_section import render_csr_sign_section
 
 __all__ = [
     'render_password_section',
+    'render_passphrase_section',
     'render_rsa_section',
     'render_ssh_section',
     'render_pgp_section',
@@ -1,11 +1,18 @@
 import streamlit as st
 from services.csr_service import CSRService
+from services.csr_batch_service import CSRBatchService
+from services.csr_profiles import get_profile, list_profiles
+from services.san_ingest import split_san_lines
 from services.rsa_service import RSAService
+from services.ec_service import ECService
 from frontend.utils import download_button, get_key_filename
 import tempfile
 import os
+import shutil
 from pathlib import Path
 
+CUSTOM_PROFILE = "Custom"
+
 def render_csr_section():
     st.markdown("### 📜 Certificate Signing Request (CSR) Generator")
     st.markdown("Generate a CSR for obtaining SSL/TLS certificates.")
@@ -19,7 +26,7 @@ def render_csr_section():
     # Key Source Selection
     key_source = st.radio(
         "Private Key Source",
-        options=["Generate New RSA Key", "Use Existing Key"],
+        options=["Generate New Key", "Use Existing Key"],
         key="csr_gen_key_source_radio"
     )
 
@@ -29,18 +36,26 @@ def render_csr_section():
     if 'csr_key_password' not in st.session_state:
         st.session_state.csr_key_password = None
 
-    if key_source == "Generate New RSA Key":
-        with st.expander("RSA Key Options", expanded=True):
+    if key_source == "Generate New Key":
+        with st.expander("Key Options", expanded=True):
             col1, col2 = st.columns(2)
             
             with col1:
-                key_size = st.select_slider(
-                    "Key Size (bits)",
-                    options=[2048, 3072, 4096],
-                    value=2048,
-                    help="Larger key sizes are more secure but slower",
-                    key="csr_gen_key_size_select_slider"
+                key_algorithm = st.selectbox(
+                    "Key Algorithm",
+                    options=["RSA"] + list(ECService.SUPPORTED_CURVES),
+                    index=0,
+                    help="EC and Ed25519 keys are generated much faster than RSA keys",
+                    key="csr_gen_key_algorithm_select"
                 )
+                if key_algorithm == "RSA":
+                    key_size = st.select_slider(
+                        "Key Size (bits)",
+                        options=[2048, 3072, 4096],
+                        value=2048,
+                        help="Larger key sizes are more secure but slower",
+                        key="csr_gen_key_size_select_slider"
+                    )
             
             with col2:
                 key_password = st.text_input(
@@ -50,17 +65,24 @@ def render_csr_section():
                     key="csr_gen_key_password_input"
                 )
 
-            if st.button("🔐 Generate RSA Key Pair", key="csr_gen_rsa_button"):
+            if st.button("🔐 Generate Key Pair", key="csr_gen_rsa_button"):
                 try:
-                    service = RSAService()
-                    public_key, private_key = service.generate_keypair(
-                        key_size=key_size,
-                        password=key_password if key_password else None
-                    )
+                    if key_algorithm == "RSA":
+                        public_key, private_key = RSAService().generate_keypair(
+                            key_size=key_size,
+                            password=key_password if key_password else None
+                        )
+                        key_filename_type = "rsa"
+                    else:
+                        public_key, private_key = ECService().generate_keypair(
+                            curve=key_algorithm,
+                            password=key_password if key_password else None
+                        )
+                        key_filename_type = "ec"
                     # Store private key in temporary file
                     st.session_state.key_file.write_text(private_key)
                     st.session_state.csr_key_password = key_password
-                    st.success("RSA key pair generated successfully!")
+                    st.success(f"{key_algorithm} key pair generated successfully!")
 
                     # Display and download options for keys
                     col1, col2 = st.columns(2)
@@ -69,7 +91,7 @@ def render_csr_section():
                         st.code(private_key, language="text")
                         download_button(
                             private_key,
-                            get_key_filename("rsa"),
+                            get_key_filename(key_filename_type),
                             "⬇️ Download Private Key"
                         )
                     with col2:
@@ -77,11 +99,11 @@ def render_csr_section():
                         st.code(public_key, language="text")
                         download_button(
                             public_key,
-                            get_key_filename("rsa", is_public=True),
+                            get_key_filename(key_filename_type, is_public=True),
                             "⬇️ Download Public Key"
                         )
                 except Exception as e:
-                    st.error(f"Error generating RSA key pair: {str(e)}")
+                    st.error(f"Error generating key pair: {str(e)}")
                     if st.session_state.key_file.exists():
                         st.session_state.key_file.unlink()
                     st.session_state.csr_key_password = None
@@ -112,66 +134,102 @@ def render_csr_section():
                     st.session_state.csr_key_password = input_key_password
 
     # CSR Information
+    try:
+        profile_names = list_profiles()
+    except ValueError as e:
+        st.error(f"⚠️ Error loading CSR profiles: {str(e)}")
+        profile_names = []
+    profile_name = st.selectbox(
+        "CSR Profile",
+        options=[CUSTOM_PROFILE] + profile_names,
+        help="Profiles fix the subject fields, key usage and extended key usage; only the CN and SANs are entered",
+        key="csr_gen_profile_select"
+    )
     with st.expander("Certificate Information", expanded=True):
-        col1, col2 = st.columns(2)
-        
-        with col1:
+        if profile_name != CUSTOM_PROFILE:
+            profile = get_profile(profile_name)
             common_name = st.text_input(
-                "Common Name (CN)", 
+                "Common Name (CN)",
                 value="example.com",
                 help="Domain name, server name, or IP address (e.g., example.com or 192.168.1.1)",
-                key="csr_gen_cn_input"
+                key="csr_gen_profile_cn_input"
             )
-            country = st.text_input(
-                "Country (C)", 
-                value="US",
-                max_chars=2,
-                help="Two-letter country code (e.g., US)",
-                key="csr_gen_country_input"
-            )
-            locality = st.text_input(
-                "Locality/City (L)",
-                value="San Francisco",
-                help="City name",
-                key="csr_gen_locality_input"
-            )
-            organization = st.text_input(
-                "Organization (O)",
-                value="Example Inc",
-                help="Company or organization name",
-                key="csr_gen_org_input"
+            if profile.description:
+                st.caption(profile.description)
+            st.caption(
+                "Subject: " + (", ".join(f"{field}={value}" for field, value in profile.subject.items()) or "CN only")
+                + " · Key usage: " + (", ".join(profile.key_usage) or "none")
+                + (" (RSA keys add " + ", ".join(profile.rsa_key_usage) + ")" if profile.rsa_key_usage else "")
+                + " · Extended key usage: " + (", ".join(profile.extended_key_usage) or "none")
             )
+        else:
+            col1, col2 = st.columns(2)
+        
+            with col1:
+                common_name = st.text_input(
+                    "Common Name (CN)", 
+                    value="example.com",
+                    help="Domain name, server name, or IP address (e.g., example.com or 192.168.1.1)",
+                    key="csr_gen_cn_input"
+                )
+                country = st.text_input(
+                    "Country (C)", 
+                    value="US",
+                    max_chars=2,
+                    help="Two-letter country code (e.g., US)",
+                    key="csr_gen_country_input"
+                )
+                locality = st.text_input(
+                    "Locality/City (L)",
+                    value="San Francisco",
+                    help="City name",
+                    key="csr_gen_locality_input"
+                )
+                organization = st.text_input(
+                    "Organization (O)",
+                    value="Example Inc",
+                    help="Company or organization name",
+                    key="csr_gen_org_input"
+                )
 
-        with col2:
-            state = st.text_input(
-                "State/Province (ST)",
-                value="California",
-                help="Full state or province name",
-                key="csr_gen_state_input"
-            )
-            email = st.text_input(
-                "Email Address",
-                value="admin@example.com",
-                help="Contact email address",
-                key="csr_gen_email_input"
-            )
-            org_unit = st.text_input(
-                "Organizational Unit (OU)",
-                value="IT Department",
-                help="Department or division name",
-                key="csr_gen_ou_input"
-            )
+            with col2:
+                state = st.text_input(
+                    "State/Province (ST)",
+                    value="California",
+                    help="Full state or province name",
+                    key="csr_gen_state_input"
+                )
+                email = st.text_input(
+                    "Email Address",
+                    value="admin@example.com",
+                    help="Contact email address",
+                    key="csr_gen_email_input"
+                )
+                org_unit = st.text_input(
+                    "Organizational Unit (OU)",
+                    value="IT Department",
+                    help="Department or division name",
+                    key="csr_gen_ou_input"
+                )
             
         # Add Subject Alternative Names field
         st.markdown("##### Subject Alternative Names (SANs)")
         st.markdown("Add additional domain names or IP addresses to be secured by this certificate.")
         san_input = st.text_area(
             "Subject Alternative Names",
-            placeholder="Enter one domain or IP per line (e.g., www.example.com, mail.example.com, 192.168.1.1)",
+            placeholder="Enter one domain, IP, email or URI per line (e.g., www.example.com, 192.168.1.1, admin@example.com)",
             help="Each line will be treated as a separate SAN entry. These can be domain names or IP addresses that will be secured by the certificate.",
             key="csr_gen_san_input"
         )
         
+        san_file = st.file_uploader(
+            "SAN List File (Optional)",
+            type=["txt", "csv"],
+            help="Entries separated by newlines, commas or spaces; lines starting with # are ignored. "
+                 "Duplicates are removed and host names are lower-cased and IDNA-encoded.",
+            key="csr_gen_san_file_uploader"
+        )
+        
         # Process SAN input into a list
         subject_alternative_names = []
         if san_input:
@@ -186,21 +244,32 @@ def render_csr_section():
             return
 
         try:
+            if san_file is not None:
+                subject_alternative_names.extend(split_san_lines(san_file.getvalue().decode("utf-8").splitlines()))
+
             # Read private key from temporary file
             private_key_pem = st.session_state.key_file.read_text()
             
-            csr = CSRService.generate_csr(
-                private_key_pem=private_key_pem,
-                common_name=common_name,
-                country=country if country else None,
-                state=state if state else None,
-                locality=locality if locality else None,
-                organization=organization if organization else None,
-                organizational_unit=org_unit if org_unit else None,
-                email=email if email else None,
-                password=st.session_state.csr_key_password,
-                subject_alternative_names=subject_alternative_names if subject_alternative_names else None
-            )
+            if profile_name != CUSTOM_PROFILE:
+                csr = profile.generate_csr(
+                    private_key_pem,
+                    common_name,
+                    subject_alternative_names=subject_alternative_names if subject_alternative_names else None,
+                    password=st.session_state.csr_key_password
+                )
+            else:
+                csr = CSRService.generate_csr(
+                    private_key_pem=private_key_pem,
+                    common_name=common_name,
+                    country=country if country else None,
+                    state=state if state else None,
+                    locality=locality if locality else None,
+                    organization=organization if organization else None,
+                    organizational_unit=org_unit if org_unit else None,
+                    email=email if email else None,
+                    password=st.session_state.csr_key_password,
+                    subject_alternative_names=subject_alternative_names if subject_alternative_names else None
+                )
 
             st.success("CSR generated successfully!")
             
@@ -232,6 +301,8 @@ def render_csr_section():
                 )
                 st.info("ℹ️ Submit this CSR to your Certificate Authority")
 
+        except UnicodeDecodeError:
+            st.error("The SAN list file must be UTF-8 text")
         except Exception as e:
             st.error(f"Error generating CSR: {str(e)}")
 
@@ -248,3 +319,79 @@ def render_csr_section():
     # Register cleanup function
     import atexit
     atexit.register(cleanup)
+
+    st.markdown("---")
+    render_csr_batch_section()
+
+
+def render_csr_batch_section():
+    st.markdown("### 📦 Batch CSR Generation")
+    st.markdown("Generate keys and CSRs for every row of a CSV or YAML manifest.")
+
+    with st.expander("Manifest Options", expanded=False):
+        st.markdown(
+            "Columns: `common_name` (required), `name`, `country`, `state`, `locality`, "
+            "`organization`, `organizational_unit`, `email`, `sans` (separated by `;`) and `key` "
+            "(`rsa`, `rsa:3072`, `P-256`, `P-384` or `Ed25519`). A `profile` column applies a "
+            "CSR profile, which sets every subject field except the CN."
+        )
+        manifest_file = st.file_uploader(
+            "Manifest",
+            type=["csv", "yaml", "yml"],
+            key="csr_batch_manifest_uploader"
+        )
+        col1, col2 = st.columns(2)
+        with col1:
+            key_type = st.selectbox(
+                "Default Key Type",
+                options=list(ECService.SUPPORTED_CURVES) + ["rsa:2048", "rsa:3072", "rsa:4096"],
+                help="Used for rows without a key column",
+                key="csr_batch_key_type_select"
+            )
+        with col2:
+            password = st.text_input(
+                "Key Password (Optional)",
+                type="password",
+                help="Optional password to encrypt every generated private key",
+                key="csr_batch_password_input"
+            )
+
+    if not st.button("📦 Generate CSR Batch", key="csr_batch_create_button", use_container_width=True):
+        return
+    if manifest_file is None:
+        st.error("⚠️ Please upload a manifest!")
+        return
+
+    work_dir = tempfile.mkdtemp(prefix="csr-batch-")
+    try:
+        manifest_path = os.path.join(work_dir, os.path.basename(manifest_file.name))
+        with open(manifest_path, "wb") as f:
+            shutil.copyfileobj(manifest_file, f)
+        archive_path = os.path.join(work_dir, "csrs.tar")
+        with st.spinner("Generating keys and CSRs..."):
+            summary = CSRBatchService.generate_batch(
+                CSRBatchService.read_manifest(manifest_path),
+                archive_path,
+                key_type=key_type,
+                password=password if password else None,
+                # Uploaded manifests must not read key files from the server
+                allow_key_files=False
+            )
+
+        if summary["succeeded"]:
+            st.success(f"✅ Generated {summary['succeeded']} CSRs")
+            with open(archive_path, "rb") as f:
+                st.download_button(
+                    "⬇️ Download Keys and CSRs (tar)",
+                    data=f,
+                    file_name="csrs.tar",
+                    mime="application/x-tar",
+                    key="csr_batch_download_button"
+                )
+        if summary["failed"]:
+            st.error(f"⚠️ {summary['failed']} rows failed")
+            st.table([{"Row": e["row"], "Name": e["name"], "Error": e["error"]} for e in summary["errors"]])
+    except Exception as e:
+        st.error(f"⚠️ Error generating CSR batch: {str(e)}")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
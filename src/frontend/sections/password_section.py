@@ -1,5 +1,6 @@
 import streamlit as st
-from services.passphrase_service import PasswordService
+from services.passphrase_service import PassphraseService, PasswordService
+from frontend.utils import download_button
 
 def render_password_section():
     st.markdown("### 🔑 Password Generator")
@@ -29,10 +30,65 @@ def render_password_section():
                 help="Enter any characters you want to exclude from the password",
                 placeholder="e.g. 0O1lI"
             )
+            count = st.number_input(
+                "🔢 Number of Passwords",
+                min_value=1,
+                max_value=100000,
+                value=1,
+                help="Generate a batch of passwords as a downloadable list",
+                key="pwd_gen_count_input"
+            )
+
+        template = st.text_input(
+            "🧩 Template (optional)",
+            key="pwd_gen_template_input",
+            help=(
+                "Structured format that replaces length and character types. "
+                "A/a: upper/lower letter, C/c: consonant, V/v: vowel, 9: digit, s: special, "
+                "X/x: letter or digit, *: any, [A-Z]: class, {n}: repeat, \\: literal"
+            ),
+            placeholder="e.g. Cvcc-9999-ssss or [A-Z]{3}-[0-9]{6}"
+        )
+        unique = st.checkbox(
+            "🎟️ Unique Codes",
+            value=False,
+            key="pwd_gen_unique_check",
+            help="Guarantee that no two generated passwords are the same (templates only), e.g. for voucher codes"
+        )
     
     if st.button("🎲 Generate Password", key="pwd_gen_create_button", use_container_width=True):
         try:
             service = PasswordService()
+            if template:
+                if unique:
+                    passwords = list(service.generate_unique_from_template(count, template, excluded_chars=excluded_chars))
+                else:
+                    passwords = service.generate_many_from_template(count, template, excluded_chars=excluded_chars)
+                entropy_bits = service.template_entropy_bits(template, excluded_chars=excluded_chars)
+                if count > 1:
+                    st.markdown(f"##### Generated {len(passwords)} Passwords:")
+                    st.code("\n".join(passwords[:10]) + ("\n..." if len(passwords) > 10 else ""), language=None)
+                    download_button("\n".join(passwords) + "\n", "passwords.txt", "⬇️ Download Passwords")
+                else:
+                    st.markdown("##### Generated Password:")
+                    st.code(passwords[0], language=None)
+                st.info(f"🔒 {entropy_bits:.1f} bits of entropy per password. Store it securely!")
+                return
+            if count > 1:
+                passwords = service.generate_passwords(
+                    count,
+                    length=length,
+                    use_uppercase=use_uppercase,
+                    use_lowercase=use_lowercase,
+                    use_digits=use_digits,
+                    use_special=use_special,
+                    excluded_chars=excluded_chars
+                )
+                st.markdown(f"##### Generated {len(passwords)} Passwords:")
+                st.code("\n".join(passwords[:10]) + ("\n..." if len(passwords) > 10 else ""), language=None)
+                download_button("\n".join(passwords) + "\n", "passwords.txt", "⬇️ Download Passwords")
+                st.info("🔒 Store these passwords securely!")
+                return
             password = service.generate_password(
                 length=length,
                 use_uppercase=use_uppercase,
@@ -46,3 +102,90 @@ def render_password_section():
             st.info("🔒 Copy this password and store it securely!")
         except ValueError as e:
             st.error(f"⚠️ {str(e)}")
+
+    render_breach_check()
+
+
+def render_breach_check():
+    try:
+        service = PasswordService()
+    except ValueError as e:
+        st.warning(f"⚠️ Breach checks are unavailable: {str(e)}")
+        return
+    if service.breach_index is None:
+        return
+    st.caption(f"Generated passwords are checked against an offline breach corpus of {len(service.breach_index):,} entries.")
+
+    with st.expander("🛡️ Check Passwords Against Known Breaches"):
+        passwords = st.text_area(
+            "Passwords (one per line)",
+            key="pwd_breach_check_input",
+            help="Checked locally against the breach index; nothing is sent over the network"
+        )
+        if st.button("🔍 Check", key="pwd_breach_check_button") and passwords.strip():
+            candidates = [p for p in passwords.splitlines() if p]
+            breached = service.check_passwords(candidates)
+            found = sum(breached)
+            if found:
+                st.error(f"⚠️ {found} of {len(candidates)} passwords appear in known breaches. Do not use them.")
+            else:
+                st.success(f"✅ None of the {len(candidates)} passwords appear in the breach corpus.")
+
+
+def render_passphrase_section():
+    st.markdown("### 📝 Passphrase Generator")
+    st.markdown("Generate memorable Diceware-style passphrases from the EFF large wordlist.")
+
+    with st.expander("Passphrase Options", expanded=True):
+        col1, col2 = st.columns(2)
+
+        with col1:
+            word_count = st.slider(
+                "Number of Words",
+                min_value=3,
+                max_value=12,
+                value=6,
+                key="phrase_gen_word_count_slider"
+            )
+            separator = st.selectbox(
+                "Separator",
+                options=["-", " ", ".", "_", ""],
+                format_func=lambda s: {" ": "Space", "": "None"}.get(s, s),
+                key="phrase_gen_separator_select"
+            )
+            capitalize = st.checkbox("🔠 Capitalize Words", value=False, key="phrase_gen_capitalize_check")
+
+        with col2:
+            include_number = st.checkbox("🔢 Include a Number", value=False, key="phrase_gen_number_check")
+            include_special = st.checkbox("💫 Include a Special Character", value=False, key="phrase_gen_special_check")
+            count = st.number_input(
+                "🔢 Number of Passphrases",
+                min_value=1,
+                max_value=100000,
+                value=1,
+                help="Generate a batch of passphrases as a downloadable list",
+                key="phrase_gen_count_input"
+            )
+
+    if st.button("🎲 Generate Passphrase", key="phrase_gen_create_button", use_container_width=True):
+        try:
+            service = PassphraseService()
+            entropy_bits = service.entropy_bits(word_count, include_number, include_special)
+            passphrases = service.generate_passphrases(
+                count,
+                word_count=word_count,
+                separator=separator,
+                capitalize=capitalize,
+                include_number=include_number,
+                include_special=include_special
+            )
+            if count > 1:
+                st.markdown(f"##### Generated {len(passphrases)} Passphrases:")
+                st.code("\n".join(passphrases[:10]) + ("\n..." if len(passphrases) > 10 else ""), language=None)
+                download_button("\n".join(passphrases) + "\n", "passphrases.txt", "⬇️ Download Passphrases")
+            else:
+                st.markdown("##### Generated Passphrase:")
+                st.code(passphrases[0], language=None)
+            st.info(f"🔒 {entropy_bits:.1f} bits of entropy per passphrase. Store it securely!")
+        except (ValueError, OSError) as e:
+            st.error(f"⚠️ {str(e)}")
@@ -1,7 +1,27 @@
 import streamlit as st
+import os
+import shutil
+import tempfile
 from services.pgp_service import PGPService
+from services.pgp_native_service import NativePGPService
 from frontend.utils import download_button, get_key_filename
 
+# Key type label -> (gpg key type, curve); elliptic-curve keys get a matching ECDH subkey
+KEY_TYPES = {
+    "Ed25519 / Cv25519": ("EDDSA", "ed25519"),
+    "NIST P-256": ("ECDSA", "nistp256"),
+    "NIST P-384": ("ECDSA", "nistp384"),
+    "RSA": ("RSA", None),
+    "DSA": ("DSA", None),
+}
+
+# Primary key types the native engine can build; everything else needs gpg
+NATIVE_KEY_TYPES = {key_type for key_type, _ in NativePGPService.SUPPORTED_KEY_TYPES}
+
+# Streamlit keeps uploads and download data in server memory, so the file
+# tab is capped; PGPService streams files of any size from disk
+MAX_FILE_MB = 50
+
 def render_pgp_section():
     st.markdown("### 🔏 PGP Key Generator")
     st.markdown("Generate PGP key pairs for encryption and signing.")
@@ -19,20 +39,23 @@ def render_pgp_section():
             )
         
         with col2:
-            key_type = st.selectbox(
+            key_type_label = st.selectbox(
                 "Key Type",
-                options=["RSA", "DSA"],
+                options=list(KEY_TYPES),
                 index=0,
-                help="RSA is recommended for most users",
+                help="Ed25519 is recommended for most users and is much faster to generate than RSA",
                 key="pgp_gen_key_type_select"
             )
-            key_length = st.select_slider(
-                "Key Length (bits)",
-                options=[2048, 3072, 4096],
-                value=2048,
-                help="Larger keys are more secure but slower",
-                key="pgp_gen_key_length_select_slider"
-            )
+            key_type, key_curve = KEY_TYPES[key_type_label]
+            key_length = 2048
+            if key_curve is None:
+                key_length = st.select_slider(
+                    "Key Length (bits)",
+                    options=[2048, 3072, 4096],
+                    value=2048,
+                    help="Larger keys are more secure but slower",
+                    key="pgp_gen_key_length_select_slider"
+                )
             expiry_years = st.number_input(
                 "Expiry (Years)",
                 min_value=0,
@@ -41,6 +64,13 @@ def render_pgp_section():
                 help="0 means no expiry, max 10 years",
                 key="pgp_gen_expiry_input"
             )
+            backend = st.selectbox(
+                "Engine",
+                options=["gpg", "native"] if key_type in NATIVE_KEY_TYPES else ["gpg"],
+                index=0,
+                help="native builds RSA and Ed25519 keys in process without GnuPG, which is faster",
+                key="pgp_gen_backend_select"
+            )
         
         passphrase = st.text_input(
             "Passphrase (Required)",
@@ -58,20 +88,23 @@ def render_pgp_section():
             st.error("⚠️ Name and email are required!")
             return
             
-        service = PGPService()
         try:
             # Convert years to days for GPG (0 means no expiry)
             expire_date = str(expiry_years * 365) if expiry_years > 0 else "0"
             
-            keys = service.generate_keypair(
-                name=name,
-                email=email,
-                comment=comment,
-                passphrase=passphrase,
-                key_type=key_type,
-                key_length=key_length,
-                expire_date=expire_date
-            )
+            # Close right away so reruns never leave homedirs behind
+            with PGPService() as service:
+                keys = service.generate_keypair(
+                    name=name,
+                    email=email,
+                    comment=comment,
+                    passphrase=passphrase,
+                    key_type=key_type,
+                    key_length=key_length,
+                    key_curve=key_curve,
+                    expire_date=expire_date,
+                    backend=backend
+                )
             
             # Generate filenames
             private_filename = get_key_filename("pgp")
@@ -98,3 +131,99 @@ def render_pgp_section():
             st.warning("⚠️ Save your private key and passphrase securely!")
         except Exception as e:
             st.error(f"⚠️ Error generating PGP keys: {str(e)}")
+
+    render_pgp_file_operations()
+
+def render_pgp_file_operations():
+    st.markdown("### 📁 Encrypt, Decrypt, Sign and Verify Files")
+    st.markdown(
+        f"Files are streamed through GnuPG in fixed-size chunks. Uploads and results are held in "
+        f"server memory, so files are limited to {MAX_FILE_MB} MB here."
+    )
+
+    operation = st.radio(
+        "Operation",
+        options=["Encrypt", "Decrypt", "Sign", "Verify"],
+        horizontal=True,
+        key="pgp_file_operation_radio"
+    )
+    uploaded_file = st.file_uploader(
+        "File to verify" if operation == "Verify" else f"File to {operation.lower()}",
+        help=f"At most {MAX_FILE_MB} MB",
+        key="pgp_file_input_uploader"
+    )
+    signature_file = None
+    if operation == "Verify":
+        signature_file = st.file_uploader(
+            "Detached signature (.asc or .sig)",
+            type=["asc", "sig"],
+            key="pgp_file_signature_uploader"
+        )
+    needs_private_key = operation in ("Decrypt", "Sign")
+    key_text = st.text_area(
+        "Private Key" if needs_private_key else "Public Key",
+        help="Armored key block (-----BEGIN PGP ...)",
+        key="pgp_file_key_input"
+    )
+    passphrase = ""
+    if needs_private_key:
+        passphrase = st.text_input(
+            "Passphrase",
+            type="password",
+            key="pgp_file_passphrase_input"
+        )
+
+    if not st.button(f"▶️ {operation} File", key="pgp_file_run_button", use_container_width=True):
+        return
+    if uploaded_file is None or (operation == "Verify" and signature_file is None):
+        st.error("⚠️ Please upload the required files!")
+        return
+    if any(f is not None and f.size > MAX_FILE_MB * 1024 * 1024 for f in (uploaded_file, signature_file)):
+        st.error(f"⚠️ Files larger than {MAX_FILE_MB} MB are not accepted here!")
+        return
+    if not key_text:
+        st.error("⚠️ A PGP key is required!")
+        return
+
+    work_dir = tempfile.mkdtemp(prefix="pgp-file-")
+    try:
+        with PGPService() as service:
+            if operation == "Verify":
+                # gpg reads the signed data from disk
+                data_path = os.path.join(work_dir, "data")
+                with open(data_path, "wb") as f:
+                    shutil.copyfileobj(uploaded_file, f, PGPService.CHUNK_SIZE)
+                result = service.verify_file(signature_file, data_path, key_text)
+                if result["valid"]:
+                    st.success(f"✅ Good signature from {result['user_id']} ({result['fingerprint']})")
+                else:
+                    st.error("❌ The signature does not match this file and key")
+                return
+
+            if operation == "Encrypt":
+                filename = f"{uploaded_file.name}.gpg"
+                output_path = os.path.join(work_dir, filename)
+                service.encrypt_file(uploaded_file, output_path, key_text)
+            elif operation == "Decrypt":
+                name, extension = os.path.splitext(uploaded_file.name)
+                filename = name if extension in (".gpg", ".pgp", ".asc") else f"{uploaded_file.name}.decrypted"
+                output_path = os.path.join(work_dir, filename)
+                service.decrypt_file(uploaded_file, output_path, key_text, passphrase)
+            else:
+                filename = f"{uploaded_file.name}.asc"
+                output_path = os.path.join(work_dir, filename)
+                service.sign_file(uploaded_file, output_path, key_text, passphrase)
+
+        st.success(f"✅ {operation}ed {uploaded_file.name}")
+        with open(output_path, "rb") as f:
+            st.download_button(
+                f"⬇️ Download {filename}",
+                data=f,
+                file_name=filename,
+                mime="application/octet-stream",
+                key="pgp_file_download_button"
+            )
+    except Exception as e:
+        st.error(f"⚠️ Error processing file: {str(e)}")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
@@ -21,6 +21,8 @@ def get_key_filename(key_type: str, is_public: bool = False) -> str:
         base = f"pgp_keypair_{timestamp}"
     elif key_type.lower() == "csr":
         base = f"csr_{timestamp}"
+    elif key_type.lower() == "ec":
+        base = f"ec_keypair_{timestamp}"
     else:  # RSA
         base = f"rsa_keypair_{timestamp}"
     
@@ -0,0 +1,253 @@
+"""
+Offline breached-password checks against a local corpus, such as the
+Have I Been Pwned SHA-1 dump, through a memory-mapped sorted hash index
+"""
+from typing import Dict, Iterable, Iterator, List, Optional
+import argparse
+import hashlib
+import heapq
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import threading
+
+# Index layout: header, a fanout table of 65537 record offsets (one per
+# leading 16 bits of the hash), then the sorted, deduplicated 8-byte
+# big-endian SHA-1 prefixes. With 8 of SHA-1's 20 bytes, one billion
+# entries give a false positive roughly once in 18 billion lookups.
+_INDEX_MAGIC = b"BPX1"
+_INDEX_HEADER = struct.Struct(">4sQ")  # magic, record count
+_FANOUT = struct.Struct(">65537Q")
+_RECORD = struct.Struct(">Q")
+_DATA_OFFSET = _INDEX_HEADER.size + _FANOUT.size
+
+
+def password_key(password: str) -> int:
+    """Index key of a password: the first 8 bytes of its UTF-8 SHA-1"""
+    return _RECORD.unpack_from(hashlib.sha1(password.encode("utf-8")).digest())[0]
+
+
+class BreachIndex:
+    """
+    Read-only view of a breach index file. Lookups binary search the mapped
+    records of one fanout bucket, so memory use does not grow with the corpus
+    and a lookup touches a handful of pages.
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: Index file written by BreachIndex.build
+        """
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            self._file.close()
+            raise
+        if len(self._data) < _DATA_OFFSET:
+            self.close()
+            raise ValueError(f"Not a breach index: {path}")
+        magic, self.count = _INDEX_HEADER.unpack_from(self._data)
+        if magic != _INDEX_MAGIC or len(self._data) != _DATA_OFFSET + self.count * _RECORD.size:
+            self.close()
+            raise ValueError(f"Not a breach index or truncated: {path}")
+        self._fanout = _FANOUT.unpack_from(self._data, _INDEX_HEADER.size)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __contains__(self, password: str) -> bool:
+        return self._contains_key(password_key(password))
+
+    def check_many(self, passwords: Iterable[str]) -> List[bool]:
+        """
+        Check a batch of passwords
+        Args:
+            passwords: Passwords to check
+        Returns: For each password, whether it is in the corpus
+        """
+        keys = [password_key(p) for p in passwords]
+        results = [False] * len(keys)
+        # Visit the index in key order so each page is faulted in at most once
+        for i in sorted(range(len(keys)), key=keys.__getitem__):
+            results[i] = self._contains_key(keys[i])
+        return results
+
+    def close(self) -> None:
+        """Unmap the index"""
+        self._data.close()
+        self._file.close()
+
+    def __enter__(self) -> "BreachIndex":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _contains_key(self, key: int) -> bool:
+        bucket = key >> 48
+        low, high = self._fanout[bucket], self._fanout[bucket + 1]
+        data = self._data
+        while low < high:
+            middle = (low + high) // 2
+            record = _RECORD.unpack_from(data, _DATA_OFFSET + middle * _RECORD.size)[0]
+            if record < key:
+                low = middle + 1
+            elif record > key:
+                high = middle
+            else:
+                return True
+        return False
+
+    @staticmethod
+    def build(sources: Iterable[str], index_path: str, plaintext: bool = False, run_size: int = 1 << 22) -> int:
+        """
+        Build an index file from corpus files
+
+        Lines are SHA-1 hashes in hex, optionally followed by ":<count>" as
+        in the HIBP dump, or plaintext passwords when plaintext is set. The
+        corpus may be far larger than memory: keys are sorted in runs of
+        run_size and merged from temporary files.
+
+        Args:
+            sources: Corpus file paths
+            index_path: Output index file
+            plaintext: Corpus lines are passwords instead of hashes
+            run_size: Keys sorted in memory at a time (8 bytes each)
+
+        Returns:
+            Number of distinct entries written
+        """
+        index_dir = os.path.dirname(os.path.abspath(index_path))
+        runs: List[str] = []
+        try:
+            keys: List[int] = []
+            for key in BreachIndex._read_keys(sources, plaintext):
+                keys.append(key)
+                if len(keys) >= run_size:
+                    runs.append(BreachIndex._write_run(keys, index_dir))
+                    keys = []
+            keys.sort()
+
+            run_files = [open(run, "rb") for run in runs]
+            try:
+                merged = heapq.merge(keys, *(BreachIndex._read_run(f) for f in run_files))
+                return BreachIndex._write_index(merged, index_path)
+            finally:
+                for f in run_files:
+                    f.close()
+        finally:
+            for run in runs:
+                os.remove(run)
+
+    @staticmethod
+    def _read_keys(sources: Iterable[str], plaintext: bool) -> Iterator[int]:
+        for source in sources:
+            with open(source, "rb") as f:
+                for line_number, line in enumerate(f, 1):
+                    line = line.rstrip(b"\r\n")
+                    if plaintext:
+                        if line:
+                            yield _RECORD.unpack_from(hashlib.sha1(line).digest())[0]
+                        continue
+                    digest = line.split(b":", 1)[0].strip()
+                    if not digest:
+                        continue
+                    if len(digest) != 40:
+                        raise ValueError(f"{source}:{line_number}: expected a SHA-1 hash in hex")
+                    try:
+                        yield int(digest[:16], 16)
+                    except ValueError:
+                        raise ValueError(f"{source}:{line_number}: expected a SHA-1 hash in hex")
+
+    @staticmethod
+    def _write_run(keys: List[int], directory: str) -> str:
+        keys.sort()
+        fd, path = tempfile.mkstemp(prefix="breach-run-", dir=directory)
+        with os.fdopen(fd, "wb") as f:
+            f.write(struct.pack(f">{len(keys)}Q", *keys))
+        return path
+
+    @staticmethod
+    def _read_run(f) -> Iterator[int]:
+        while True:
+            block = f.read(_RECORD.size * 8192)
+            if not block:
+                return
+            yield from struct.unpack(f">{len(block) // _RECORD.size}Q", block)
+
+    @staticmethod
+    def _write_index(sorted_keys: Iterable[int], index_path: str) -> int:
+        """Write deduplicated sorted keys with header and fanout; Returns: record count"""
+        fanout = [0] * 65537
+        temp_path = f"{index_path}.{os.getpid()}.tmp"
+        count = 0
+        previous = None
+        try:
+            with open(temp_path, "wb") as f:
+                f.seek(_DATA_OFFSET)
+                buffer = []
+                for key in sorted_keys:
+                    if key == previous:
+                        continue
+                    previous = key
+                    fanout[(key >> 48) + 1] += 1
+                    buffer.append(key)
+                    count += 1
+                    if len(buffer) == 8192:
+                        f.write(struct.pack(">8192Q", *buffer))
+                        buffer = []
+                f.write(struct.pack(f">{len(buffer)}Q", *buffer))
+
+                for bucket in range(1, 65537):
+                    fanout[bucket] += fanout[bucket - 1]
+                f.seek(0)
+                f.write(_INDEX_HEADER.pack(_INDEX_MAGIC, count))
+                f.write(_FANOUT.pack(*fanout))
+            os.replace(temp_path, index_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        return count
+
+
+_indexes: Dict[str, BreachIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_breach_index(path: Optional[str] = None) -> Optional[BreachIndex]:
+    """
+    Shared BreachIndex for a path, opened once per process
+    Args:
+        path: Index file, defaults to $KEYGEN_BREACH_INDEX
+    Returns: BreachIndex, or None when no index is configured
+    Raises:
+        ValueError: If the configured index can't be opened
+    """
+    path = path or os.environ.get("KEYGEN_BREACH_INDEX")
+    if not path:
+        return None
+    path = os.path.abspath(path)
+    with _indexes_lock:
+        index = _indexes.get(path)
+        if index is None:
+            try:
+                index = _indexes[path] = BreachIndex(path)
+            except OSError as e:
+                raise ValueError(f"Cannot open breach index {path}: {e.strerror or str(e)}")
+        return index
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build a breached-password index from a local corpus")
+    parser.add_argument("index", help="output index file")
+    parser.add_argument("corpus", nargs="+", help="corpus files (SHA-1 hex lines, e.g. the HIBP dump)")
+    parser.add_argument("--plaintext", action="store_true", help="corpus lines are plaintext passwords")
+    args = parser.parse_args()
+    written = BreachIndex.build(args.corpus, args.index, plaintext=args.plaintext)
+    print(f"{args.index}: {written} entries", file=sys.stderr)
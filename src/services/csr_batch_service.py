@@ -0,0 +1,356 @@
+"""
+Manifest-driven batch CSR generation: many subjects signed in parallel and
+streamed to a directory or tar archive
+"""
+from cryptography.hazmat.backends import default_backend
+from cryptography.hazmat.primitives.asymmetric import rsa
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+import csv
+import io
+import os
+import re
+import tarfile
+import time
+from .csr_profiles import get_profile
+from .csr_service import CSRService
+from .ec_service import ECService
+from .key_handle import KeyHandle
+from .private_key_cache import PrivateKeyCache
+from .san_ingest import read_san_file
+
+try:
+    import yaml
+except ImportError:  # PyYAML is optional; only YAML manifests need it
+    yaml = None
+
+# Manifest columns passed through to CSRService.generate_csr_for_key
+SUBJECT_FIELDS = (
+    "common_name",
+    "country",
+    "state",
+    "locality",
+    "organization",
+    "organizational_unit",
+    "email",
+)
+
+# (row number, output name, row) for rows that passed validation
+BatchEntry = Tuple[int, str, Dict[str, Any]]
+# (row number, output name, private key PEM or None, CSR PEM or None, error or None)
+BatchResult = Tuple[int, str, Optional[str], Optional[str], Optional[str]]
+
+
+class CSRBatchService:
+    """
+    Generates CSRs for every row of a manifest across a process pool. Rows
+    either get a new key or reference an existing key file. A failing row
+    is reported and skipped without aborting the batch.
+    """
+
+    @staticmethod
+    def read_manifest(path: str) -> Iterator[Dict[str, Any]]:
+        """
+        Read a CSV or YAML manifest
+
+        CSV manifests have one row per CSR with the SUBJECT_FIELDS columns
+        plus optional "name", "sans" (separated by ";" or whitespace),
+        "sans_file" (a SAN list as read by read_san_file), "key", "key_file"
+        and "profile" columns. Rows naming a profile take their subject
+        fields and extensions from it and only set the CN and SANs. YAML
+        manifests are a list of such mappings, or a mapping with a
+        "certificates" list and "defaults" applied to every entry. Relative
+        key_file and sans_file paths are resolved against the manifest's
+        directory.
+
+        Returns: Iterator of rows
+        """
+        base_dir = os.path.dirname(os.path.abspath(path))
+        if path.lower().endswith((".yaml", ".yml")):
+            rows = CSRBatchService._read_yaml(path)
+        else:
+            rows = CSRBatchService._read_csv(path)
+        for row in rows:
+            for column in ("key_file", "sans_file"):
+                if isinstance(row, dict) and row.get(column):
+                    row[column] = os.path.join(base_dir, os.path.expanduser(str(row[column])))
+            yield row
+
+    @staticmethod
+    def generate_batch(
+        manifest: Iterable[Dict[str, Any]],
+        output: str,
+        key_type: str = "P-256",
+        password: Optional[str] = None,
+        jobs: Optional[int] = None,
+        chunk_size: int = 16,
+        allow_key_files: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Generate one CSR per manifest row
+
+        Each row writes <name>.csr and, for generated keys, <name>.key (PKCS8)
+        into output. Rows with a key_file only write the CSR. Output is a
+        directory, or a streamed tar archive when it ends in ".tar".
+
+        Args:
+            manifest: Iterable of rows as produced by read_manifest, consumed lazily
+            output: Output directory or .tar path
+            key_type: Key for rows without "key"/"key_file": "rsa", "rsa:<bits>",
+                or one of ECService.SUPPORTED_CURVES
+            password: Encrypts generated keys and unlocks referenced key files
+            jobs: Number of worker processes (defaults to the CPU count)
+            chunk_size: Number of rows handled per worker task
+            allow_key_files: Accept rows referencing key or SAN files; disable
+                for manifests from untrusted sources, such as web uploads
+
+        Returns:
+            Dictionary with the number of succeeded and failed rows, and
+            "errors": [{"row", "name", "error"}] for every failed row
+        """
+        CSRBatchService._parse_key_spec(key_type)
+        if chunk_size < 1:
+            raise ValueError("Chunk size must be at least 1")
+        if jobs is not None and jobs < 1:
+            raise ValueError("Jobs must be at least 1")
+        jobs = jobs or os.cpu_count() or 1
+
+        summary: Dict[str, Any] = {"succeeded": 0, "failed": 0, "errors": []}
+        with _BatchWriter(output) as writer:
+            chunks = CSRBatchService._chunk_manifest(manifest, chunk_size, allow_key_files, summary)
+            for results in CSRBatchService._run_chunks(chunks, key_type, password, jobs):
+                for row_number, name, key_pem, csr_pem, error in results:
+                    if error is not None:
+                        CSRBatchService._fail(summary, row_number, name, error)
+                        continue
+                    if key_pem is not None:
+                        writer.write(f"{name}.key", key_pem, 0o600)
+                    writer.write(f"{name}.csr", csr_pem, 0o644)
+                    summary["succeeded"] += 1
+
+        summary["errors"].sort(key=lambda e: e["row"])
+        return summary
+
+    @staticmethod
+    def _read_csv(path: str) -> Iterator[Dict[str, Any]]:
+        with open(path, newline="") as f:
+            for row in csv.DictReader(f):
+                yield {k.strip(): v for k, v in row.items() if k}
+
+    @staticmethod
+    def _read_yaml(path: str) -> List[Dict[str, Any]]:
+        if yaml is None:
+            raise ValueError("Reading YAML manifests requires PyYAML (pip install pyyaml)")
+        with open(path) as f:
+            document = yaml.safe_load(f)
+        defaults: Dict[str, Any] = {}
+        if isinstance(document, dict):
+            defaults = document.get("defaults") or {}
+            document = document.get("certificates")
+        if not isinstance(document, list) or not isinstance(defaults, dict):
+            raise ValueError("YAML manifest must be a list of entries or a mapping with a 'certificates' list")
+        return [dict(defaults, **entry) if isinstance(entry, dict) else entry for entry in document]
+
+    @staticmethod
+    def _chunk_manifest(
+        manifest: Iterable[Dict[str, Any]],
+        chunk_size: int,
+        allow_key_files: bool,
+        summary: Dict[str, Any]
+    ) -> Iterator[List[BatchEntry]]:
+        """Validate rows, record invalid ones in summary and group the rest into chunks"""
+        names = set()
+        chunk: List[BatchEntry] = []
+        for row_number, row in enumerate(manifest, start=1):
+            if not isinstance(row, dict):
+                CSRBatchService._fail(summary, row_number, "", "Manifest entry is not a mapping")
+                continue
+            common_name = str(row.get("common_name") or "").strip()
+            name = str(row.get("name") or common_name).strip()
+            if not common_name:
+                CSRBatchService._fail(summary, row_number, name, "Common Name (CN) is required")
+                continue
+            if "/" in name or "\\" in name or name in (".", "..") or any(c.isspace() for c in name):
+                CSRBatchService._fail(summary, row_number, name, f"Invalid output name: {name!r}")
+                continue
+            if name in names:
+                CSRBatchService._fail(summary, row_number, name, f"Duplicate output name: {name!r}")
+                continue
+            if (row.get("key_file") or row.get("sans_file")) and not allow_key_files:
+                CSRBatchService._fail(summary, row_number, name, "Key and SAN files are not allowed in this manifest")
+                continue
+            if row.get("profile"):
+                try:
+                    _profile_for_row(row)
+                except ValueError as e:
+                    CSRBatchService._fail(summary, row_number, name, str(e))
+                    continue
+            names.add(name)
+            chunk.append((row_number, name, row))
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    @staticmethod
+    def _run_chunks(
+        chunks: Iterator[List[BatchEntry]],
+        key_type: str,
+        password: Optional[str],
+        jobs: int
+    ) -> Iterator[List[BatchResult]]:
+        # Bounded number of chunks in flight so memory stays flat for any manifest size
+        max_in_flight = jobs * 2
+        executor = ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker)
+        try:
+            pending = {}
+            exhausted = False
+            while not exhausted or pending:
+                while not exhausted and len(pending) < max_in_flight:
+                    chunk = next(chunks, None)
+                    if chunk is None:
+                        exhausted = True
+                    else:
+                        pending[executor.submit(_generate_chunk, chunk, key_type, password)] = chunk
+                if not pending:
+                    break
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    chunk = pending.pop(future)
+                    try:
+                        yield future.result()
+                    except Exception as e:
+                        # A worker died (e.g. killed); report its rows instead of aborting
+                        yield [(row_number, name, None, None, f"Worker failed: {e}") for row_number, name, _ in chunk]
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    @staticmethod
+    def _parse_key_spec(spec: str) -> Tuple[str, int]:
+        """
+        Parse "rsa", "rsa:<bits>" or an EC curve name
+        Returns: ("rsa", bits) or (curve, 0)
+        """
+        spec = str(spec).strip()
+        match = re.fullmatch(r"(?i)rsa(?::(\d+))?", spec)
+        if match:
+            bits = int(match.group(1) or 2048)
+            if bits < 2048:
+                raise ValueError("Key size must be at least 2048 bits for security")
+            return "rsa", bits
+        for curve in ECService.SUPPORTED_CURVES:
+            if spec.lower() == curve.lower():
+                return curve, 0
+        raise ValueError(
+            f"Unsupported key type: {spec}. Supported types are: rsa, rsa:<bits>, "
+            f"{', '.join(ECService.SUPPORTED_CURVES)}"
+        )
+
+    @staticmethod
+    def _fail(summary: Dict[str, Any], row_number: int, name: str, error: str) -> None:
+        summary["failed"] += 1
+        summary["errors"].append({"row": row_number, "name": name, "error": error})
+
+
+class _BatchWriter:
+    """Writes named files into a directory, or streams them into a tar archive"""
+
+    def __init__(self, output: str):
+        self._archive = None
+        self._output = output
+        self._now = int(time.time())
+        if output.lower().endswith(".tar"):
+            parent = os.path.dirname(os.path.abspath(output))
+            os.makedirs(parent, exist_ok=True)
+            self._archive = tarfile.open(output, mode="w|")
+        else:
+            os.makedirs(output, exist_ok=True)
+
+    def write(self, name: str, text: str, mode: int) -> None:
+        data = text.encode()
+        if self._archive is not None:
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            info.mode = mode
+            info.mtime = self._now
+            self._archive.addfile(info, io.BytesIO(data))
+            return
+        path = os.path.join(self._output, name)
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, mode)
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+
+    def __enter__(self) -> "_BatchWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        if self._archive is not None:
+            self._archive.close()
+
+
+def _init_worker() -> None:
+    """
+    Give each worker its own key cache, so rows sharing a key file unlock it
+    once per worker; the keys go away with the worker when the batch ends
+    """
+    CSRService.key_cache = PrivateKeyCache(max_entries=16)
+
+
+def _generate_chunk(chunk: List[BatchEntry], key_type: str, password: Optional[str]) -> List[BatchResult]:
+    """Process pool task: build keys and CSRs for one chunk of manifest rows"""
+    results = []
+    for row_number, name, row in chunk:
+        try:
+            key_pem, csr_pem = _generate_row(row, key_type, password)
+        except Exception as e:
+            results.append((row_number, name, None, None, str(e)))
+            continue
+        results.append((row_number, name, key_pem, csr_pem, None))
+    return results
+
+
+def _generate_row(row: Dict[str, Any], key_type: str, password: Optional[str]) -> Tuple[Optional[str], str]:
+    """Returns: (private key PEM if a key was generated, CSR PEM)"""
+    key_pem = None
+    if row.get("key_file"):
+        with open(row["key_file"]) as f:
+            private_key_pem = f.read()
+        try:
+            private_key = CSRService.load_private_key(private_key_pem, password)
+        except Exception as e:
+            raise ValueError(f"Invalid private key {row['key_file']}: {e}")
+    else:
+        algorithm, bits = CSRBatchService._parse_key_spec(row.get("key") or key_type)
+        if algorithm == "rsa":
+            # Generated inline, a key pool inherited by a forked worker would
+            # hand out the same keys as the parent
+            private_key = rsa.generate_private_key(65537, bits, backend=default_backend())
+        else:
+            private_key = ECService.generate_key(algorithm).private_key
+        key_pem = KeyHandle(private_key, password).pkcs8_pem
+
+    sans = row.get("sans") or []
+    if isinstance(sans, str):
+        sans = re.split(r"[;\s]+", sans)
+    sans = [str(san) for san in sans if san]
+    if row.get("sans_file"):
+        sans.extend(read_san_file(row["sans_file"]))
+    if row.get("profile"):
+        return key_pem, _profile_for_row(row).build_csr(private_key, str(row["common_name"]), sans)
+    subject = {field: (str(row[field]).strip() or None) if row.get(field) else None for field in SUBJECT_FIELDS}
+    csr_pem = CSRService.generate_csr_for_key(
+        private_key,
+        subject_alternative_names=sans,
+        **subject
+    )
+    return key_pem, csr_pem
+
+
+def _profile_for_row(row: Dict[str, Any]):
+    """Profile named by a row, which must not also set the fields it fixes"""
+    profile = get_profile(str(row["profile"]).strip())
+    overrides = [field for field in SUBJECT_FIELDS[1:] if row.get(field)]
+    if overrides:
+        raise ValueError(f"Profile {profile.name} fixes the subject; remove {', '.join(overrides)} from this row")
+    return profile
@@ -0,0 +1,319 @@
+"""
+Named CSR profiles: fixed subject fields and extensions compiled once into
+a reusable builder, so each request only adds its CN, SANs and signature
+"""
+from cryptography import x509
+from cryptography.x509.oid import ExtendedKeyUsageOID, NameOID
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from typing import Any, Dict, List, Optional, Sequence
+import json
+import os
+import threading
+from .csr_service import CSRService
+
+try:
+    import yaml
+except ImportError:  # PyYAML is optional; only YAML profile files need it
+    yaml = None
+
+# Profile subject fields in the order CSRService writes them, after the CN
+SUBJECT_OIDS = (
+    ("country", NameOID.COUNTRY_NAME),
+    ("state", NameOID.STATE_OR_PROVINCE_NAME),
+    ("locality", NameOID.LOCALITY_NAME),
+    ("organization", NameOID.ORGANIZATION_NAME),
+    ("organizational_unit", NameOID.ORGANIZATIONAL_UNIT_NAME),
+    ("email", NameOID.EMAIL_ADDRESS),
+)
+
+KEY_USAGES = (
+    "digital_signature",
+    "content_commitment",
+    "key_encipherment",
+    "data_encipherment",
+    "key_agreement",
+    "key_cert_sign",
+    "crl_sign",
+    "encipher_only",
+    "decipher_only",
+)
+
+EXTENDED_KEY_USAGES = {
+    "server_auth": ExtendedKeyUsageOID.SERVER_AUTH,
+    "client_auth": ExtendedKeyUsageOID.CLIENT_AUTH,
+    "code_signing": ExtendedKeyUsageOID.CODE_SIGNING,
+    "email_protection": ExtendedKeyUsageOID.EMAIL_PROTECTION,
+    "time_stamping": ExtendedKeyUsageOID.TIME_STAMPING,
+    "ocsp_signing": ExtendedKeyUsageOID.OCSP_SIGNING,
+}
+
+
+class CSRProfile:
+    """
+    A compiled CSR template. The subject suffix and the BasicConstraints,
+    KeyUsage and ExtendedKeyUsage extensions are built once; builders are
+    immutable, so every request starts from the same base builder. Profiles
+    with RSA-only key usages compile a second builder for RSA keys.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        description: str = "",
+        subject: Optional[Dict[str, str]] = None,
+        key_usage: Optional[Sequence[str]] = None,
+        rsa_key_usage: Optional[Sequence[str]] = None,
+        extended_key_usage: Optional[Sequence[str]] = None,
+        ca: Optional[bool] = None,
+        path_length: Optional[int] = None
+    ):
+        """
+        Args:
+            name: Registry name of the profile
+            description: Short text shown next to the profile
+            subject: Fixed subject fields, keyed by the SUBJECT_OIDS names
+            key_usage: KEY_USAGES names, added as a critical KeyUsage extension
+            rsa_key_usage: KEY_USAGES names added only for RSA keys, such as
+                key_encipherment, which EC and Ed25519 keys cannot perform
+            extended_key_usage: EXTENDED_KEY_USAGES names or dotted OIDs
+            ca: Adds a critical BasicConstraints extension when not None
+            path_length: BasicConstraints path length, only for CA profiles
+        """
+        subject = dict(subject or {})
+        unknown = set(subject) - {field for field, _ in SUBJECT_OIDS}
+        if unknown:
+            raise ValueError(f"Unknown subject fields in profile {name}: {', '.join(sorted(unknown))}")
+        if subject.get("country") and len(str(subject["country"]).strip()) != 2:
+            raise ValueError(f"Country in profile {name} must be a two-letter code")
+
+        self.name = name
+        self.description = description
+        self.subject = {field: str(value).strip() for field, value in subject.items() if value}
+        self.key_usage = tuple(key_usage or ())
+        self.rsa_key_usage = tuple(rsa_key_usage or ())
+        self.extended_key_usage = tuple(extended_key_usage or ())
+        self.ca = ca
+        self.path_length = path_length
+
+        self._subject_suffix = [
+            x509.NameAttribute(oid, self.subject[field]) for field, oid in SUBJECT_OIDS if field in self.subject
+        ]
+        self._builder = self._compile_builder(self.key_usage)
+        self._rsa_builder = (
+            self._compile_builder(self.key_usage + self.rsa_key_usage) if self.rsa_key_usage else self._builder
+        )
+
+    def build_csr(
+        self,
+        private_key,
+        common_name: str,
+        subject_alternative_names: Optional[List[str]] = None
+    ) -> str:
+        """
+        Sign a CSR for a loaded private key
+        Args:
+            private_key: Private key object
+            common_name: Common Name (CN) for the certificate
+            subject_alternative_names: Additional domain names or IP addresses
+        Returns: CSR in PEM format
+        """
+        if not common_name or not common_name.strip():
+            raise ValueError("Common Name (CN) is required")
+        common_name = common_name.strip()
+        try:
+            builder = self._rsa_builder if isinstance(private_key, rsa.RSAPrivateKey) else self._builder
+            builder = builder.subject_name(
+                x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, common_name)] + self._subject_suffix)
+            )
+            san_list = CSRService.build_san_list(common_name, subject_alternative_names)
+            if san_list:
+                builder = builder.add_extension(x509.SubjectAlternativeName(san_list), critical=False)
+            csr = builder.sign(private_key, CSRService.signature_hash(private_key))
+            return csr.public_bytes(serialization.Encoding.PEM).decode()
+        except Exception as e:
+            raise ValueError(f"Error creating CSR: {str(e)}")
+
+    def generate_csr(
+        self,
+        private_key_pem: str,
+        common_name: str,
+        subject_alternative_names: Optional[List[str]] = None,
+        password: Optional[str] = None
+    ) -> str:
+        """
+        Sign a CSR for a PEM private key
+        Args:
+            private_key_pem: Private key in PEM format
+            common_name: Common Name (CN) for the certificate
+            subject_alternative_names: Additional domain names or IP addresses
+            password: Password if the private key is encrypted
+        Returns: CSR in PEM format
+        """
+        try:
+            private_key = CSRService.load_private_key(private_key_pem, password)
+        except Exception as e:
+            raise ValueError(f"Error creating CSR: {str(e)}")
+        return self.build_csr(private_key, common_name, subject_alternative_names)
+
+    @staticmethod
+    def from_dict(name: str, data: Dict[str, Any]) -> "CSRProfile":
+        """
+        Profile from a mapping as found in a profiles file
+        Returns: CSRProfile
+        """
+        if not isinstance(data, dict):
+            raise ValueError(f"Profile {name} must be a mapping")
+        unknown = set(data) - {
+            "description", "subject", "key_usage", "rsa_key_usage", "extended_key_usage", "ca", "path_length"
+        }
+        if unknown:
+            raise ValueError(f"Unknown settings in profile {name}: {', '.join(sorted(unknown))}")
+        return CSRProfile(
+            name,
+            description=str(data.get("description") or ""),
+            subject=data.get("subject"),
+            key_usage=data.get("key_usage"),
+            rsa_key_usage=data.get("rsa_key_usage"),
+            extended_key_usage=data.get("extended_key_usage"),
+            ca=data.get("ca"),
+            path_length=data.get("path_length"),
+        )
+
+    def _compile_builder(self, key_usage: Sequence[str]) -> x509.CertificateSigningRequestBuilder:
+        builder = x509.CertificateSigningRequestBuilder()
+        if self.ca is not None:
+            if self.path_length is not None and not self.ca:
+                raise ValueError(f"Path length in profile {self.name} requires a CA profile")
+            builder = builder.add_extension(
+                x509.BasicConstraints(ca=bool(self.ca), path_length=self.path_length),
+                critical=True,
+            )
+        if key_usage:
+            unknown = set(key_usage) - set(KEY_USAGES)
+            if unknown:
+                raise ValueError(
+                    f"Unknown key usage in profile {self.name}: {', '.join(sorted(unknown))}. "
+                    f"Supported key usages are: {', '.join(KEY_USAGES)}"
+                )
+            try:
+                extension = x509.KeyUsage(**{usage: usage in key_usage for usage in KEY_USAGES})
+            except ValueError as e:
+                raise ValueError(f"Invalid key usage in profile {self.name}: {str(e)}")
+            builder = builder.add_extension(extension, critical=True)
+        if self.extended_key_usage:
+            builder = builder.add_extension(
+                x509.ExtendedKeyUsage([self._usage_oid(usage) for usage in self.extended_key_usage]),
+                critical=False,
+            )
+        return builder
+
+    def _usage_oid(self, usage: str) -> x509.ObjectIdentifier:
+        if usage in EXTENDED_KEY_USAGES:
+            return EXTENDED_KEY_USAGES[usage]
+        try:
+            return x509.ObjectIdentifier(usage)
+        except ValueError:
+            raise ValueError(
+                f"Unknown extended key usage in profile {self.name}: {usage}. Use a dotted OID "
+                f"or one of: {', '.join(EXTENDED_KEY_USAGES)}"
+            )
+
+
+_profiles: Dict[str, CSRProfile] = {}
+_profiles_lock = threading.Lock()
+_env_loaded = False
+# Separate from _profiles_lock, which load_profiles takes to register profiles
+_env_lock = threading.Lock()
+
+
+def register_profile(profile: CSRProfile) -> None:
+    """Add or replace a profile in the registry"""
+    with _profiles_lock:
+        _profiles[profile.name] = profile
+
+
+def get_profile(name: str) -> CSRProfile:
+    """
+    Registered profile by name
+    Returns: CSRProfile
+    """
+    _load_env_profiles()
+    with _profiles_lock:
+        profile = _profiles.get(name)
+    if profile is None:
+        raise ValueError(f"Unknown CSR profile: {name}. Available profiles are: {', '.join(list_profiles())}")
+    return profile
+
+
+def list_profiles() -> List[str]:
+    """Returns: Names of the registered profiles"""
+    _load_env_profiles()
+    with _profiles_lock:
+        return sorted(_profiles)
+
+
+def load_profiles(path: str) -> List[CSRProfile]:
+    """
+    Register every profile in a JSON or YAML file, a mapping of profile
+    names to settings, optionally nested under a "profiles" key
+    Returns: The loaded profiles
+    Raises:
+        ValueError: If the file can't be read or holds an invalid profile
+    """
+    is_yaml = path.lower().endswith((".yaml", ".yml"))
+    if is_yaml and yaml is None:
+        raise ValueError("Reading YAML profiles requires PyYAML (pip install pyyaml)")
+    try:
+        with open(path) as f:
+            document = yaml.safe_load(f) if is_yaml else json.load(f)
+    except OSError as e:
+        raise ValueError(f"Cannot read profiles file {path}: {e.strerror or str(e)}")
+    except Exception as e:
+        # json.JSONDecodeError or yaml.YAMLError
+        raise ValueError(f"Invalid profiles file {path}: {str(e)}")
+    if isinstance(document, dict) and isinstance(document.get("profiles"), dict):
+        document = document["profiles"]
+    if not isinstance(document, dict):
+        raise ValueError(f"Profiles file {path} must map profile names to settings")
+
+    # Compile everything before registering, so a bad file changes nothing
+    profiles = [CSRProfile.from_dict(str(name), data) for name, data in document.items()]
+    for profile in profiles:
+        register_profile(profile)
+    return profiles
+
+
+def _load_env_profiles() -> None:
+    """
+    Load the profiles file named by KEYGEN_CSR_PROFILES, once per process.
+    A failed load raises ValueError and is retried on the next call.
+    """
+    global _env_loaded
+    if _env_loaded:
+        return
+    with _env_lock:
+        if _env_loaded:
+            return
+        path = os.environ.get("KEYGEN_CSR_PROFILES")
+        if path:
+            load_profiles(path)
+        _env_loaded = True
+
+
+register_profile(CSRProfile(
+    "internal-web",
+    description="TLS server certificate for internal web services",
+    key_usage=("digital_signature",),
+    # RSA key transport (TLS 1.2 RSA key exchange) needs keyEncipherment
+    rsa_key_usage=("key_encipherment",),
+    extended_key_usage=("server_auth",),
+    ca=False,
+))
+register_profile(CSRProfile(
+    "mtls-client",
+    description="Client certificate for mutual TLS",
+    key_usage=("digital_signature",),
+    extended_key_usage=("client_auth",),
+    ca=False,
+))
@@ -1,11 +1,21 @@
 from cryptography import x509
 from cryptography.x509.oid import NameOID
 from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, ed448
 from cryptography.hazmat.backends import default_backend
-from typing import Optional, List
+from typing import Iterable, Optional, List
 import ipaddress
+from .private_key_cache import PrivateKeyCache
+from .san_ingest import MAX_SAN_BYTES, MAX_SANS, ingest_sans
 
 class CSRService:
+    # Optional cache of unlocked private keys; when set, repeat CSRs from the
+    # same key and password skip PEM parsing and the key's KDF
+    key_cache: Optional[PrivateKeyCache] = None
+    # Limits on the SAN extension, checked before a CSR is signed
+    max_sans: int = MAX_SANS
+    max_san_bytes: int = MAX_SAN_BYTES
+
     @staticmethod
     def is_ip_address(value: str) -> bool:
         """
@@ -23,6 +33,26 @@ class CSRService:
         except ValueError:
             return False
 
+    @staticmethod
+    def signature_hash(private_key) -> Optional[hashes.HashAlgorithm]:
+        """
+        Pick the signature hash that matches the strength of a private key
+
+        Args:
+            private_key: Loaded private key object
+
+        Returns:
+            Hash algorithm to sign with, or None for EdDSA keys which hash internally
+        """
+        if isinstance(private_key, (ed25519.Ed25519PrivateKey, ed448.Ed448PrivateKey)):
+            return None
+        if isinstance(private_key, ec.EllipticCurvePrivateKey):
+            if private_key.curve.key_size > 384:
+                return hashes.SHA512()
+            if private_key.curve.key_size > 256:
+                return hashes.SHA384()
+        return hashes.SHA256()
+
     @staticmethod
     def generate_csr(
         private_key_pem: str,
@@ -39,7 +69,7 @@ class CSRService:
         """
         Generate a Certificate Signing Request (CSR) using a private key
         Args:
-            private_key_pem: Private key in PEM format
+            private_key_pem: Private key (RSA, EC or Ed25519) in PEM format
             common_name: Common Name (CN) for the certificate
             country: Country (C) two-letter code
             state: State/Province (ST)
@@ -48,11 +78,13 @@ class CSRService:
             organizational_unit: Organizational Unit (OU)
             email: Email Address
             password: Password if the private key is encrypted
-            subject_alternative_names: List of Subject Alternative Names (SANs)
+            subject_alternative_names: List of Subject Alternative Names (SANs):
+                DNS names, IP addresses, email addresses or URIs
         Returns:
             CSR in PEM format
         Raises:
-            ValueError: If private_key_pem is invalid or common_name is empty
+            ValueError: If private_key_pem is invalid, common_name is empty, or
+                a SAN is invalid or over the max_sans/max_san_bytes limits
         """
         if not private_key_pem:
             raise ValueError("Private key is required")
@@ -60,15 +92,77 @@ class CSRService:
             raise ValueError("Common Name (CN) is required")
 
         try:
-            # Load private key
-            private_key = serialization.load_pem_private_key(
-                private_key_pem.encode(),
-                password=password.encode() if password else None,
-                backend=default_backend()
-            )
+            private_key = CSRService.load_private_key(private_key_pem, password)
         except Exception as e:
             raise ValueError(f"Invalid private key: {str(e)}")
 
+        return CSRService.generate_csr_for_key(
+            private_key,
+            common_name,
+            country=country,
+            state=state,
+            locality=locality,
+            organization=organization,
+            organizational_unit=organizational_unit,
+            email=email,
+            subject_alternative_names=subject_alternative_names
+        )
+
+    @staticmethod
+    def load_private_key(private_key_pem: str, password: Optional[str] = None):
+        """
+        Load a PEM private key, through key_cache when one is configured
+        Returns: Private key object
+        """
+        if CSRService.key_cache is not None:
+            return CSRService.key_cache.load(private_key_pem, password)
+        return serialization.load_pem_private_key(
+            private_key_pem.encode(),
+            password=password.encode() if password else None,
+            backend=default_backend()
+        )
+
+    @staticmethod
+    def build_san_list(common_name: str, subject_alternative_names: Optional[Iterable[str]] = None) -> List[x509.GeneralName]:
+        """
+        Subject Alternative Name entries for a CSR: the Common Name first,
+        then every other SAN, normalized, deduplicated and checked against
+        max_sans and max_san_bytes
+        """
+        # The Common Name is already in the subject, but modern browsers expect
+        # all valid identifiers to be in the SAN extension as well
+        return ingest_sans(
+            subject_alternative_names or (),
+            common_name,
+            max_count=CSRService.max_sans,
+            max_bytes=CSRService.max_san_bytes
+        )
+
+    @staticmethod
+    def generate_csr_for_key(
+        private_key,
+        common_name: str,
+        country: Optional[str] = None,
+        state: Optional[str] = None,
+        locality: Optional[str] = None,
+        organization: Optional[str] = None,
+        organizational_unit: Optional[str] = None,
+        email: Optional[str] = None,
+        subject_alternative_names: Optional[List[str]] = None
+    ) -> str:
+        """
+        Generate a CSR with an already loaded private key, skipping PEM parsing
+        and key decryption
+        Args:
+            private_key: Private key object (RSA, EC or Ed25519)
+            common_name, country, state, locality, organization,
+            organizational_unit, email, subject_alternative_names: As for generate_csr
+        Returns:
+            CSR in PEM format
+        """
+        if not common_name:
+            raise ValueError("Common Name (CN) is required")
+
         # Prepare subject attributes
         attributes = []
         attributes.append(x509.NameAttribute(NameOID.COMMON_NAME, common_name))
@@ -92,29 +186,7 @@ class CSRService:
             builder = builder.subject_name(x509.Name(attributes))
             
             # Add Subject Alternative Names if provided
-            san_list = []
-            
-            # Add Common Name as SAN if it's an IP address
-            # The Common Name is already in the subject, but modern browsers expect
-            # all valid identifiers to be in the SAN extension as well
-            if CSRService.is_ip_address(common_name):
-                san_list.append(x509.IPAddress(ipaddress.ip_address(common_name)))
-            else:
-                san_list.append(x509.DNSName(common_name))
-            
-            # Add additional SANs if provided
-            if subject_alternative_names and len(subject_alternative_names) > 0:
-                for name in subject_alternative_names:
-                    if name and name.strip():
-                        name = name.strip()
-                        # Skip if it's identical to common_name (already added)
-                        if name == common_name:
-                            continue
-                        # Check if the name is an IP address
-                        if CSRService.is_ip_address(name):
-                            san_list.append(x509.IPAddress(ipaddress.ip_address(name)))
-                        else:
-                            san_list.append(x509.DNSName(name))
+            san_list = CSRService.build_san_list(common_name, subject_alternative_names)
             
             if san_list:
                 builder = builder.add_extension(
@@ -124,7 +196,7 @@ class CSRService:
             
             csr = builder.sign(
                 private_key=private_key,
-                algorithm=hashes.SHA256(),
+                algorithm=CSRService.signature_hash(private_key),
                 backend=default_backend()
             )
 
@@ -3,12 +3,223 @@ CSR Validation Service for parsing and validating Certificate Signing Requests
 """
 from cryptography import x509
 from cryptography.hazmat.backends import default_backend
-from cryptography.hazmat.primitives import hashes
-from cryptography.hazmat.primitives.asymmetric import rsa, ec, dsa
-from cryptography.x509.oid import NameOID, ExtensionOID
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa, ec, dsa, ed25519, ed448
+from cryptography.x509.oid import NameOID
 import base64
+import hashlib
 import re
-from typing import Dict, Any, List, Optional, Tuple
+from typing import Dict, Any, List, Optional, Tuple, Union
+
+# Subject attributes by the field names used in parsed CSRs
+SUBJECT_FIELDS = {
+    NameOID.COMMON_NAME: "common_name",
+    NameOID.COUNTRY_NAME: "country",
+    NameOID.STATE_OR_PROVINCE_NAME: "state",
+    NameOID.LOCALITY_NAME: "locality",
+    NameOID.ORGANIZATION_NAME: "organization",
+    NameOID.ORGANIZATIONAL_UNIT_NAME: "organizational_unit",
+    NameOID.EMAIL_ADDRESS: "email_address",
+    NameOID.DOMAIN_COMPONENT: "domain_component",
+    NameOID.SURNAME: "surname",
+    NameOID.GIVEN_NAME: "given_name",
+    NameOID.TITLE: "title",
+    NameOID.SERIAL_NUMBER: "serial_number",
+    NameOID.PSEUDONYM: "pseudonym",
+    NameOID.GENERATION_QUALIFIER: "generation_qualifier",
+}
+
+FINGERPRINT_HASHES = ("sha1", "sha256", "sha384", "sha512")
+
+KEY_USAGES = (
+    "digital_signature",
+    "content_commitment",
+    "key_encipherment",
+    "data_encipherment",
+    "key_agreement",
+    "key_cert_sign",
+    "crl_sign",
+)
+
+SAN_TYPES = (
+    (x509.DNSName, "DNS"),
+    (x509.IPAddress, "IP"),
+    (x509.RFC822Name, "Email"),
+    (x509.UniformResourceIdentifier, "URI"),
+)
+
+
+class _lazy:
+    """Read-only attribute computed on first access and kept in a slot"""
+
+    def __init__(self, func):
+        self.func = func
+        self.__doc__ = func.__doc__
+
+    def __set_name__(self, owner, name):
+        self.slot = owner.__dict__["_" + name]
+
+    def __get__(self, obj, owner=None):
+        if obj is None:
+            return self
+        try:
+            return self.slot.__get__(obj, owner)
+        except AttributeError:
+            value = self.func(obj)
+            self.slot.__set__(obj, value)
+            return value
+
+
+class ParsedCSR:
+    """
+    A loaded CSR whose details are computed on first access, so a scan that
+    only needs the CN never verifies signatures, walks extensions or hashes
+    """
+
+    __slots__ = (
+        "csr",
+        "_der",
+        "_valid",
+        "_version",
+        "_common_name",
+        "_subject",
+        "_public_key",
+        "_signature_algorithm",
+        "_fingerprints",
+        "_subject_alternative_names",
+        "_extensions",
+    )
+
+    def __init__(self, csr_text: Union[str, bytes]):
+        """
+        Args:
+            csr_text: The CSR in PEM format
+
+        Raises:
+            ValueError: If the CSR can't be loaded
+        """
+        try:
+            data = csr_text.encode("utf-8") if isinstance(csr_text, str) else csr_text
+            self.csr = x509.load_pem_x509_csr(data, default_backend())
+        except Exception as e:
+            raise ValueError(f"Failed to parse CSR: {str(e)}")
+
+    @_lazy
+    def der(self) -> bytes:
+        """DER encoding of the CSR, serialized once"""
+        return self.csr.public_bytes(serialization.Encoding.DER)
+
+    @_lazy
+    def valid(self) -> bool:
+        """Whether the CSR is signed by its own key"""
+        return self.csr.is_signature_valid
+
+    @_lazy
+    def version(self) -> str:
+        version = getattr(self.csr, "version", None)
+        return version.name if hasattr(version, "name") else "Unknown"
+
+    @_lazy
+    def common_name(self) -> Optional[str]:
+        """First Common Name in the subject, or None"""
+        attributes = self.csr.subject.get_attributes_for_oid(NameOID.COMMON_NAME)
+        return attributes[0].value if attributes else None
+
+    @_lazy
+    def subject(self) -> Dict[str, Any]:
+        """Subject fields; repeated fields map to a list of values"""
+        subject_info: Dict[str, Any] = {}
+        for attr in self.csr.subject:
+            field_name = SUBJECT_FIELDS.get(attr.oid) or f"oid_{attr.oid.dotted_string}"
+            if field_name in subject_info:
+                # Handle multiple values for the same field
+                if isinstance(subject_info[field_name], list):
+                    subject_info[field_name].append(attr.value)
+                else:
+                    subject_info[field_name] = [subject_info[field_name], attr.value]
+            else:
+                subject_info[field_name] = attr.value
+        return subject_info
+
+    @_lazy
+    def public_key(self) -> Dict[str, Any]:
+        """Algorithm, key size and algorithm specific details of the public key"""
+        public_key = self.csr.public_key()
+        if isinstance(public_key, rsa.RSAPublicKey):
+            return {"algorithm": "RSA", "key_size": public_key.key_size, "public_exponent": public_key.public_numbers().e}
+        if isinstance(public_key, ec.EllipticCurvePublicKey):
+            return {"algorithm": "ECC", "key_size": public_key.key_size, "curve": public_key.curve.name}
+        if isinstance(public_key, dsa.DSAPublicKey):
+            return {"algorithm": "DSA", "key_size": public_key.key_size}
+        if isinstance(public_key, ed25519.Ed25519PublicKey):
+            return {"algorithm": "Ed25519", "key_size": 256}
+        if isinstance(public_key, ed448.Ed448PublicKey):
+            return {"algorithm": "Ed448", "key_size": 456}
+        return {"algorithm": "Unknown"}
+
+    @_lazy
+    def signature_algorithm(self) -> str:
+        oid = self.csr.signature_algorithm_oid
+        return getattr(oid, "_name", None) or oid.dotted_string
+
+    @_lazy
+    def fingerprints(self) -> Dict[str, str]:
+        """Hex digests of the DER encoding, keyed by hash name"""
+        return {name: self.fingerprint(name) for name in FINGERPRINT_HASHES}
+
+    def fingerprint(self, hash_name: str = "sha256") -> str:
+        """Hex digest of the DER encoding with one hashlib algorithm"""
+        return hashlib.new(hash_name, self.der).hexdigest()
+
+    @_lazy
+    def subject_alternative_names(self) -> List[Dict[str, str]]:
+        """SAN entries as {"type", "value"}"""
+        try:
+            san_value = self.csr.extensions.get_extension_for_class(x509.SubjectAlternativeName).value
+        except x509.ExtensionNotFound:
+            return []
+        sans = []
+        for name in san_value:
+            san_type = next((label for cls, label in SAN_TYPES if isinstance(name, cls)), None)
+            if san_type is None:
+                sans.append({"type": "Other", "value": str(name)})
+            else:
+                sans.append({"type": san_type, "value": str(name.value)})
+        return sans
+
+    @_lazy
+    def extensions(self) -> Dict[str, Any]:
+        """SubjectAlternativeName, KeyUsage, ExtendedKeyUsage and BasicConstraints, when present"""
+        extensions: Dict[str, Any] = {}
+        if self.subject_alternative_names:
+            extensions["subject_alternative_name"] = self.subject_alternative_names
+        for ext in self.csr.extensions:
+            value = ext.value
+            if isinstance(value, x509.KeyUsage):
+                usages = [usage for usage in KEY_USAGES if getattr(value, usage)]
+                if value.key_agreement:
+                    usages += [usage for usage in ("encipher_only", "decipher_only") if getattr(value, usage)]
+                extensions["key_usage"] = usages
+            elif isinstance(value, x509.ExtendedKeyUsage):
+                extensions["extended_key_usage"] = [getattr(oid, "_name", None) or oid.dotted_string for oid in value]
+            elif isinstance(value, x509.BasicConstraints):
+                extensions["basic_constraints"] = (
+                    f"CA: {value.ca}" + (f", path length: {value.path_length}" if value.path_length is not None else "")
+                )
+        return extensions
+
+    def to_dict(self) -> Dict[str, Any]:
+        """All details in the format returned by CSRValidationService.parse_csr"""
+        return {
+            "valid": self.valid,
+            "version": self.version,
+            "subject": self.subject,
+            "public_key": self.public_key,
+            "signature_algorithm": self.signature_algorithm,
+            "fingerprints": self.fingerprints,
+            "extensions": self.extensions,
+        }
+
 
 class CSRValidationService:
     """
@@ -56,6 +267,9 @@ class CSRValidationService:
     def parse_csr(csr_text: str) -> Dict[str, Any]:
         """
         Parse a CSR and extract detailed information
+
+        Compatibility wrapper around ParsedCSR, which computes only the
+        fields a caller reads
         
         Args:
             csr_text: The CSR in PEM format
@@ -66,158 +280,9 @@ class CSRValidationService:
         Raises:
             ValueError: If the CSR is invalid or can't be parsed
         """
+        parsed = ParsedCSR(csr_text)
         try:
-            # Load the CSR
-            csr = x509.load_pem_x509_csr(csr_text.encode('utf-8'), default_backend())
-            
-            # Extract basic information
-            result = {
-                "valid": csr.is_signature_valid
-            }
-            
-            # Try to get version - this might not be available in all cryptography versions
-            try:
-                version = getattr(csr, "version", None)
-                if version is not None and hasattr(version, "name"):
-                    result["version"] = version.name
-                else:
-                    result["version"] = "Unknown"
-            except (AttributeError, TypeError):
-                result["version"] = "v1"  # Most CSRs are v1 by default
-            
-            # Extract subject information
-            subject = csr.subject
-            subject_info = {}
-            
-            # Common attributes to extract
-            oid_map = {
-                NameOID.COMMON_NAME: "common_name",
-                NameOID.COUNTRY_NAME: "country",
-                NameOID.STATE_OR_PROVINCE_NAME: "state",
-                NameOID.LOCALITY_NAME: "locality",
-                NameOID.ORGANIZATION_NAME: "organization",
-                NameOID.ORGANIZATIONAL_UNIT_NAME: "organizational_unit",
-                NameOID.EMAIL_ADDRESS: "email_address",
-                NameOID.DOMAIN_COMPONENT: "domain_component",
-                NameOID.SURNAME: "surname",
-                NameOID.GIVEN_NAME: "given_name",
-                NameOID.TITLE: "title",
-                NameOID.SERIAL_NUMBER: "serial_number",
-                NameOID.PSEUDONYM: "pseudonym",
-                NameOID.GENERATION_QUALIFIER: "generation_qualifier",
-            }
-            
-            for attr in subject:
-                oid = attr.oid
-                if oid in oid_map:
-                    field_name = oid_map[oid]
-                    if field_name in subject_info:
-                        # Handle multiple values for the same field
-                        if isinstance(subject_info[field_name], list):
-                            subject_info[field_name].append(attr.value)
-                        else:
-                            subject_info[field_name] = [subject_info[field_name], attr.value]
-                    else:
-                        subject_info[field_name] = attr.value
-                else:
-                    # Handle unknown OIDs
-                    subject_info[f"oid_{oid.dotted_string}"] = attr.value
-            
-            result["subject"] = subject_info
-            
-            # Extract public key information
-            public_key = csr.public_key()
-            key_info = {}
-            
-            if isinstance(public_key, rsa.RSAPublicKey):
-                key_info["algorithm"] = "RSA"
-                key_info["key_size"] = public_key.key_size
-                key_info["public_exponent"] = public_key.public_numbers().e
-            elif isinstance(public_key, ec.EllipticCurvePublicKey):
-                key_info["algorithm"] = "ECC"
-                key_info["key_size"] = public_key.key_size
-                try:
-                    key_info["curve"] = public_key.curve.name
-                except AttributeError:
-                    # Fallback if curve name is not directly accessible
-                    curve_name = str(public_key.curve)
-                    curve_name = curve_name.split(".")[-1] if "." in curve_name else curve_name
-                    key_info["curve"] = curve_name
-            elif isinstance(public_key, dsa.DSAPublicKey):
-                key_info["algorithm"] = "DSA"
-                key_info["key_size"] = public_key.key_size
-            else:
-                key_info["algorithm"] = "Unknown"
-            
-            result["public_key"] = key_info
-            
-            # Extract signature algorithm
-            try:
-                sig_alg = csr.signature_algorithm_oid
-                result["signature_algorithm"] = sig_alg._name
-            except (AttributeError, TypeError):
-                # Fallback method to get signature algorithm
-                result["signature_algorithm"] = str(csr.signature_algorithm_oid).split('.')[-1]
-            
-            # Calculate fingerprints
-            fingerprints = {}
-            for hash_class in [hashes.SHA1, hashes.SHA256, hashes.SHA384, hashes.SHA512]:
-                hash_name = hash_class.name
-                digest = csr.public_bytes(encoding=x509.encoding.PEM)
-                fingerprint = hash_class()
-                fingerprint.update(digest)
-                fingerprints[hash_name] = fingerprint.finalize().hex()
-            
-            result["fingerprints"] = fingerprints
-            
-            # Extract extensions
-            extensions = {}
-            
-            # Try to get SubjectAlternativeName
-            try:
-                san_extension = csr.extensions.get_extension_for_oid(ExtensionOID.SUBJECT_ALTERNATIVE_NAME)
-                san_value = san_extension.value
-                
-                sans = []
-                for name in san_value:
-                    if isinstance(name, x509.DNSName):
-                        sans.append({"type": "DNS", "value": name.value})
-                    elif isinstance(name, x509.IPAddress):
-                        sans.append({"type": "IP", "value": str(name.value)})
-                    elif isinstance(name, x509.RFC822Name):
-                        sans.append({"type": "Email", "value": name.value})
-                    elif isinstance(name, x509.UniformResourceIdentifier):
-                        sans.append({"type": "URI", "value": name.value})
-                    else:
-                        sans.append({"type": "Other", "value": str(name)})
-                
-                extensions["subject_alternative_name"] = sans
-            except (x509.ExtensionNotFound, AttributeError):
-                pass
-            
-            # Try to get other common extensions
-            ext_oids = [
-                (ExtensionOID.KEY_USAGE, "key_usage"),
-                (ExtensionOID.EXTENDED_KEY_USAGE, "extended_key_usage"),
-                (ExtensionOID.BASIC_CONSTRAINTS, "basic_constraints")
-            ]
-            
-            for oid, name in ext_oids:
-                try:
-                    ext = csr.extensions.get_extension_for_oid(oid)
-                    if hasattr(ext.value, 'oid'):
-                        extensions[name] = [o._name for o in ext.value]
-                    elif hasattr(ext.value, '__iter__') and not isinstance(ext.value, str):
-                        extensions[name] = list(ext.value)
-                    else:
-                        extensions[name] = str(ext.value)
-                except (x509.ExtensionNotFound, AttributeError):
-                    pass
-            
-            result["extensions"] = extensions
-            
-            return result
-            
+            return parsed.to_dict()
         except Exception as e:
             raise ValueError(f"Failed to parse CSR: {str(e)}")
     
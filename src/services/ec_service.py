@@ -0,0 +1,49 @@
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519
+from cryptography.hazmat.backends import default_backend
+from typing import Tuple
+from .key_handle import KeyHandle
+
+class ECService:
+    # Curve names accepted by generate_keypair
+    SUPPORTED_CURVES = ("P-256", "P-384", "Ed25519")
+
+    _NIST_CURVES = {
+        "P-256": ec.SECP256R1,
+        "P-384": ec.SECP384R1,
+    }
+
+    @staticmethod
+    def generate_keypair(
+        curve: str = "P-256",
+        password: str = None
+    ) -> Tuple[str, str]:
+        """
+        Generate an elliptic-curve keypair (NIST P-256/P-384 or Ed25519)
+        Returns: (public_key, private_key) as PEM strings, the private key in
+            PKCS8 and the public key as SubjectPublicKeyInfo
+        """
+        handle = ECService.generate_key(curve, password)
+        return handle.spki_pem, handle.pkcs8_pem
+
+    @staticmethod
+    def generate_key(
+        curve: str = "P-256",
+        password: str = None
+    ) -> KeyHandle:
+        """
+        Generate an elliptic-curve key without serializing it
+        Returns: KeyHandle that encodes the key on demand
+        """
+        if curve in ECService._NIST_CURVES:
+            private_key = ec.generate_private_key(
+                ECService._NIST_CURVES[curve](),
+                backend=default_backend()
+            )
+        elif curve == "Ed25519":
+            private_key = ed25519.Ed25519PrivateKey.generate()
+        else:
+            raise ValueError(
+                f"Unsupported curve: {curve}. Supported curves are: {', '.join(ECService.SUPPORTED_CURVES)}"
+            )
+
+        return KeyHandle(private_key, password)
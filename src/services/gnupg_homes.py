@@ -0,0 +1,200 @@
+"""
+Ephemeral GnuPG homedirs: placement on RAM-backed storage, removal and a
+sweeper for homedirs left behind by processes that no longer exist
+"""
+from typing import Dict, Optional
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from .kdf_policy import KDFCostPolicy
+
+try:
+    import fcntl
+except ImportError:  # Not on POSIX; the sweeper falls back to owner PIDs
+    fcntl = None
+
+# Homedir names are "<prefix><owner pid>-<random>"; the PID is informational
+HOMEDIR_PREFIX = "keygen-gnupg-"
+
+# File inside each homedir that its owning process holds an exclusive flock
+# on. The kernel drops the lock when the process exits, so ownership holds
+# across PID namespaces and PID reuse, unlike checking whether the PID runs.
+OWNER_LOCK = ".keygen-owner.lock"
+
+AGENT_CONF = "gpg-agent.conf"
+
+# Bookkeeping files that live as long as the homedir; anything that clears
+# a homedir's keyring for reuse must leave these in place
+HOMEDIR_FILES = (AGENT_CONF, OWNER_LOCK)
+
+# Homedirs without an owner lock (created before locks, or by a process
+# that died between creating the directory and its lock) are only swept
+# once they have not been modified for this many seconds
+UNLOCKED_GRACE_SECONDS = 3600
+
+# homedir -> descriptor holding its owner lock, for homedirs of this process
+_owner_locks: Dict[str, int] = {}
+_owner_locks_lock = threading.Lock()
+
+# RAM-backed directories tried in order when no base directory is configured
+RAM_DIRS = ("/dev/shm",)
+
+
+def default_base_dir() -> Optional[str]:
+    """
+    Directory new homedirs are created in: $KEYGEN_GNUPG_HOME_DIR if set,
+    else the first writable RAM-backed directory, else None (system temp dir)
+    """
+    configured = os.environ.get("KEYGEN_GNUPG_HOME_DIR")
+    if configured:
+        return configured
+    for path in RAM_DIRS:
+        if os.path.isdir(path) and os.access(path, os.W_OK | os.X_OK):
+            return path
+    return None
+
+
+def create_homedir(base_dir: Optional[str] = None) -> str:
+    """
+    Create a private (0700) homedir
+    Args:
+        base_dir: Parent directory, defaults to default_base_dir()
+    Returns: Path of the new homedir
+    """
+    path = tempfile.mkdtemp(prefix=f"{HOMEDIR_PREFIX}{os.getpid()}-", dir=base_dir or default_base_dir())
+    if fcntl is not None:
+        fd = os.open(os.path.join(path, OWNER_LOCK), os.O_RDWR | os.O_CREAT | os.O_EXCL, 0o600)
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        with _owner_locks_lock:
+            _owner_locks[path] = fd
+    return path
+
+
+def write_agent_conf(homedir: str, kdf_policy: KDFCostPolicy) -> None:
+    """Write gpg-agent.conf with the KDF cost settings"""
+    with open(os.path.join(homedir, AGENT_CONF), "w") as f:
+        f.write("\n".join(kdf_policy.gpg_agent_options()) + "\n")
+
+
+def clear_passphrase_cache(homedir: str) -> None:
+    """
+    Make the homedir's gpg-agent forget cached passphrases, so the next
+    operation has to present the right one again
+
+    A zero cache TTL is not an option: gpg relies on the cache to protect
+    subkeys during key generation.
+    """
+    subprocess.run(
+        ["gpgconf", "--homedir", homedir, "--reload", "gpg-agent"],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        timeout=10
+    )
+
+
+def remove_homedir(path: str, kill_agent: bool = True) -> None:
+    """
+    Stop the homedir's gpg-agent and delete the homedir
+    Args:
+        kill_agent: Skip this when gpg never ran against the homedir
+    """
+    if not os.path.isdir(path):
+        _release_owner_lock(path)
+        return
+    if kill_agent:
+        try:
+            subprocess.run(
+                ["gpgconf", "--homedir", path, "--kill", "gpg-agent"],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                timeout=10
+            )
+        except Exception:
+            pass  # The agent exits on its own once its homedir is gone
+    shutil.rmtree(path, ignore_errors=True)
+    _release_owner_lock(path)
+
+
+def sweep_stale_homedirs(base_dir: Optional[str] = None) -> int:
+    """
+    Remove homedirs whose owning process has exited
+
+    A homedir is stale when nobody holds its owner lock, which is safe on a
+    base directory shared between containers or kept across restarts.
+
+    Args:
+        base_dir: Directory to sweep, defaults to default_base_dir()
+    Returns: Number of homedirs removed
+    """
+    base_dir = base_dir or default_base_dir() or tempfile.gettempdir()
+    try:
+        entries = os.listdir(base_dir)
+    except OSError:
+        return 0
+
+    removed = 0
+    for entry in entries:
+        if not entry.startswith(HOMEDIR_PREFIX):
+            continue
+        path = os.path.join(base_dir, entry)
+        try:
+            if os.path.islink(path) or os.stat(path).st_uid != os.getuid():
+                continue
+        except OSError:
+            continue
+        if fcntl is None:
+            owner = entry[len(HOMEDIR_PREFIX):].split("-", 1)[0]
+            if owner.isdigit() and not _process_alive(int(owner)):
+                remove_homedir(path)
+                removed += 1
+            continue
+        if _remove_if_unowned(path):
+            removed += 1
+    return removed
+
+
+def _remove_if_unowned(path: str) -> bool:
+    """Remove a homedir unless another process holds its owner lock"""
+    try:
+        fd = os.open(os.path.join(path, OWNER_LOCK), os.O_RDWR | os.O_NOFOLLOW)
+    except FileNotFoundError:
+        try:
+            idle = time.time() - os.stat(path).st_mtime
+        except OSError:
+            return False
+        if idle < UNLOCKED_GRACE_SECONDS:
+            return False
+        remove_homedir(path)
+        return True
+    except OSError:
+        return False
+    try:
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            return False  # Held by a live process
+        # Holding the lock while deleting keeps a concurrent sweeper out
+        remove_homedir(path)
+        return True
+    finally:
+        os.close(fd)
+
+
+def _release_owner_lock(path: str) -> None:
+    with _owner_locks_lock:
+        fd = _owner_locks.pop(path, None)
+    if fd is not None:
+        os.close(fd)
+
+
+def _process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True  # Exists but belongs to another user
+    return True
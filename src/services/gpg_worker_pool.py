@@ -0,0 +1,208 @@
+"""
+Pool of long-lived GnuPG workers, each with its own isolated homedir
+"""
+from contextlib import contextmanager
+from typing import Iterator, List, Optional
+import gnupg
+import os
+import queue
+import shutil
+import threading
+from .gnupg_homes import HOMEDIR_FILES, clear_passphrase_cache, create_homedir, remove_homedir, write_agent_conf
+from .kdf_policy import KDFCostPolicy, get_kdf_policy
+
+
+class GPGWorker:
+    """
+    A GnuPG homedir and gpg instance that outlive a single request.
+
+    gpg-agent and the homedir layout stay in place between jobs; only the
+    keyring contents are scrubbed, so the next job starts from an empty
+    keyring without paying the full homedir bootstrap again.
+    """
+
+    # Homedir entries that survive a scrub: the homedir's bookkeeping files
+    # (agent config, owner lock), agent sockets and the RNG seed
+    _KEEP = HOMEDIR_FILES + ("random_seed",)
+
+    def __init__(self, kdf_policy: KDFCostPolicy, base_dir: Optional[str] = None):
+        """
+        Args:
+            kdf_policy: KDF cost policy written to the worker's gpg-agent.conf
+            base_dir: Directory to create the homedir in (RAM-backed if available by default)
+        """
+        self.gnupghome = create_homedir(base_dir)
+        self.kdf_target_ms = kdf_policy.target_ms
+        self.jobs = 0
+        write_agent_conf(self.gnupghome, kdf_policy)
+        self.gpg = gnupg.GPG(
+            gnupghome=self.gnupghome,
+            use_agent=False,
+            options=['--no-tty']
+        )
+
+    def scrub(self) -> None:
+        """
+        Remove every key, trust entry and revocation certificate from the
+        homedir and clear the agent's passphrase cache
+        """
+        for entry in os.listdir(self.gnupghome):
+            if entry in self._KEEP or entry.startswith("S."):
+                continue
+            path = os.path.join(self.gnupghome, entry)
+            if os.path.isdir(path) and not os.path.islink(path):
+                for child in os.listdir(path):
+                    child_path = os.path.join(path, child)
+                    if os.path.isdir(child_path) and not os.path.islink(child_path):
+                        shutil.rmtree(child_path, ignore_errors=True)
+                    else:
+                        os.unlink(child_path)
+            else:
+                os.unlink(path)
+        clear_passphrase_cache(self.gnupghome)
+
+    def is_healthy(self) -> bool:
+        """Check that the homedir exists and gpg still runs against it with an empty keyring"""
+        if not os.path.isdir(self.gnupghome):
+            return False
+        try:
+            keys = self.gpg.list_keys()
+        except Exception:
+            return False
+        return keys.returncode == 0 and len(keys) == 0
+
+    def close(self) -> None:
+        """Stop the worker's gpg-agent and delete its homedir"""
+        remove_homedir(self.gnupghome)
+
+
+class GPGWorkerPool:
+    """
+    Hands out GPGWorker instances for the duration of one job.
+
+    Workers are created lazily up to ``size``, scrubbed after every job,
+    health checked before going back into the pool and recycled after
+    ``max_jobs`` jobs, after a failed job or when the KDF policy changes.
+    """
+
+    def __init__(
+        self,
+        size: int = 2,
+        max_jobs: int = 100,
+        base_dir: Optional[str] = None,
+        kdf_policy: Optional[KDFCostPolicy] = None
+    ):
+        """
+        Args:
+            size: Maximum number of concurrent workers
+            max_jobs: Recycle a worker after this many jobs
+            base_dir: Directory to create worker homedirs in
+            kdf_policy: KDF cost policy for the workers (process-wide policy by default)
+        """
+        if size < 1:
+            raise ValueError("Pool size must be at least 1")
+        if max_jobs < 1:
+            raise ValueError("max_jobs must be at least 1")
+        self.size = size
+        self.max_jobs = max_jobs
+        self.base_dir = base_dir
+        self.kdf_policy = kdf_policy
+        self._idle: "queue.Queue[GPGWorker]" = queue.Queue()
+        self._created = 0
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _policy(self) -> KDFCostPolicy:
+        return self.kdf_policy or get_kdf_policy()
+
+    def _start_worker(self) -> GPGWorker:
+        # The caller has already counted this worker in self._created
+        try:
+            return GPGWorker(self._policy(), self.base_dir)
+        except Exception:
+            with self._lock:
+                self._created -= 1
+            raise
+
+    def _checkout(self) -> GPGWorker:
+        while True:
+            if self._closed:
+                raise RuntimeError("GnuPG worker pool is closed")
+            try:
+                return self._idle.get_nowait()
+            except queue.Empty:
+                pass
+            with self._lock:
+                create = self._created < self.size
+                if create:
+                    self._created += 1
+            if create:
+                return self._start_worker()
+            try:
+                # Wait for a busy worker, re-checking in case one was retired without replacement
+                return self._idle.get(timeout=1)
+            except queue.Empty:
+                continue
+
+    def _checkin(self, worker: GPGWorker, failed: bool) -> None:
+        if not failed:
+            try:
+                worker.scrub()
+            except Exception:
+                # A worker that may still hold keys or cached passphrases is retired
+                failed = True
+        recycle = (
+            failed
+            or self._closed
+            or worker.jobs >= self.max_jobs
+            or worker.kdf_target_ms != self._policy().target_ms
+            or not worker.is_healthy()
+        )
+        if not recycle:
+            self._idle.put(worker)
+            return
+
+        worker.close()
+        if self._closed:
+            with self._lock:
+                self._created -= 1
+            return
+        # Replace the retired worker right away so the next job finds a warm one
+        try:
+            self._idle.put(self._start_worker())
+        except Exception:
+            pass
+
+    @contextmanager
+    def worker(self) -> Iterator[GPGWorker]:
+        """
+        Borrow a worker for one job, blocking while all workers are busy
+
+        The keyring is empty when the worker is handed out and is scrubbed
+        again when the block exits.
+        """
+        worker = self._checkout()
+        failed = False
+        try:
+            yield worker
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            worker.jobs += 1
+            self._checkin(worker, failed)
+
+    def close(self) -> None:
+        """Shut down all idle workers; busy workers are shut down when returned"""
+        with self._lock:
+            self._closed = True
+        workers: List[GPGWorker] = []
+        while True:
+            try:
+                workers.append(self._idle.get_nowait())
+            except queue.Empty:
+                break
+        for worker in workers:
+            worker.close()
+            with self._lock:
+                self._created -= 1
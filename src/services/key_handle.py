@@ -0,0 +1,157 @@
+"""
+Key handle that serializes a generated private key lazily, in any supported format
+"""
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa, ec, ed25519
+from functools import cached_property
+from typing import Optional, Union
+from .kdf_policy import KDFCostPolicy, get_kdf_policy
+
+class KeyHandle:
+    """
+    Wraps a generated private key and produces its encodings on demand.
+
+    Each encoding is computed on first access and cached, so exporting the
+    same key several ways never re-parses PEM and encrypts each private
+    format only once.
+    """
+
+    # Names accepted by export()
+    FORMATS = (
+        "pkcs1_pem",
+        "pkcs8_pem",
+        "pkcs8_der",
+        "openssh_private",
+        "spki_pem",
+        "spki_der",
+        "openssh_public",
+        "raw_public",
+    )
+
+    def __init__(
+        self,
+        private_key,
+        password: Optional[str] = None,
+        comment: str = "",
+        kdf_policy: Optional[KDFCostPolicy] = None
+    ):
+        """
+        Args:
+            private_key: Private key object (RSA, EC or Ed25519)
+            password: Optional password used to encrypt every private encoding
+            comment: Comment appended to the OpenSSH public key line
+            kdf_policy: KDF cost policy for encrypted PKCS8/OpenSSH output
+                (defaults to the process-wide policy)
+        """
+        self.private_key = private_key
+        self.password = password
+        self.comment = comment
+        self.kdf_policy = kdf_policy
+
+    @cached_property
+    def public_key(self):
+        return self.private_key.public_key()
+
+    def export(self, fmt: str) -> Union[str, bytes]:
+        """
+        Get the key in the named format
+        Returns: str for PEM/OpenSSH text formats, bytes for DER/raw formats
+        """
+        if fmt not in self.FORMATS:
+            raise ValueError(f"Unsupported format: {fmt}. Supported formats are: {', '.join(self.FORMATS)}")
+        return getattr(self, fmt)
+
+    def _policy(self) -> KDFCostPolicy:
+        return self.kdf_policy or get_kdf_policy()
+
+    def _encryption(self) -> serialization.KeySerializationEncryption:
+        # Traditional PEM encryption has no tunable KDF, so the policy does not apply
+        if self.password:
+            return serialization.BestAvailableEncryption(self.password.encode())
+        return serialization.NoEncryption()
+
+    def _pkcs8(self, encoding: serialization.Encoding) -> bytes:
+        if self.password:
+            return self._policy().encrypt_pkcs8(self.private_key, self.password, encoding)
+        return self.private_key.private_bytes(
+            encoding=encoding,
+            format=serialization.PrivateFormat.PKCS8,
+            encryption_algorithm=serialization.NoEncryption()
+        )
+
+    @cached_property
+    def pkcs1_pem(self) -> str:
+        """Traditional OpenSSL PEM (PKCS1 for RSA, SEC1 for EC)"""
+        if isinstance(self.private_key, ed25519.Ed25519PrivateKey):
+            raise ValueError("Ed25519 keys have no PKCS1/traditional encoding")
+        return self.private_key.private_bytes(
+            encoding=serialization.Encoding.PEM,
+            format=serialization.PrivateFormat.TraditionalOpenSSL,
+            encryption_algorithm=self._encryption()
+        ).decode()
+
+    @cached_property
+    def pkcs8_pem(self) -> str:
+        return self._pkcs8(serialization.Encoding.PEM).decode()
+
+    @cached_property
+    def pkcs8_der(self) -> bytes:
+        return self._pkcs8(serialization.Encoding.DER)
+
+    @cached_property
+    def openssh_private(self) -> str:
+        encryption = (
+            self._policy().openssh_encryption(self.password)
+            if self.password else serialization.NoEncryption()
+        )
+        return self.private_key.private_bytes(
+            encoding=serialization.Encoding.PEM,
+            format=serialization.PrivateFormat.OpenSSH,
+            encryption_algorithm=encryption
+        ).decode()
+
+    @cached_property
+    def spki_pem(self) -> str:
+        return self.public_key.public_bytes(
+            encoding=serialization.Encoding.PEM,
+            format=serialization.PublicFormat.SubjectPublicKeyInfo
+        ).decode()
+
+    @cached_property
+    def spki_der(self) -> bytes:
+        return self.public_key.public_bytes(
+            encoding=serialization.Encoding.DER,
+            format=serialization.PublicFormat.SubjectPublicKeyInfo
+        )
+
+    @cached_property
+    def openssh_public(self) -> str:
+        """Public key line as used in authorized_keys, with the comment if set"""
+        line = self.public_key.public_bytes(
+            encoding=serialization.Encoding.OpenSSH,
+            format=serialization.PublicFormat.OpenSSH
+        ).decode()
+        return f"{line} {self.comment}" if self.comment else line
+
+    @cached_property
+    def raw_public(self) -> bytes:
+        """
+        Raw public key: the 32 key bytes for Ed25519, the uncompressed point
+        for EC and the PKCS1 RSAPublicKey structure (DER) for RSA
+        """
+        if isinstance(self.public_key, ed25519.Ed25519PublicKey):
+            return self.public_key.public_bytes(
+                encoding=serialization.Encoding.Raw,
+                format=serialization.PublicFormat.Raw
+            )
+        if isinstance(self.public_key, ec.EllipticCurvePublicKey):
+            return self.public_key.public_bytes(
+                encoding=serialization.Encoding.X962,
+                format=serialization.PublicFormat.UncompressedPoint
+            )
+        if isinstance(self.public_key, rsa.RSAPublicKey):
+            return self.public_key.public_bytes(
+                encoding=serialization.Encoding.DER,
+                format=serialization.PublicFormat.PKCS1
+            )
+        raise ValueError("Unsupported key type for raw public encoding")
@@ -0,0 +1,287 @@
+"""
+Minimal OpenPGP (RFC 4880) packet and ASCII armor helpers
+"""
+from typing import Iterator, List, Optional, Tuple
+import base64
+import hashlib
+import re
+
+# Packet tags
+TAG_SIGNATURE = 2
+TAG_SECRET_KEY = 5
+TAG_PUBLIC_KEY = 6
+TAG_SECRET_SUBKEY = 7
+TAG_USER_ID = 13
+TAG_PUBLIC_SUBKEY = 14
+
+# Signature subpacket types
+SUBPACKET_CREATION_TIME = 2
+SUBPACKET_KEY_EXPIRATION = 9
+SUBPACKET_PREFERRED_SYMMETRIC = 11
+SUBPACKET_ISSUER = 16
+SUBPACKET_PREFERRED_HASH = 21
+SUBPACKET_PREFERRED_COMPRESSION = 22
+SUBPACKET_KEY_SERVER_PREFERENCES = 23
+SUBPACKET_KEY_FLAGS = 27
+SUBPACKET_FEATURES = 30
+SUBPACKET_ISSUER_FINGERPRINT = 33
+
+# Public key algorithm ids
+ALGO_RSA = (1, 2, 3)
+ALGO_ELGAMAL = 16
+ALGO_DSA = 17
+ALGO_ECDH = 18
+ALGO_ECDSA = 19
+ALGO_EDDSA = 22
+
+_ARMOR_RE = re.compile(
+    r"-----BEGIN PGP ([A-Z ]+)-----\r?\n((?:[^\r\n]+\r?\n)*?)\r?\n(.*?)-----END PGP \1-----",
+    re.DOTALL
+)
+
+
+def crc24(data: bytes) -> int:
+    """CRC-24 checksum used by ASCII armor"""
+    crc = 0xB704CE
+    for byte in data:
+        crc ^= byte << 16
+        for _ in range(8):
+            crc <<= 1
+            if crc & 0x1000000:
+                crc ^= 0x1864CFB
+    return crc & 0xFFFFFF
+
+
+def armor(block_type: str, data: bytes) -> str:
+    """
+    Wrap binary OpenPGP data in ASCII armor
+    Args:
+        block_type: e.g. "PUBLIC KEY BLOCK" or "PRIVATE KEY BLOCK"
+    """
+    b64 = base64.b64encode(data).decode()
+    lines = [b64[i:i + 64] for i in range(0, len(b64), 64)]
+    checksum = base64.b64encode(crc24(data).to_bytes(3, "big")).decode()
+    return (
+        f"-----BEGIN PGP {block_type}-----\n\n"
+        + "\n".join(lines)
+        + f"\n={checksum}\n-----END PGP {block_type}-----\n"
+    )
+
+
+def dearmor(text: str) -> Tuple[str, bytes]:
+    """
+    Decode an ASCII armored block
+    Returns: (block_type, data)
+    Raises:
+        ValueError: If the armor is malformed or the checksum does not match
+    """
+    match = _ARMOR_RE.search(text)
+    if not match:
+        raise ValueError("No OpenPGP armor found")
+    block_type = match.group(1)
+    body_lines = [line.strip() for line in match.group(3).splitlines() if line.strip()]
+    checksum = None
+    if body_lines and body_lines[-1].startswith("="):
+        checksum = body_lines.pop()[1:]
+    data = base64.b64decode("".join(body_lines))
+    if checksum is not None and base64.b64decode(checksum) != crc24(data).to_bytes(3, "big"):
+        raise ValueError("OpenPGP armor checksum mismatch")
+    return block_type, data
+
+
+def encode_packet(tag: int, body: bytes, old_format: bool = False) -> bytes:
+    """
+    Encode a packet
+    Args:
+        old_format: Use an old-format header (tags below 16 only), as gpg does on export
+    """
+    length = len(body)
+    if old_format:
+        if tag >= 16:
+            raise ValueError("Old-format headers only support tags below 16")
+        if length < 0x100:
+            return bytes([0x80 | tag << 2]) + bytes([length]) + body
+        if length < 0x10000:
+            return bytes([0x80 | tag << 2 | 1]) + length.to_bytes(2, "big") + body
+        return bytes([0x80 | tag << 2 | 2]) + length.to_bytes(4, "big") + body
+    if length < 192:
+        header = bytes([length])
+    elif length < 8384:
+        length -= 192
+        header = bytes([(length >> 8) + 192, length & 0xFF])
+    else:
+        header = b"\xff" + length.to_bytes(4, "big")
+    return bytes([0xC0 | tag]) + header + body
+
+
+def iter_packets(data: bytes) -> Iterator[Tuple[int, bytes]]:
+    """
+    Split binary OpenPGP data into packets
+    Returns: Iterator of (tag, body)
+    Raises:
+        ValueError: If the data is truncated or uses partial body lengths
+    """
+    pos = 0
+    while pos < len(data):
+        first = data[pos]
+        if not first & 0x80:
+            raise ValueError("Invalid OpenPGP packet header")
+        if first & 0x40:
+            tag = first & 0x3F
+            octet = data[pos + 1]
+            if octet < 192:
+                length, pos = octet, pos + 2
+            elif octet < 224:
+                length, pos = ((octet - 192) << 8) + data[pos + 2] + 192, pos + 3
+            elif octet == 255:
+                length, pos = int.from_bytes(data[pos + 2:pos + 6], "big"), pos + 6
+            else:
+                raise ValueError("Partial body lengths are not supported")
+        else:
+            tag = (first >> 2) & 0x0F
+            length_type = first & 0x03
+            if length_type == 3:
+                raise ValueError("Indeterminate packet lengths are not supported")
+            size = 1 << length_type
+            length = int.from_bytes(data[pos + 1:pos + 1 + size], "big")
+            pos += 1 + size
+        body = data[pos:pos + length]
+        if len(body) != length:
+            raise ValueError("Truncated OpenPGP packet")
+        yield tag, body
+        pos += length
+
+
+def mpi(value: int) -> bytes:
+    """Encode an integer as a multiprecision integer"""
+    return value.bit_length().to_bytes(2, "big") + value.to_bytes((value.bit_length() + 7) // 8, "big")
+
+
+def subpacket(subpacket_type: int, data: bytes) -> bytes:
+    """Encode a signature subpacket"""
+    length = len(data) + 1
+    if length < 192:
+        header = bytes([length])
+    elif length < 8384:
+        length -= 192
+        header = bytes([(length >> 8) + 192, length & 0xFF])
+    else:
+        header = b"\xff" + length.to_bytes(4, "big")
+    return header + bytes([subpacket_type]) + data
+
+
+def decode_s2k_count(coded: int) -> int:
+    """Number of bytes hashed for an iterated S2K count octet"""
+    return (16 + (coded & 15)) << ((coded >> 4) + 6)
+
+
+def encode_s2k_count(count: int) -> int:
+    """Smallest S2K count octet that hashes at least ``count`` bytes (capped at 255)"""
+    for coded in range(256):
+        if decode_s2k_count(coded) >= count:
+            return coded
+    return 255
+
+
+def s2k_derive(passphrase: bytes, salt: bytes, count: int, key_length: int = 32) -> bytes:
+    """
+    Iterated and salted S2K with SHA-256
+    Raises:
+        ValueError: If the key length needs more than one SHA-256 output
+    """
+    if key_length > 32:
+        raise ValueError("Key length exceeds SHA-256 output")
+    data = salt + passphrase
+    count = max(count, len(data))
+    digest = hashlib.sha256()
+    # Feed the repeated salt+passphrase in large blocks rather than one copy at a time
+    block = data * max(1, 65536 // len(data))
+    while count >= len(block):
+        digest.update(block)
+        count -= len(block)
+    repeats, remainder = divmod(count, len(data))
+    digest.update(data * repeats + data[:remainder])
+    return digest.digest()[:key_length]
+
+
+def _skip_mpi(body: bytes, pos: int) -> int:
+    bits = int.from_bytes(body[pos:pos + 2], "big")
+    return pos + 2 + (bits + 7) // 8
+
+
+def public_key_length(body: bytes) -> int:
+    """
+    Length of the public part of a v4 key packet body (secret keys carry
+    their secret material after it)
+    Raises:
+        ValueError: For key versions or algorithms this module does not handle
+    """
+    if not body or body[0] != 4:
+        raise ValueError("Only v4 keys are supported")
+    algorithm = body[5]
+    pos = 6
+    if algorithm in ALGO_RSA:
+        mpi_count = 2
+    elif algorithm == ALGO_ELGAMAL:
+        mpi_count = 3
+    elif algorithm == ALGO_DSA:
+        mpi_count = 4
+    elif algorithm in (ALGO_ECDH, ALGO_ECDSA, ALGO_EDDSA):
+        pos += 1 + body[pos]  # curve OID
+        mpi_count = 1
+    else:
+        raise ValueError(f"Unsupported public key algorithm: {algorithm}")
+    for _ in range(mpi_count):
+        pos = _skip_mpi(body, pos)
+    if algorithm == ALGO_ECDH:
+        pos += 1 + body[pos]  # KDF parameters
+    if pos > len(body):
+        raise ValueError("Truncated key packet")
+    return pos
+
+
+def public_from_secret(data: bytes) -> bytes:
+    """
+    Turn a transferable secret key into the matching transferable public key
+    by dropping the secret material from every key packet
+    """
+    packets: List[bytes] = []
+    for tag, body in iter_packets(data):
+        if tag == TAG_SECRET_KEY:
+            tag, body = TAG_PUBLIC_KEY, body[:public_key_length(body)]
+        elif tag == TAG_SECRET_SUBKEY:
+            tag, body = TAG_PUBLIC_SUBKEY, body[:public_key_length(body)]
+        packets.append(encode_packet(tag, body, old_format=tag < 16))
+    return b"".join(packets)
+
+
+def split_keys(data: bytes) -> List[bytes]:
+    """
+    Split a keyring export into its transferable keys, each starting at a
+    primary key packet
+    """
+    keys: List[List[bytes]] = []
+    for tag, body in iter_packets(data):
+        if tag in (TAG_SECRET_KEY, TAG_PUBLIC_KEY):
+            keys.append([])
+        if not keys:
+            raise ValueError("Key export does not start with a primary key packet")
+        keys[-1].append(encode_packet(tag, body, old_format=tag < 16))
+    return [b"".join(packets) for packets in keys]
+
+
+def fingerprint(data: bytes) -> str:
+    """V4 fingerprint of the first primary key in a transferable key"""
+    for tag, body in iter_packets(data):
+        if tag in (TAG_SECRET_KEY, TAG_PUBLIC_KEY):
+            public_body = body[:public_key_length(body)]
+            return hashlib.sha1(b"\x99" + len(public_body).to_bytes(2, "big") + public_body).hexdigest().upper()
+    raise ValueError("No primary key packet found")
+
+
+def first_user_id(data: bytes) -> Optional[str]:
+    """Text of the first User ID packet, if any"""
+    for tag, body in iter_packets(data):
+        if tag == TAG_USER_ID:
+            return body.decode("utf-8", errors="replace")
+    return None
@@ -1,13 +1,39 @@
+from array import array
+import math
+import os
+import re
 import secrets
 import string
-from typing import List
+from typing import Callable, Dict, Iterator, List, Optional, Pattern, Tuple
+from .breach_index import BreachIndex, get_breach_index
+from .password_template import compile_template
+from .unique_codes import iter_unique_codes
+from .wordlist import Wordlist, get_wordlist
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; bulk generation falls back to bytes.translate
+    np = None
 
 class PasswordService:
-    def __init__(self):
+    # Random bytes drawn per os.urandom call in bulk generation
+    RANDOM_BLOCK_SIZE = 1 << 20
+    # Rounds of regenerating breached passwords before giving up
+    MAX_BREACH_ROUNDS = 100
+
+    def __init__(self, breach_index: Optional[BreachIndex] = None):
+        """
+        Args:
+            breach_index: Corpus generated passwords must not appear in,
+                defaults to get_breach_index() ($KEYGEN_BREACH_INDEX, if set)
+        """
+        self.breach_index = breach_index or get_breach_index()
         self.uppercase_letters = string.ascii_uppercase
         self.lowercase_letters = string.ascii_lowercase
         self.digits = string.digits
         self.special_chars = "!@#$%^&*()_+-=[]{}|;:,.<>?"
+        # (options, exclusions) -> pool, per-class characters, byte table and class check
+        self._plans: Dict[Tuple, Tuple[str, Tuple[str, ...], bytes, bytes, Optional[Pattern]]] = {}
 
     def generate_password(self, 
                         length: int = 16,
@@ -30,6 +56,17 @@ class PasswordService:
         Returns:
             Generated password as string
         """
+        return self._unbreached(1, lambda _: [self._generate_password(
+            length, use_uppercase, use_lowercase, use_digits, use_special, excluded_chars
+        )])[0]
+
+    def _generate_password(self,
+                           length: int,
+                           use_uppercase: bool,
+                           use_lowercase: bool,
+                           use_digits: bool,
+                           use_special: bool,
+                           excluded_chars: str) -> str:
         # Create character pool based on selected options
         char_pool = ""
         if use_uppercase:
@@ -76,3 +113,356 @@ class PasswordService:
         secrets.SystemRandom().shuffle(password)
         
         return ''.join(password)
+
+    def generate_passwords(self,
+                           n: int,
+                           length: int = 16,
+                           use_uppercase: bool = True,
+                           use_lowercase: bool = True,
+                           use_digits: bool = True,
+                           use_special: bool = True,
+                           excluded_chars: str = "") -> List[str]:
+        """
+        Generate many passwords at once from large blocks of os.urandom output
+
+        Bytes are mapped onto the character pool by rejection sampling (bytes
+        that would make some characters more likely are dropped), and
+        passwords missing one of the selected character types are redrawn,
+        so every password with at least one character of each type is
+        equally likely.
+
+        Args:
+            n: Number of passwords
+            length: Length of each password (at least the number of selected types)
+            use_uppercase, use_lowercase, use_digits, use_special, excluded_chars:
+                As for generate_password
+
+        Returns:
+            List of n passwords
+        """
+        if n < 0:
+            raise ValueError("Number of passwords must not be negative")
+        pool, classes, table, rejected, checker = self._bulk_plan(
+            use_uppercase, use_lowercase, use_digits, use_special, excluded_chars
+        )
+        if length < max(1, len(classes)):
+            raise ValueError(
+                f"Password length must be at least {max(1, len(classes))} to include every selected character type"
+            )
+        if np is not None:
+            return self._unbreached(n, lambda count: self._generate_passwords_numpy(count, length, pool, classes))
+        return self._unbreached(n, lambda count: self._generate_passwords_bytes(count, length, table, rejected, checker))
+
+    def _generate_passwords_bytes(self,
+                                  n: int,
+                                  length: int,
+                                  table: bytes,
+                                  rejected: bytes,
+                                  checker: Optional[Pattern]) -> List[str]:
+        """generate_passwords without NumPy, via bytes.translate"""
+        passwords: List[str] = []
+        while len(passwords) < n:
+            # Rows drawn this round, with headroom for rejected bytes and passwords
+            rows = min(n - len(passwords), max(1, self.RANDOM_BLOCK_SIZE // length))
+            chars = os.urandom(rows * length * 2).translate(table, rejected).decode("ascii")
+            candidates = [chars[i:i + length] for i in range(0, len(chars) - length + 1, length)]
+            if checker is not None:
+                candidates = [c for c in candidates if checker.match(c)]
+            passwords.extend(candidates[:n - len(passwords)])
+        return passwords
+
+    def generate_from_template(self, template: str, excluded_chars: str = "") -> str:
+        """
+        Generate a password from a template such as "Cvcc-9999-ssss" or
+        "[A-Z]{3}-[0-9]{6}" (see password_template for the syntax)
+
+        Args:
+            template: Password template
+            excluded_chars: Characters to exclude from placeholders and classes
+
+        Returns:
+            Generated password as string
+        """
+        return self._unbreached(1, compile_template(template, excluded_chars).generate_many)[0]
+
+    def generate_many_from_template(self, n: int, template: str, excluded_chars: str = "") -> List[str]:
+        """
+        Generate many passwords from one template; the template is compiled
+        once and cached, so only random characters are drawn per call
+
+        Args:
+            n: Number of passwords
+            template, excluded_chars: As for generate_from_template
+
+        Returns:
+            List of n passwords
+        """
+        return self._unbreached(n, compile_template(template, excluded_chars).generate_many)
+
+    def template_entropy_bits(self, template: str, excluded_chars: str = "") -> float:
+        """Exact entropy in bits of passwords generated from a template"""
+        return compile_template(template, excluded_chars).entropy_bits
+
+    def generate_unique_from_template(self, n: int, template: str, excluded_chars: str = "") -> Iterator[str]:
+        """
+        Generate n codes from a template that are guaranteed to be distinct,
+        e.g. for voucher or activation code runs. Codes are yielded as they
+        are produced and deduplicated at 4-8 bytes per code.
+
+        Args:
+            n: Number of codes (at most the number of codes the template can produce)
+            template, excluded_chars: As for generate_from_template
+
+        Returns:
+            Iterator over n distinct codes
+        """
+        reject = self.breach_index.check_many if self.breach_index is not None else None
+        return iter_unique_codes(compile_template(template, excluded_chars), n, reject)
+
+    def write_unique_from_template(self, n: int, template: str, output_path: str, excluded_chars: str = "") -> int:
+        """
+        Stream n distinct codes from a template to a file, one per line
+
+        Args:
+            n: Number of codes
+            template, excluded_chars: As for generate_from_template
+            output_path: File to write
+
+        Returns:
+            Number of codes written
+        """
+        written = 0
+        with open(output_path, "w", buffering=self.RANDOM_BLOCK_SIZE) as f:
+            for code in self.generate_unique_from_template(n, template, excluded_chars):
+                f.write(code + "\n")
+                written += 1
+        return written
+
+    def check_passwords(self, passwords: List[str]) -> List[bool]:
+        """
+        Check passwords, generated or user-supplied, against the breach index
+
+        Args:
+            passwords: Passwords to check
+
+        Returns:
+            For each password, whether it appears in the breach corpus
+        """
+        if self.breach_index is None:
+            raise ValueError("No breach index configured; set KEYGEN_BREACH_INDEX to an index file")
+        return self.breach_index.check_many(passwords)
+
+    def _unbreached(self, n: int, generate: Callable[[int], List[str]]) -> List[str]:
+        """
+        n passwords from generate(count), replacing any found in the breach
+        index with fresh ones
+        """
+        if self.breach_index is None:
+            return generate(n)
+        passwords: List[str] = []
+        for _ in range(self.MAX_BREACH_ROUNDS):
+            candidates = generate(n - len(passwords))
+            breached = self.breach_index.check_many(candidates)
+            passwords.extend(p for p, hit in zip(candidates, breached) if not hit)
+            if len(passwords) == n:
+                return passwords
+        raise ValueError(
+            "Could not generate passwords outside the breach corpus; use a longer length or more character types"
+        )
+
+    def _bulk_plan(self,
+                   use_uppercase: bool,
+                   use_lowercase: bool,
+                   use_digits: bool,
+                   use_special: bool,
+                   excluded_chars: str) -> Tuple[str, Tuple[str, ...], bytes, bytes, Optional[Pattern]]:
+        """
+        Character pool, character classes, byte translation table, rejected
+        bytes and class check regex for one set of options, built once and cached
+        """
+        key = (use_uppercase, use_lowercase, use_digits, use_special, excluded_chars)
+        plan = self._plans.get(key)
+        if plan is not None:
+            return plan
+
+        excluded = set(excluded_chars)
+        selected = [
+            chars for chars, enabled in (
+                (self.uppercase_letters, use_uppercase),
+                (self.lowercase_letters, use_lowercase),
+                (self.digits, use_digits),
+                (self.special_chars, use_special),
+            ) if enabled
+        ]
+        classes = tuple(c for c in (
+            ''.join(ch for ch in chars if ch not in excluded) for chars in selected
+        ) if c)
+        if not classes:
+            # Same fallback as generate_password: lowercase without the one-of-each guarantee
+            lowercase = ''.join(ch for ch in self.lowercase_letters if ch not in excluded)
+            if not lowercase:
+                raise ValueError("No characters available for password generation after exclusions")
+            pool, classes = lowercase, ()
+        else:
+            pool = ''.join(classes)
+
+        # Only bytes below the largest multiple of the pool size map evenly onto it
+        limit = 256 - 256 % len(pool)
+        table = bytes(ord(pool[b % len(pool)]) if b < limit else 0 for b in range(256))
+        rejected = bytes(range(limit, 256))
+
+        checker = None
+        if len(classes) > 1:
+            checker = re.compile(''.join(
+                f"(?=[^{re.escape(c)}]*[{re.escape(c)}])" for c in classes
+            ))
+
+        plan = (pool, classes, table, rejected, checker)
+        self._plans[key] = plan
+        return plan
+
+    def _generate_passwords_numpy(self, n: int, length: int, pool: str, classes: Tuple[str, ...]) -> List[str]:
+        """Vectorized generate_passwords: same sampling, done on NumPy arrays"""
+        pool_bytes = np.frombuffer(pool.encode("ascii"), dtype=np.uint8)
+        limit = 256 - 256 % len(pool)
+        # Class number of every pool position
+        class_of = np.repeat(np.arange(len(classes)), [len(c) for c in classes])
+
+        blocks: List[bytes] = []
+        produced = 0
+        while produced < n:
+            rows = min(n - produced, max(1, self.RANDOM_BLOCK_SIZE // length))
+            raw = np.frombuffer(os.urandom(rows * length * 2), dtype=np.uint8)
+            raw = raw[raw < limit] % len(pool)
+            count = len(raw) // length
+            indices = raw[:count * length].reshape(count, length)
+            if len(classes) > 1:
+                in_class = class_of[indices]
+                keep = np.ones(count, dtype=bool)
+                for class_number in range(len(classes)):
+                    keep &= (in_class == class_number).any(axis=1)
+                indices = indices[keep]
+            indices = indices[:n - produced]
+            blocks.append(pool_bytes[indices].tobytes())
+            produced += len(indices)
+
+        text = b"".join(blocks).decode("ascii")
+        return [text[i:i + length] for i in range(0, n * length, length)]
+
+
+class PassphraseService:
+    """
+    Diceware-style passphrases: words drawn uniformly from a wordlist (the
+    bundled EFF large list by default) with os.urandom and rejection sampling
+    """
+    SPECIAL_CHARS = "!@#$%^&*?"
+    # Random draws taken per os.urandom call in bulk generation
+    RANDOM_BATCH_SIZE = 1 << 16
+
+    def __init__(self, wordlist: Optional[Wordlist] = None):
+        """
+        Args:
+            wordlist: Wordlist to draw from, defaults to get_wordlist()
+        """
+        self.wordlist = wordlist or get_wordlist()
+
+    def generate_passphrase(self,
+                            word_count: int = 6,
+                            separator: str = "-",
+                            capitalize: bool = False,
+                            include_number: bool = False,
+                            include_special: bool = False) -> Dict[str, object]:
+        """
+        Generate a single passphrase
+
+        Args:
+            word_count: Number of words
+            separator: Text placed between words
+            capitalize: Capitalize the first letter of every word
+            include_number: Append a random digit to a random word
+            include_special: Append a random special character to a random word
+
+        Returns:
+            Dictionary containing the passphrase and its entropy in bits
+        """
+        passphrase = self.generate_passphrases(
+            1, word_count, separator, capitalize, include_number, include_special
+        )[0]
+        return {
+            "passphrase": passphrase,
+            "entropy_bits": self.entropy_bits(word_count, include_number, include_special),
+        }
+
+    def generate_passphrases(self,
+                             n: int,
+                             word_count: int = 6,
+                             separator: str = "-",
+                             capitalize: bool = False,
+                             include_number: bool = False,
+                             include_special: bool = False) -> List[str]:
+        """
+        Generate many passphrases at once, drawing random numbers in large
+        batches; every passphrase has entropy_bits() of entropy
+
+        Args:
+            n: Number of passphrases
+            word_count, separator, capitalize, include_number, include_special:
+                As for generate_passphrase
+
+        Returns:
+            List of n passphrases
+        """
+        if n < 0:
+            raise ValueError("Number of passphrases must not be negative")
+        if word_count < 1:
+            raise ValueError("Word count must be at least 1")
+
+        wordlist = self.wordlist
+        words = self._random_below(len(wordlist), n * word_count)
+        if include_number:
+            digit_positions = self._random_below(word_count, n)
+            digits = self._random_below(10, n)
+        if include_special:
+            special_positions = self._random_below(word_count, n)
+            specials = self._random_below(len(self.SPECIAL_CHARS), n)
+
+        passphrases = []
+        for i in range(n):
+            chosen = [wordlist[w] for w in words[i * word_count:(i + 1) * word_count]]
+            if capitalize:
+                chosen = [w[:1].upper() + w[1:] for w in chosen]
+            if include_number:
+                chosen[digit_positions[i]] += str(digits[i])
+            if include_special:
+                chosen[special_positions[i]] += self.SPECIAL_CHARS[specials[i]]
+            passphrases.append(separator.join(chosen))
+        return passphrases
+
+    def entropy_bits(self,
+                     word_count: int = 6,
+                     include_number: bool = False,
+                     include_special: bool = False) -> float:
+        """
+        Entropy of a passphrase in bits, assuming the attacker knows the
+        wordlist and the options used (capitalization and separators add none)
+        """
+        bits = word_count * math.log2(len(self.wordlist))
+        if include_number:
+            bits += math.log2(10 * word_count)
+        if include_special:
+            bits += math.log2(len(self.SPECIAL_CHARS) * word_count)
+        return round(bits, 2)
+
+    def _random_below(self, bound: int, count: int) -> array:
+        """count uniform random integers in [0, bound), from 32-bit os.urandom draws"""
+        # Only draws below the largest multiple of bound map evenly onto it
+        limit = (1 << 32) - (1 << 32) % bound
+        values = array("I")
+        while len(values) < count:
+            batch = min(count - len(values), self.RANDOM_BATCH_SIZE)
+            draws = array("I")
+            # Headroom so one round almost always suffices; the worst bound rejects under half
+            draws.frombytes(os.urandom(batch * 2 * draws.itemsize))
+            values.extend(d % bound for d in draws if d < limit)
+        del values[count:]
+        return values
@@ -0,0 +1,202 @@
+"""
+Password templates: a small pattern language for structured passwords such
+as voucher codes and PINs, compiled once into a reusable generation plan
+
+Syntax:
+    A  uppercase letter        a  lowercase letter
+    C  uppercase consonant     c  lowercase consonant
+    V  uppercase vowel         v  lowercase vowel
+    9  digit                   s  special character
+    X  uppercase letter/digit  x  lowercase letter/digit
+    *  any letter, digit or special character
+    [..]  character class with ranges, e.g. [A-HJ-NP-Z2-9]
+    {n}   repeat the previous element n times
+    \\c   the character c literally
+Any other printable ASCII character is copied as is, so
+"Cvcc-9999-ssss" and "[A-Z]{3}-[0-9]{6}" are both valid templates.
+"""
+from functools import lru_cache
+from typing import Dict, List, Tuple
+import math
+import os
+import string
+
+_UPPER_VOWELS = "AEIOU"
+_UPPER_CONSONANTS = "".join(c for c in string.ascii_uppercase if c not in _UPPER_VOWELS)
+SPECIAL_CHARS = "!@#$%^&*()_+-=[]{}|;:,.<>?"
+
+PLACEHOLDERS = {
+    "A": string.ascii_uppercase,
+    "a": string.ascii_lowercase,
+    "C": _UPPER_CONSONANTS,
+    "c": _UPPER_CONSONANTS.lower(),
+    "V": _UPPER_VOWELS,
+    "v": _UPPER_VOWELS.lower(),
+    "9": string.digits,
+    "s": SPECIAL_CHARS,
+    "X": string.ascii_uppercase + string.digits,
+    "x": string.ascii_lowercase + string.digits,
+    "*": string.ascii_letters + string.digits + SPECIAL_CHARS,
+}
+
+# Longest password a template may describe
+MAX_LENGTH = 1024
+
+
+class PasswordTemplate:
+    """
+    Compiled template: one character pool per position, plus a byte
+    translation table and rejection set per distinct pool, so generating
+    passwords never parses the template or builds pools again
+    """
+
+    def __init__(self, template: str, pools: Tuple[str, ...]):
+        self.template = template
+        self.pools = pools
+        self.length = len(pools)
+        # Every position is drawn uniformly and independently
+        self.entropy_bits = sum(math.log2(len(pool)) for pool in pools)
+
+        # pool -> (translation table, rejected bytes); bytes at or above the
+        # largest multiple of the pool size would bias the draw, so they are dropped
+        self._samplers: Dict[str, Tuple[bytes, bytes]] = {}
+        # pool -> number of positions drawing from it
+        self._counts: Dict[str, int] = {}
+        for pool in pools:
+            if len(pool) > 1 and pool not in self._samplers:
+                limit = 256 - 256 % len(pool)
+                table = bytes(ord(pool[b % len(pool)]) if b < limit else 0 for b in range(256))
+                self._samplers[pool] = (table, bytes(range(limit, 256)))
+                self._counts[pool] = pools.count(pool)
+
+    def generate(self) -> str:
+        """Generate one password"""
+        return self.generate_many(1)[0]
+
+    def generate_many(self, n: int) -> List[str]:
+        """
+        Generate n passwords, drawing each pool's characters for all of them at once
+        Args:
+            n: Number of passwords
+        Returns: List of n passwords
+        """
+        if n < 0:
+            raise ValueError("Number of passwords must not be negative")
+        if n == 0:
+            return []
+
+        drawn = {pool: self._draw(pool, n * count) for pool, count in self._counts.items()}
+        used = dict.fromkeys(drawn, 0)
+        columns = []
+        for pool in self.pools:
+            if pool in drawn:
+                offset = used[pool]
+                columns.append(drawn[pool][offset:offset + n])
+                used[pool] = offset + n
+            else:
+                columns.append(pool * n)
+        return ["".join(chars) for chars in zip(*columns)]
+
+    def _draw(self, pool: str, count: int) -> str:
+        """count characters drawn uniformly from pool"""
+        table, rejected = self._samplers[pool]
+        # Headroom for rejected bytes: at least half of all bytes are accepted
+        accept_rate = (256 - len(rejected)) / 256
+        chars = []
+        needed = count
+        while needed > 0:
+            block = os.urandom(int(needed / accept_rate) + 64).translate(table, rejected)[:needed]
+            chars.append(block)
+            needed -= len(block)
+        return b"".join(chars).decode("ascii")
+
+
+@lru_cache(maxsize=256)
+def compile_template(template: str, excluded_chars: str = "") -> PasswordTemplate:
+    """
+    Compile a template into a PasswordTemplate, cached per template and exclusions
+    Args:
+        template: Template string, see the module docstring for the syntax
+        excluded_chars: Characters removed from every placeholder and class
+            (literal characters are kept)
+    Returns: PasswordTemplate
+    """
+    if not template:
+        raise ValueError("Template must not be empty")
+    if any(c not in string.printable or c in "\t\n\r\x0b\x0c" for c in template):
+        raise ValueError("Templates may only contain printable ASCII characters")
+
+    pools: List[str] = []
+    i = 0
+    while i < len(template):
+        char = template[i]
+        if char == "\\":
+            if i + 1 == len(template):
+                raise ValueError("Template ends with an unfinished escape")
+            pools.append(template[i + 1])
+            i += 2
+        elif char == "[":
+            chars, i = _parse_class(template, i + 1)
+            pools.append(_pool(chars, excluded_chars, template))
+        elif char == "{":
+            end = template.find("}", i)
+            count = template[i + 1:end] if end != -1 else ""
+            if not count.isdigit():
+                raise ValueError(f"Invalid repetition at position {i} of the template")
+            if not pools:
+                raise ValueError("Repetition must follow a character, placeholder or class")
+            if int(count) > MAX_LENGTH:
+                raise ValueError(f"Templates may describe at most {MAX_LENGTH} characters")
+            pools.extend([pools[-1]] * (int(count) - 1))
+            if int(count) == 0:
+                pools.pop()
+            i = end + 1
+        elif char in PLACEHOLDERS:
+            pools.append(_pool(PLACEHOLDERS[char], excluded_chars, template))
+            i += 1
+        else:
+            pools.append(char)
+            i += 1
+        if len(pools) > MAX_LENGTH:
+            raise ValueError(f"Templates may describe at most {MAX_LENGTH} characters")
+
+    if not pools:
+        raise ValueError("Template describes an empty password")
+    return PasswordTemplate(template, tuple(pools))
+
+
+def _parse_class(template: str, i: int) -> Tuple[str, int]:
+    """Parse a character class body starting after "["; Returns: characters and index after "]" """
+    chars: List[str] = []
+    while i < len(template) and template[i] != "]":
+        char = template[i]
+        if char == "\\":
+            if i + 1 == len(template):
+                break
+            char = template[i + 1]
+            i += 1
+        if i + 2 < len(template) and template[i + 1] == "-" and template[i + 2] != "]":
+            last = template[i + 2]
+            if last == "\\" and i + 3 < len(template):
+                last = template[i + 3]
+                i += 1
+            if ord(last) < ord(char):
+                raise ValueError(f"Invalid range {char}-{last} in the template")
+            chars.extend(chr(c) for c in range(ord(char), ord(last) + 1))
+            i += 3
+        else:
+            chars.append(char)
+            i += 1
+    if i >= len(template):
+        raise ValueError("Template has an unclosed character class")
+    if not chars:
+        raise ValueError("Template has an empty character class")
+    return "".join(chars), i + 1
+
+
+def _pool(chars: str, excluded_chars: str, template: str) -> str:
+    """Deduplicated pool in a fixed order, without the excluded characters"""
+    pool = "".join(sorted(set(chars) - set(excluded_chars)))
+    if not pool:
+        raise ValueError(f"No characters left for a position of template {template!r} after exclusions")
+    return pool
@@ -0,0 +1,278 @@
+"""
+In-process OpenPGP v4 key generation on top of cryptography, without gpg
+"""
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.asymmetric import ed25519, padding, rsa, utils, x25519
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+from datetime import datetime, timezone
+from typing import Dict, Optional
+import hashlib
+import os
+import re
+import time
+from . import openpgp_packets as pgp
+from .kdf_policy import KDFCostPolicy, get_kdf_policy
+
+# Curve OIDs as stored in key packets (without the DER tag/length)
+_OID_ED25519 = bytes.fromhex("2b06010401da470f01")
+_OID_CV25519 = bytes.fromhex("2b060104019755010501")
+
+_HASH_SHA256 = 8
+_CIPHER_AES128 = 7
+_CIPHER_AES256 = 9
+_S2K_ITERATED_SALTED = 3
+_S2K_USAGE_SHA1_CHECK = 254
+
+_SIG_POSITIVE_CERTIFICATION = 0x13
+_SIG_SUBKEY_BINDING = 0x18
+
+_KEY_FLAGS_CERTIFY_SIGN = 0x03
+_KEY_FLAGS_ENCRYPT = 0x0C
+
+
+class _Key:
+    """One key packet: private key object, packet body fields and fingerprint"""
+
+    def __init__(self, private_key, algorithm: int, created: int):
+        self.private_key = private_key
+        self.algorithm = algorithm
+        self.created = created
+        self.public_body = (
+            b"\x04" + created.to_bytes(4, "big") + bytes([algorithm]) + self._public_fields()
+        )
+        self.fingerprint = hashlib.sha1(self.hash_prefix()).digest()
+        self.key_id = self.fingerprint[-8:]
+
+    def hash_prefix(self) -> bytes:
+        """Key packet as it is hashed into fingerprints and signatures"""
+        return b"\x99" + len(self.public_body).to_bytes(2, "big") + self.public_body
+
+    def _public_fields(self) -> bytes:
+        if self.algorithm == pgp.ALGO_RSA[0]:
+            numbers = self.private_key.public_key().public_numbers()
+            return pgp.mpi(numbers.n) + pgp.mpi(numbers.e)
+        raw_public = self.private_key.public_key().public_bytes_raw()
+        point = pgp.mpi(int.from_bytes(b"\x40" + raw_public, "big"))
+        if self.algorithm == pgp.ALGO_EDDSA:
+            return bytes([len(_OID_ED25519)]) + _OID_ED25519 + point
+        # ECDH KDF parameters: reserved octet 1, SHA-256, AES-128 key wrap
+        return bytes([len(_OID_CV25519)]) + _OID_CV25519 + point + bytes([3, 1, _HASH_SHA256, _CIPHER_AES128])
+
+    def secret_fields(self) -> bytes:
+        if self.algorithm == pgp.ALGO_RSA[0]:
+            numbers = self.private_key.private_numbers()
+            # OpenPGP wants p < q and u = p^-1 mod q
+            p, q = sorted((numbers.p, numbers.q))
+            return pgp.mpi(numbers.d) + pgp.mpi(p) + pgp.mpi(q) + pgp.mpi(pow(p, -1, q))
+        raw_secret = bytearray(self.private_key.private_bytes_raw())
+        if self.algorithm == pgp.ALGO_EDDSA:
+            return pgp.mpi(int.from_bytes(raw_secret, "big"))
+        # Curve25519 secrets are stored clamped and in reverse byte order
+        raw_secret[0] &= 248
+        raw_secret[31] &= 127
+        raw_secret[31] |= 64
+        return pgp.mpi(int.from_bytes(raw_secret, "little"))
+
+    def sign(self, digest: bytes) -> bytes:
+        """Signature MPIs over a SHA-256 digest"""
+        if self.algorithm == pgp.ALGO_RSA[0]:
+            signature = self.private_key.sign(digest, padding.PKCS1v15(), utils.Prehashed(hashes.SHA256()))
+            return pgp.mpi(int.from_bytes(signature, "big"))
+        signature = self.private_key.sign(digest)
+        return pgp.mpi(int.from_bytes(signature[:32], "big")) + pgp.mpi(int.from_bytes(signature[32:], "big"))
+
+
+class NativePGPService:
+    """
+    Builds transferable OpenPGP v4 keys (primary key, user ID, positive
+    self-certification, encryption subkey and binding signature) in process
+    and armors them in the format gpg exports and imports.
+    """
+
+    # (primary key type, subkey type) pairs this backend can build
+    SUPPORTED_KEY_TYPES = (("RSA", "RSA"), ("EDDSA", "ECDH"))
+
+    @staticmethod
+    def generate_keypair(
+        name: str,
+        email: str,
+        passphrase: str,
+        comment: str = "",
+        key_type: str = "RSA",
+        key_length: int = 2048,
+        subkey_type: Optional[str] = None,
+        subkey_length: int = 2048,
+        expire_date: str = "0",
+        kdf_policy: Optional[KDFCostPolicy] = None
+    ) -> Dict[str, str]:
+        """
+        Generate a PGP keypair without gpg
+        Returns: Dictionary containing public key, private key, fingerprint, and user ID
+        """
+        if not name or not email:
+            raise ValueError("Name and email are required for PGP key generation")
+        if not passphrase:
+            raise ValueError("Passphrase is required for PGP key generation")
+
+        key_type = key_type.upper()
+        subkey_type = (subkey_type or ("ECDH" if key_type == "EDDSA" else key_type)).upper()
+        if (key_type, subkey_type) not in NativePGPService.SUPPORTED_KEY_TYPES:
+            raise ValueError(
+                f"Unsupported key types for the native backend: {key_type}/{subkey_type}. "
+                "Supported combinations are: RSA/RSA, EDDSA/ECDH"
+            )
+        if key_type == "RSA" and min(key_length, subkey_length) < 2048:
+            raise ValueError("Key length must be at least 2048 bits for security")
+
+        user_id = name
+        if comment:
+            user_id += f" ({comment})"
+        user_id += f" <{email}>"
+
+        created = int(time.time())
+        expires_in = NativePGPService._parse_expire_date(expire_date, created)
+
+        if key_type == "RSA":
+            primary = _Key(rsa.generate_private_key(65537, key_length), pgp.ALGO_RSA[0], created)
+            subkey = _Key(rsa.generate_private_key(65537, subkey_length), pgp.ALGO_RSA[0], created)
+        else:
+            primary = _Key(ed25519.Ed25519PrivateKey.generate(), pgp.ALGO_EDDSA, created)
+            subkey = _Key(x25519.X25519PrivateKey.generate(), pgp.ALGO_ECDH, created)
+
+        user_id_bytes = user_id.encode("utf-8")
+        certification = NativePGPService._signature(
+            primary,
+            _SIG_POSITIVE_CERTIFICATION,
+            primary.hash_prefix() + b"\xb4" + len(user_id_bytes).to_bytes(4, "big") + user_id_bytes,
+            created,
+            expires_in,
+            _KEY_FLAGS_CERTIFY_SIGN,
+            preferences=True
+        )
+        binding = NativePGPService._signature(
+            primary,
+            _SIG_SUBKEY_BINDING,
+            primary.hash_prefix() + subkey.hash_prefix(),
+            created,
+            expires_in,
+            _KEY_FLAGS_ENCRYPT
+        )
+
+        s2k_count = (kdf_policy or get_kdf_policy()).calibrate()["s2k_count"]
+        shared = [
+            (pgp.TAG_USER_ID, user_id_bytes),
+            (pgp.TAG_SIGNATURE, certification),
+        ]
+        public_packets = (
+            [(pgp.TAG_PUBLIC_KEY, primary.public_body)]
+            + shared
+            + [(pgp.TAG_PUBLIC_SUBKEY, subkey.public_body), (pgp.TAG_SIGNATURE, binding)]
+        )
+        secret_packets = (
+            [(pgp.TAG_SECRET_KEY, NativePGPService._secret_body(primary, passphrase, s2k_count))]
+            + shared
+            + [
+                (pgp.TAG_SECRET_SUBKEY, NativePGPService._secret_body(subkey, passphrase, s2k_count)),
+                (pgp.TAG_SIGNATURE, binding),
+            ]
+        )
+
+        return {
+            "public_key": pgp.armor("PUBLIC KEY BLOCK", NativePGPService._encode(public_packets)),
+            "private_key": pgp.armor("PRIVATE KEY BLOCK", NativePGPService._encode(secret_packets)),
+            "fingerprint": primary.fingerprint.hex().upper(),
+            "user_id": user_id,
+        }
+
+    @staticmethod
+    def _encode(packets) -> bytes:
+        return b"".join(pgp.encode_packet(tag, body, old_format=tag < 16) for tag, body in packets)
+
+    @staticmethod
+    def _signature(
+        signer: _Key,
+        signature_type: int,
+        signed_data: bytes,
+        created: int,
+        expires_in: Optional[int],
+        key_flags: int,
+        preferences: bool = False
+    ) -> bytes:
+        hashed = [
+            pgp.subpacket(pgp.SUBPACKET_ISSUER_FINGERPRINT, b"\x04" + signer.fingerprint),
+            pgp.subpacket(pgp.SUBPACKET_CREATION_TIME, created.to_bytes(4, "big")),
+            pgp.subpacket(pgp.SUBPACKET_KEY_FLAGS, bytes([key_flags])),
+        ]
+        if expires_in:
+            hashed.append(pgp.subpacket(pgp.SUBPACKET_KEY_EXPIRATION, expires_in.to_bytes(4, "big")))
+        if preferences:
+            # Same algorithm preferences gpg advertises for new keys
+            hashed += [
+                pgp.subpacket(pgp.SUBPACKET_PREFERRED_SYMMETRIC, bytes([9, 8, 7, 2])),
+                pgp.subpacket(pgp.SUBPACKET_PREFERRED_HASH, bytes([10, 9, 8, 11, 2])),
+                pgp.subpacket(pgp.SUBPACKET_PREFERRED_COMPRESSION, bytes([2, 3, 1])),
+                pgp.subpacket(pgp.SUBPACKET_FEATURES, b"\x01"),
+                pgp.subpacket(pgp.SUBPACKET_KEY_SERVER_PREFERENCES, b"\x80"),
+            ]
+        hashed_data = b"".join(hashed)
+
+        header = (
+            bytes([4, signature_type, signer.algorithm, _HASH_SHA256])
+            + len(hashed_data).to_bytes(2, "big")
+            + hashed_data
+        )
+        trailer = b"\x04\xff" + len(header).to_bytes(4, "big")
+        digest = hashlib.sha256(signed_data + header + trailer).digest()
+
+        unhashed = pgp.subpacket(pgp.SUBPACKET_ISSUER, signer.key_id)
+        return header + len(unhashed).to_bytes(2, "big") + unhashed + digest[:2] + signer.sign(digest)
+
+    @staticmethod
+    def _secret_body(key: _Key, passphrase: str, s2k_count: int) -> bytes:
+        """Secret key packet body protected with iterated+salted S2K and AES-256 CFB"""
+        secret = key.secret_fields()
+        salt = os.urandom(8)
+        iv = os.urandom(16)
+        coded_count = pgp.encode_s2k_count(s2k_count)
+        session_key = pgp.s2k_derive(passphrase.encode("utf-8"), salt, pgp.decode_s2k_count(coded_count))
+
+        plaintext = secret + hashlib.sha1(secret).digest()
+        encryptor = Cipher(algorithms.AES(session_key), modes.CFB(iv)).encryptor()
+        encrypted = encryptor.update(plaintext) + encryptor.finalize()
+
+        return (
+            key.public_body
+            + bytes([_S2K_USAGE_SHA1_CHECK, _CIPHER_AES256, _S2K_ITERATED_SALTED, _HASH_SHA256])
+            + salt
+            + bytes([coded_count])
+            + iv
+            + encrypted
+        )
+
+    @staticmethod
+    def _parse_expire_date(expire_date: str, created: int) -> Optional[int]:
+        """
+        Translate a gpg-style expiry ("0", days, "<n>d/w/m/y" or "YYYY-MM-DD")
+        into seconds after key creation
+        """
+        value = str(expire_date or "0").strip().lower()
+        if value in ("0", "never", "none"):
+            return None
+        match = re.fullmatch(r"(\d+)([dwmy]?)", value)
+        if match:
+            days_per_unit = {"": 1, "d": 1, "w": 7, "m": 30, "y": 365}[match.group(2)]
+            seconds = int(match.group(1)) * days_per_unit * 86400
+            if not seconds:
+                return None
+        else:
+            try:
+                expires = datetime.strptime(value, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+            except ValueError:
+                raise ValueError(f"Unsupported expire date: {expire_date}")
+            seconds = int(expires.timestamp()) - created
+            if seconds <= 0:
+                raise ValueError("Expire date must be in the future")
+        # The key expiration time subpacket is a four-octet number of seconds
+        if seconds >= 2 ** 32:
+            raise ValueError(f"Expire date is too far in the future: {expire_date} (at most about 136 years)")
+        return seconds
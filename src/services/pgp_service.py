@@ -1,19 +1,89 @@
 import gnupg
-from typing import Dict
-import tempfile
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import BinaryIO, Deque, Dict, Iterable, Iterator, List, Optional, Union
 import os
-import shutil
+from .gnupg_homes import clear_passphrase_cache, create_homedir, remove_homedir, write_agent_conf
+from .gpg_worker_pool import GPGWorkerPool
+from . import openpgp_packets
+from .kdf_policy import KDFCostPolicy, get_kdf_policy
+from .pgp_native_service import NativePGPService
+
+# File operations take a path or a binary file object opened for reading
+FileInput = Union[str, BinaryIO]
 
 class PGPService:
-    def __init__(self):
-        # Create a temporary directory for GPG home
-        self.gnupghome = tempfile.mkdtemp()
-        # Initialize GPG with specific options
-        self.gpg = gnupg.GPG(
-            gnupghome=self.gnupghome,
-            use_agent=False,
-            options=['--no-tty']
-        )
+    # Optional pool of long-lived GnuPG workers; when set, services created
+    # without their own pool borrow a worker per request instead of
+    # bootstrapping a fresh homedir
+    worker_pool: Optional[GPGWorkerPool] = None
+
+    # "gpg" drives GnuPG; "native" builds the key in process (RSA and EdDSA/ECDH only)
+    SUPPORTED_BACKENDS = ("gpg", "native")
+
+    # Size of the blocks file operations feed to gpg; memory use stays at a
+    # few of these no matter how large the file is
+    CHUNK_SIZE = 64 * 1024
+
+    # Curves gpg accepts for elliptic-curve primary keys, default first
+    SUPPORTED_CURVES = {
+        "EDDSA": ("ed25519",),
+        "ECDSA": ("nistp256", "nistp384"),
+    }
+    # ECDH curve of the encryption subkey that goes with each primary curve
+    SUBKEY_CURVES = {
+        "ed25519": "cv25519",
+        "nistp256": "nistp256",
+        "nistp384": "nistp384",
+    }
+
+    def __init__(
+        self,
+        kdf_policy: Optional[KDFCostPolicy] = None,
+        worker_pool: Optional[GPGWorkerPool] = None,
+        base_dir: Optional[str] = None
+    ):
+        """
+        Args:
+            kdf_policy: KDF cost policy for protecting secret keys (process-wide policy by default)
+            worker_pool: Pool to borrow gpg workers from instead of using an own homedir
+            base_dir: Directory for the own homedir (RAM-backed if available by default)
+        """
+        self.kdf_policy = kdf_policy
+        self.worker_pool = worker_pool or PGPService.worker_pool
+        self._gpg_instance: Optional[gnupg.GPG] = None
+        self.gnupghome: Optional[str] = None
+        if self.worker_pool is not None:
+            return
+
+        # Create a temporary directory for GPG home, in memory where possible
+        self.gnupghome = create_homedir(base_dir)
+        # gpg-agent protects secret keys, so the S2K cost is configured there
+        write_agent_conf(self.gnupghome, kdf_policy or get_kdf_policy())
+
+    @property
+    def gpg(self) -> gnupg.GPG:
+        """gpg instance for this service's homedir, started on first use"""
+        if self.gnupghome is None:
+            raise RuntimeError("PGPService has no homedir (closed or backed by a worker pool)")
+        if self._gpg_instance is None:
+            # Initialize GPG with specific options
+            self._gpg_instance = gnupg.GPG(
+                gnupghome=self.gnupghome,
+                use_agent=False,
+                options=['--no-tty']
+            )
+        return self._gpg_instance
+
+    @contextmanager
+    def _gpg(self) -> Iterator[gnupg.GPG]:
+        """Yield the gpg instance to run one request with"""
+        if self.worker_pool is None:
+            yield self.gpg
+            return
+        with self.worker_pool.worker() as worker:
+            yield worker.gpg
 
     def generate_keypair(
         self,
@@ -23,20 +93,47 @@ class PGPService:
         comment: str = "",
         key_type: str = "RSA",
         key_length: int = 2048,
-        subkey_type: str = "RSA",
+        subkey_type: Optional[str] = None,
         subkey_length: int = 2048,
-        expire_date: str = "0"
+        expire_date: str = "0",
+        backend: str = "gpg",
+        key_curve: Optional[str] = None
     ) -> Dict[str, str]:
         """
         Generate a PGP keypair with customizable parameters
+        Args:
+            key_type: "RSA", "DSA", "EDDSA" or "ECDSA"
+            subkey_type: Encryption subkey type; defaults to RSA for RSA/DSA keys
+                and ECDH on the matching curve for EDDSA/ECDSA keys
+            backend: "gpg" (default) or "native" to build the key without spawning gpg
+            key_curve: Curve for EDDSA ("ed25519") or ECDSA ("nistp256", "nistp384") keys
         Returns: Dictionary containing public key, private key, fingerprint, and user ID
         """
+        if backend not in self.SUPPORTED_BACKENDS:
+            raise ValueError(f"Unsupported backend: {backend}. Supported backends are: gpg, native")
+
         # Validate required fields
         if not name or not email:
             raise ValueError("Name and email are required for PGP key generation")
         if not passphrase:
             raise ValueError("Passphrase is required for PGP key generation")
 
+        key_params = self._key_parameters(key_type, key_length, subkey_type, subkey_length, key_curve)
+
+        if backend == "native":
+            return NativePGPService.generate_keypair(
+                name=name,
+                email=email,
+                passphrase=passphrase,
+                comment=comment,
+                key_type=key_type,
+                key_length=key_length,
+                subkey_type=subkey_type,
+                subkey_length=subkey_length,
+                expire_date=expire_date,
+                kdf_policy=self.kdf_policy
+            )
+
         # Build user ID string
         user_id = name
         if comment:
@@ -45,10 +142,7 @@ class PGPService:
 
         # Create key input data
         key_input = {
-            'key_type': key_type,
-            'key_length': key_length,
-            'subkey_type': subkey_type,
-            'subkey_length': subkey_length,
+            **key_params,
             'name_real': name,
             'name_email': email,
             'passphrase': passphrase,
@@ -59,37 +153,42 @@ class PGPService:
         if comment:
             key_input['name_comment'] = comment
 
-        # Generate key
-        print(f"\nGenerating key for user ID: {user_id}")
-        key = self.gpg.gen_key(self.gpg.gen_key_input(**key_input))
-        
-        if not key.fingerprint:
-            raise ValueError("Failed to generate PGP key pair")
-
-        # Export public key
-        public_key = self.gpg.export_keys(key.fingerprint, armor=True)
-        if not public_key:
-            raise ValueError("Failed to export public key")
-
-        # Export private key
-        private_key = self.gpg.export_keys(
-            key.fingerprint,
-            secret=True,
-            armor=True,
-            passphrase=passphrase
-        )
-        if not private_key:
-            raise ValueError("Failed to export private key")
+        with self._gpg() as gpg:
+            # Generate key
+            print(f"\nGenerating key for user ID: {user_id}")
+            key = gpg.gen_key(gpg.gen_key_input(**key_input))
+
+            if not key.fingerprint:
+                raise ValueError("Failed to generate PGP key pair")
 
-        # Get key info
-        keys = self.gpg.list_keys()
-        key_info = next((k for k in keys if k['fingerprint'] == key.fingerprint), None)
-        
-        if not key_info:
-            raise ValueError("Could not find generated key in keyring")
+            # Export private key; the public key and user ID are derived from
+            # it below instead of spawning gpg again
+            private_key = gpg.export_keys(
+                key.fingerprint,
+                secret=True,
+                armor=True,
+                passphrase=passphrase
+            )
+            if not private_key:
+                raise ValueError("Failed to export private key")
+
+            try:
+                _, secret_data = openpgp_packets.dearmor(private_key)
+                public_key = openpgp_packets.armor(
+                    "PUBLIC KEY BLOCK", openpgp_packets.public_from_secret(secret_data)
+                )
+                actual_uid = openpgp_packets.first_user_id(secret_data) or user_id
+            except ValueError:
+                # Fall back to gpg for key formats the packet helpers do not handle
+                public_key = gpg.export_keys(key.fingerprint, armor=True)
+                if not public_key:
+                    raise ValueError("Failed to export public key")
 
-        # Get the actual user ID from the key
-        actual_uid = key_info['uids'][0] if key_info.get('uids') else user_id
+                # Look the key up by fingerprint rather than listing the keyring
+                keys = gpg.list_keys(keys=[key.fingerprint])
+                if not keys:
+                    raise ValueError("Could not find generated key in keyring")
+                actual_uid = keys[0]['uids'][0] if keys[0].get('uids') else user_id
 
         return {
             "public_key": public_key,
@@ -98,10 +197,390 @@ class PGPService:
             "user_id": actual_uid
         }
 
+    def generate_many(
+        self,
+        identities: Iterable[Dict[str, str]],
+        key_type: str = "RSA",
+        key_length: int = 2048,
+        subkey_type: Optional[str] = None,
+        subkey_length: int = 2048,
+        chunk_size: int = 25,
+        jobs: Optional[int] = None,
+        key_curve: Optional[str] = None
+    ) -> Iterator[Dict[str, str]]:
+        """
+        Generate PGP keypairs for many identities through shared gpg invocations
+
+        Each chunk of identities is generated by one gpg --batch parameter
+        stream and exported with one gpg call per distinct passphrase, in a
+        worker whose keyring is scrubbed afterwards. Chunks run concurrently
+        on up to ``jobs`` workers.
+
+        Args:
+            identities: Iterable of dicts with "name", "email", "passphrase" and
+                optional "comment" and "expire_date" keys, consumed lazily
+            key_type, subkey_type, key_curve: As for generate_keypair
+            chunk_size: Number of keys generated per gpg invocation
+            jobs: Number of chunks in progress at once (defaults to the pool
+                size, or the CPU count when the service has no pool)
+
+        Returns: Iterator of the same dictionaries generate_keypair returns, in input order
+        """
+        if chunk_size < 1:
+            raise ValueError("Chunk size must be at least 1")
+        if jobs is None:
+            jobs = self.worker_pool.size if self.worker_pool is not None else (os.cpu_count() or 1)
+        if jobs < 1:
+            raise ValueError("Jobs must be at least 1")
+        key_params = self._key_parameters(key_type, key_length, subkey_type, subkey_length, key_curve)
+        return self._stream_many(identities, key_params, chunk_size, jobs)
+
+    def _stream_many(
+        self,
+        identities: Iterable[Dict[str, str]],
+        key_params: Dict[str, object],
+        chunk_size: int,
+        jobs: int
+    ) -> Iterator[Dict[str, str]]:
+        # Without a shared pool, the batch gets short-lived workers of its own
+        pool = self.worker_pool or GPGWorkerPool(size=jobs, kdf_policy=self.kdf_policy)
+        executor = ThreadPoolExecutor(max_workers=jobs)
+        try:
+            # Bounded window of chunks in flight, drained in submission order
+            pending: Deque[Future] = deque()
+            chunks = self._chunk_identities(identities, chunk_size)
+            exhausted = False
+            while not exhausted or pending:
+                while not exhausted and len(pending) < jobs * 2:
+                    chunk = next(chunks, None)
+                    if chunk is None:
+                        exhausted = True
+                    else:
+                        pending.append(executor.submit(
+                            self._generate_chunk, pool, chunk, key_params
+                        ))
+                if pending:
+                    yield from pending.popleft().result()
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+            if pool is not self.worker_pool:
+                pool.close()
+
+    @staticmethod
+    def _key_parameters(
+        key_type: str,
+        key_length: int,
+        subkey_type: Optional[str],
+        subkey_length: int,
+        key_curve: Optional[str]
+    ) -> Dict[str, object]:
+        """
+        gpg key generation parameters for a primary key and its encryption subkey
+        Returns: Keyword arguments for gen_key_input
+        """
+        key_type = key_type.upper()
+        if key_type in ("RSA", "DSA"):
+            return {
+                'key_type': key_type,
+                'key_length': key_length,
+                'subkey_type': (subkey_type or "RSA").upper(),
+                'subkey_length': subkey_length,
+            }
+        if key_type not in PGPService.SUPPORTED_CURVES:
+            raise ValueError(f"Unsupported key type: {key_type}. Supported types are: RSA, DSA, EDDSA, ECDSA")
+
+        curves = PGPService.SUPPORTED_CURVES[key_type]
+        key_curve = (key_curve or curves[0]).lower()
+        if key_curve not in curves:
+            raise ValueError(
+                f"Unsupported curve for {key_type}: {key_curve}. Supported curves are: {', '.join(curves)}"
+            )
+        subkey_type = (subkey_type or "ECDH").upper()
+        if subkey_type != "ECDH":
+            raise ValueError(f"{key_type} keys need an ECDH encryption subkey")
+        # Elliptic-curve keys are sized by their curve, so no Key-Length lines
+        return {
+            'key_type': key_type,
+            'key_curve': key_curve,
+            'subkey_type': subkey_type,
+            'subkey_curve': PGPService.SUBKEY_CURVES[key_curve],
+        }
+
+    @staticmethod
+    def _chunk_identities(identities: Iterable[Dict[str, str]], chunk_size: int) -> Iterator[List[Dict[str, str]]]:
+        chunk: List[Dict[str, str]] = []
+        for index, identity in enumerate(identities):
+            chunk.append(PGPService._batch_key_input(index, identity))
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    @staticmethod
+    def _batch_key_input(index: int, identity: Dict[str, str]) -> Dict[str, str]:
+        name = identity.get("name") or ""
+        email = identity.get("email") or ""
+        passphrase = identity.get("passphrase") or ""
+        if not name or not email:
+            raise ValueError(f"Identity {index} needs a name and an email")
+        if not passphrase:
+            raise ValueError(f"Identity {index} needs a passphrase")
+        fields = {
+            "name_real": name,
+            "name_email": email,
+            "passphrase": passphrase,
+            "expire_date": str(identity.get("expire_date") or "0"),
+        }
+        if identity.get("comment"):
+            fields["name_comment"] = identity["comment"]
+        # A newline would start a new parameter line in the batch stream
+        for value in fields.values():
+            if "\n" in value or "\r" in value:
+                raise ValueError(f"Identity {index} contains a line break")
+        return fields
+
+    @staticmethod
+    def _generate_chunk(
+        pool: GPGWorkerPool,
+        chunk: List[Dict[str, str]],
+        key_params: Dict[str, object]
+    ) -> List[Dict[str, str]]:
+        with pool.worker() as worker:
+            return PGPService._generate_chunk_with(worker.gpg, chunk, key_params)
+
+    @staticmethod
+    def _generate_chunk_with(
+        gpg: gnupg.GPG,
+        chunk: List[Dict[str, str]],
+        key_params: Dict[str, object]
+    ) -> List[Dict[str, str]]:
+        # One parameter block per identity; the handle ties KEY_CREATED back to it
+        key_input = "".join(
+            gpg.gen_key_input(
+                **key_params,
+                handle=str(position),
+                **fields
+            )
+            for position, fields in enumerate(chunk)
+        )
+        result = gpg.gen_key(key_input)
+        fingerprints: Dict[int, str] = {}
+        for line in (result.stderr or "").splitlines():
+            parts = line.split()
+            if len(parts) >= 5 and parts[1] == "KEY_CREATED":
+                fingerprints[int(parts[4])] = parts[3]
+        if len(fingerprints) != len(chunk):
+            raise ValueError("Failed to generate PGP key pairs")
+
+        # Keys sharing a passphrase are exported together and split afterwards
+        by_passphrase: Dict[str, List[int]] = {}
+        for position, fields in enumerate(chunk):
+            by_passphrase.setdefault(fields["passphrase"], []).append(position)
+        secret_keys: Dict[str, bytes] = {}
+        for passphrase, positions in by_passphrase.items():
+            exported = gpg.export_keys(
+                [fingerprints[position] for position in positions],
+                secret=True,
+                armor=False,
+                passphrase=passphrase
+            )
+            if not exported:
+                raise ValueError("Failed to export private keys")
+            for key_data in openpgp_packets.split_keys(exported):
+                secret_keys[openpgp_packets.fingerprint(key_data)] = key_data
+
+        results = []
+        for position, fields in enumerate(chunk):
+            secret_data = secret_keys.get(fingerprints[position])
+            if secret_data is None:
+                raise ValueError("Failed to export private key")
+            results.append({
+                "public_key": openpgp_packets.armor(
+                    "PUBLIC KEY BLOCK", openpgp_packets.public_from_secret(secret_data)
+                ),
+                "private_key": openpgp_packets.armor("PRIVATE KEY BLOCK", secret_data),
+                "fingerprint": fingerprints[position],
+                "user_id": openpgp_packets.first_user_id(secret_data),
+            })
+        return results
+
+    def encrypt_file(
+        self,
+        input_file: FileInput,
+        output_path: str,
+        public_key: str,
+        armor: bool = False
+    ) -> Dict[str, str]:
+        """
+        Encrypt a file for the holder of a public key, streaming it through gpg
+        Args:
+            input_file: Path or binary file object with the plaintext
+            output_path: Where gpg writes the encrypted file
+            public_key: Armored public key of the recipient
+            armor: Write ASCII armored output instead of binary
+        Returns: Dictionary with the output path and the recipient fingerprint
+        """
+        with self._gpg() as gpg:
+            fingerprint = self._import_key(gpg, public_key)
+            result = self._run_file_operation(
+                gpg, "encrypt_file", input_file, output_path,
+                recipients=[fingerprint], always_trust=True, armor=armor
+            )
+            if not result.ok:
+                self._discard_output(output_path)
+                raise ValueError(f"Encryption failed: {result.status}")
+        return {"output": output_path, "fingerprint": fingerprint}
+
+    def decrypt_file(
+        self,
+        input_file: FileInput,
+        output_path: str,
+        private_key: str,
+        passphrase: str
+    ) -> Dict[str, str]:
+        """
+        Decrypt a file with a private key, streaming it through gpg
+        Args:
+            input_file: Path or file object with the encrypted data (binary or armored)
+            output_path: Where gpg writes the plaintext
+            private_key: Armored private key the file was encrypted for
+            passphrase: Passphrase of the private key
+        Returns: Dictionary with the output path and the key fingerprint
+        """
+        if not passphrase:
+            raise ValueError("Passphrase is required to decrypt")
+        with self._gpg() as gpg:
+            fingerprint = self._import_key(gpg, private_key)
+            with self._checked_passphrase(gpg):
+                result = self._run_file_operation(
+                    gpg, "decrypt_file", input_file, output_path,
+                    passphrase=passphrase, always_trust=True
+                )
+            if not result.ok:
+                self._discard_output(output_path)
+                raise ValueError(f"Decryption failed: {result.status}")
+        return {"output": output_path, "fingerprint": fingerprint}
+
+    def sign_file(
+        self,
+        input_file: FileInput,
+        output_path: str,
+        private_key: str,
+        passphrase: str,
+        armor: bool = True
+    ) -> Dict[str, str]:
+        """
+        Create a detached signature for a file, streaming it through gpg
+        Args:
+            input_file: Path or binary file object with the data to sign
+            output_path: Where gpg writes the signature
+            private_key: Armored private key to sign with
+            passphrase: Passphrase of the private key
+            armor: Write an ASCII armored (.asc) instead of a binary (.sig) signature
+        Returns: Dictionary with the signature path and the signer fingerprint
+        """
+        if not passphrase:
+            raise ValueError("Passphrase is required to sign")
+        with self._gpg() as gpg:
+            fingerprint = self._import_key(gpg, private_key)
+            with self._checked_passphrase(gpg):
+                result = self._run_file_operation(
+                    gpg, "sign_file", input_file, output_path,
+                    keyid=fingerprint, passphrase=passphrase,
+                    clearsign=False, detach=True, binary=not armor
+                )
+            if not result.fingerprint:
+                self._discard_output(output_path)
+                raise ValueError(f"Signing failed: {result.status}")
+        return {"output": output_path, "fingerprint": fingerprint}
+
+    def verify_file(
+        self,
+        signature_file: FileInput,
+        data_path: str,
+        public_key: str
+    ) -> Dict[str, object]:
+        """
+        Check a detached signature over a file; gpg reads the data file itself
+        Args:
+            signature_file: Path or file object with the signature (binary or armored)
+            data_path: Path of the signed file
+            public_key: Armored public key of the expected signer
+        Returns: Dictionary with "valid", the signer "fingerprint" and "user_id"
+        """
+        with self._gpg() as gpg:
+            self._import_key(gpg, public_key)
+            # Only the small signature passes through Python; gpg reads the data file
+            if isinstance(signature_file, str):
+                with open(signature_file, "rb") as f:
+                    result = gpg.verify_file(f, data_filename=data_path, close_file=False)
+            else:
+                result = gpg.verify_file(signature_file, data_filename=data_path, close_file=False)
+        return {
+            "valid": bool(result.valid),
+            "fingerprint": result.fingerprint or "",
+            "user_id": result.username or "",
+        }
+
+    @staticmethod
+    def _import_key(gpg: gnupg.GPG, key: str) -> str:
+        """Import an armored key into the worker keyring; Returns: primary key fingerprint"""
+        if not key or "-----BEGIN PGP" not in key:
+            raise ValueError("An armored PGP key is required")
+        result = gpg.import_keys(key)
+        if not result.fingerprints:
+            raise ValueError("Failed to import PGP key")
+        return result.fingerprints[0]
+
+    @staticmethod
+    @contextmanager
+    def _checked_passphrase(gpg: gnupg.GPG) -> Iterator[None]:
+        """
+        Run an operation that unlocks a secret key with an empty agent cache,
+        so a passphrase cached by an earlier operation cannot stand in for
+        the one given now, and leave the cache empty again afterwards
+        """
+        clear_passphrase_cache(gpg.gnupghome)
+        try:
+            yield
+        finally:
+            clear_passphrase_cache(gpg.gnupghome)
+
+    def _run_file_operation(self, gpg: gnupg.GPG, operation: str, input_file: FileInput, output_path: str, **kwargs):
+        # gpg writes the output file itself and python-gnupg feeds it the
+        # input CHUNK_SIZE bytes at a time, so neither side is held in memory
+        gpg.buffer_size = self.CHUNK_SIZE
+        if not isinstance(input_file, str):
+            return getattr(gpg, operation)(input_file, output=output_path, **kwargs)
+        # Open paths here: python-gnupg's sign_file closes files it opened
+        # itself before its copy thread has finished streaming them
+        with open(input_file, "rb") as f:
+            return getattr(gpg, operation)(f, output=output_path, **kwargs)
+
+    @staticmethod
+    def _discard_output(output_path: str) -> None:
+        """Remove a partial output file left by a failed operation"""
+        if os.path.exists(output_path):
+            os.unlink(output_path)
+
+    def close(self) -> None:
+        """Stop gpg-agent and delete the homedir; safe to call more than once"""
+        gnupghome, self.gnupghome = self.gnupghome, None
+        if gnupghome is not None:
+            # Only a gpg that actually ran can have started an agent
+            remove_homedir(gnupghome, kill_agent=self._gpg_instance is not None)
+        self._gpg_instance = None
+
+    def __enter__(self) -> "PGPService":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
     def __del__(self):
-        # Clean up the temporary directory
-        if hasattr(self, 'gnupghome') and os.path.exists(self.gnupghome):
-            try:
-                shutil.rmtree(self.gnupghome, ignore_errors=True)
-            except Exception:
-                pass  # Ignore cleanup errors
+        # Last-resort cleanup for services that were never closed
+        try:
+            self.close()
+        except Exception:
+            pass  # Ignore cleanup errors
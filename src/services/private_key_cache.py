@@ -0,0 +1,91 @@
+"""
+In-memory cache of decrypted private key objects, so signing many CSRs with
+one encrypted key pays for its KDF once
+"""
+from cryptography.hazmat.backends import default_backend
+from cryptography.hazmat.primitives import serialization
+from collections import OrderedDict
+from typing import Optional, Tuple
+import hashlib
+import hmac
+import os
+import threading
+import time
+
+
+class PrivateKeyCache:
+    """
+    LRU cache of loaded private keys with a size limit and TTL.
+
+    Entries are keyed by an HMAC of the PEM and password under a random
+    per-process secret, so the cache never holds the password or a digest
+    that could be brute-forced offline. Keys live only in process memory.
+    """
+
+    def __init__(self, max_entries: int = 32, ttl: float = 300.0):
+        """
+        Args:
+            max_entries: Most keys kept; the least recently used is evicted first
+            ttl: Seconds a key stays cached after it was loaded
+        """
+        if max_entries < 1:
+            raise ValueError("Cache size must be at least 1")
+        if ttl <= 0:
+            raise ValueError("Cache TTL must be positive")
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._secret = os.urandom(32)
+        # digest -> (expiry on the monotonic clock, private key)
+        self._entries: "OrderedDict[bytes, Tuple[float, object]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def load(self, private_key_pem: str, password: Optional[str] = None):
+        """
+        Load a PEM private key, from the cache when it was unlocked recently
+        Args:
+            private_key_pem: Private key in PEM format
+            password: Password if the private key is encrypted
+        Returns: Private key object
+        """
+        pem = private_key_pem.encode()
+        secret = password.encode() if password else b""
+        digest = hmac.new(
+            self._secret, len(pem).to_bytes(8, "big") + pem + secret, hashlib.sha256
+        ).digest()
+
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(digest)
+                return entry[1]
+
+        # Load outside the lock so a slow KDF does not block other keys
+        private_key = serialization.load_pem_private_key(
+            pem,
+            password=secret or None,
+            backend=default_backend()
+        )
+
+        with self._lock:
+            self._entries[digest] = (time.monotonic() + self.ttl, private_key)
+            self._entries.move_to_end(digest)
+            self._evict(time.monotonic())
+        return private_key
+
+    def purge(self) -> None:
+        """Drop every cached key"""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._evict(time.monotonic())
+            return len(self._entries)
+
+    def _evict(self, now: float) -> None:
+        """Drop expired entries and trim to max_entries; caller holds the lock"""
+        for digest in [d for d, (expires, _) in self._entries.items() if expires <= now]:
+            del self._entries[digest]
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
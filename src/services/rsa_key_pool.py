@@ -0,0 +1,153 @@
+"""
+Pool of pre-generated RSA private keys, refilled by background workers
+"""
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.hazmat.backends import default_backend
+from collections import deque
+from typing import Deque, Dict, Iterable, List, Optional, Set, Tuple
+import threading
+
+PoolKey = Tuple[int, int]
+
+
+class RSAKeyPool:
+    """
+    Keeps a stock of ready RSA private keys per (key_size, public_exponent).
+
+    Whenever a bucket drops below ``low_watermark`` keys, the background
+    workers generate new keys until it holds ``high_watermark`` again.
+    """
+
+    def __init__(
+        self,
+        sizes: Iterable[PoolKey] = ((2048, 65537),),
+        low_watermark: int = 2,
+        high_watermark: int = 4,
+        workers: int = 1
+    ):
+        """
+        Args:
+            sizes: (key_size, public_exponent) pairs to keep keys ready for
+            low_watermark: Refill a bucket once it holds fewer keys than this
+            high_watermark: Stop refilling a bucket once it holds this many keys
+            workers: Number of background generator threads
+        """
+        if low_watermark < 1 or high_watermark < low_watermark:
+            raise ValueError("Watermarks must satisfy 1 <= low_watermark <= high_watermark")
+        if workers < 1:
+            raise ValueError("At least one worker is required")
+
+        self.low_watermark = low_watermark
+        self.high_watermark = high_watermark
+        self.workers = workers
+
+        self._buckets: Dict[PoolKey, Deque[rsa.RSAPrivateKey]] = {
+            (int(size), int(exponent)): deque() for size, exponent in sizes
+        }
+        self._pending: Dict[PoolKey, int] = {key: 0 for key in self._buckets}
+        # Every bucket starts empty, so all of them are filled up to the high watermark
+        self._refilling: Set[PoolKey] = set(self._buckets)
+        self._cond = threading.Condition()
+        self._threads: List[threading.Thread] = []
+        self._running = False
+        self.hits = 0
+        self.misses = 0
+
+    def start(self) -> "RSAKeyPool":
+        """Start the background workers (no-op if already running)"""
+        with self._cond:
+            if self._running:
+                return self
+            self._running = True
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._worker, name=f"rsa-key-pool-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop the background workers; keys already in the pool are kept"""
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def acquire(self, key_size: int, public_exponent: int = 65537) -> Optional[rsa.RSAPrivateKey]:
+        """
+        Take a ready key from the pool
+        Returns: An RSA private key, or None if the pool has none for these parameters
+        """
+        pool_key = (key_size, public_exponent)
+        with self._cond:
+            bucket = self._buckets.get(pool_key)
+            if not bucket:
+                self.misses += 1
+                return None
+            private_key = bucket.popleft()
+            self.hits += 1
+            if len(bucket) < self.low_watermark:
+                self._refilling.add(pool_key)
+                self._cond.notify_all()
+            return private_key
+
+    def wait_until_full(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until every bucket has been refilled to its high watermark
+        Returns: True if the pool is full, False if the timeout expired first
+        """
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._refilling, timeout)
+
+    def stats(self) -> Dict[str, object]:
+        """
+        Report pool usage
+        Returns: Dictionary with hit/miss counters and ready keys per bucket
+        """
+        with self._cond:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "available": {key: len(bucket) for key, bucket in self._buckets.items()},
+            }
+
+    def _next_bucket(self) -> Optional[PoolKey]:
+        for pool_key in self._refilling:
+            if len(self._buckets[pool_key]) + self._pending[pool_key] < self.high_watermark:
+                return pool_key
+        return None
+
+    def _worker(self) -> None:
+        while True:
+            with self._cond:
+                pool_key = self._next_bucket()
+                while self._running and pool_key is None:
+                    self._cond.wait()
+                    pool_key = self._next_bucket()
+                if not self._running:
+                    return
+                self._pending[pool_key] += 1
+
+            key_size, public_exponent = pool_key
+            try:
+                private_key = rsa.generate_private_key(
+                    public_exponent=public_exponent,
+                    key_size=key_size,
+                    backend=default_backend()
+                )
+            except Exception:
+                with self._cond:
+                    # Unusable parameters, stop trying to fill this bucket
+                    self._pending[pool_key] -= 1
+                    self._refilling.discard(pool_key)
+                    self._cond.notify_all()
+                continue
+
+            with self._cond:
+                self._pending[pool_key] -= 1
+                bucket = self._buckets[pool_key]
+                bucket.append(private_key)
+                if len(bucket) >= self.high_watermark:
+                    self._refilling.discard(pool_key)
+                self._cond.notify_all()
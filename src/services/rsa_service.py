@@ -1,9 +1,16 @@
-from cryptography.hazmat.primitives import serialization
 from cryptography.hazmat.primitives.asymmetric import rsa
 from cryptography.hazmat.backends import default_backend
-from typing import Tuple
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Iterator, Optional, Tuple
+import os
+from .key_handle import KeyHandle
+from .rsa_key_pool import RSAKeyPool
 
 class RSAService:
+    # Optional pool of pre-generated keys; when set, generate_keypair serves
+    # keys from it and only generates inline when the pool is empty
+    key_pool: Optional[RSAKeyPool] = None
+
     @staticmethod
     def generate_keypair(
         key_size: int = 2048,
@@ -14,35 +21,111 @@ class RSAService:
         Generate an RSA keypair with customizable parameters
         Returns: (public_key, private_key) as PEM strings
         """
+        handle = RSAService.generate_key(key_size, public_exponent, password)
+        return handle.spki_pem, handle.pkcs8_pem
+
+    @staticmethod
+    def generate_key(
+        key_size: int = 2048,
+        public_exponent: int = 65537,
+        password: str = None
+    ) -> KeyHandle:
+        """
+        Generate an RSA key without serializing it
+        Returns: KeyHandle that encodes the key (PKCS1, PKCS8, DER, OpenSSH, ...) on demand
+        """
         if key_size < 2048:
             raise ValueError("Key size must be at least 2048 bits for security")
 
-        # Generate private key
-        private_key = rsa.generate_private_key(
+        private_key = RSAService._new_private_key(key_size, public_exponent)
+        return KeyHandle(private_key, password)
+
+    @staticmethod
+    def generate_many(
+        count: int,
+        key_size: int = 2048,
+        password: str = None,
+        public_exponent: int = 65537,
+        jobs: Optional[int] = None
+    ) -> Iterator[Tuple[str, str]]:
+        """
+        Generate many RSA keypairs in parallel across a process pool
+        Args:
+            count: Number of keypairs to generate
+            key_size: Size of each key in bits
+            password: Optional password to encrypt every private key
+            public_exponent: RSA public exponent
+            jobs: Number of worker processes (defaults to the CPU count)
+        Returns: Iterator of (public_key, private_key) PEM strings, yielded in
+            completion order as soon as each keypair is ready
+        """
+        if count < 0:
+            raise ValueError("Count must not be negative")
+        if key_size < 2048:
+            raise ValueError("Key size must be at least 2048 bits for security")
+        if jobs is not None and jobs < 1:
+            raise ValueError("Jobs must be at least 1")
+        jobs = jobs or os.cpu_count() or 1
+
+        return RSAService._stream_keypairs(count, key_size, public_exponent, password, jobs)
+
+    @staticmethod
+    def _stream_keypairs(
+        count: int,
+        key_size: int,
+        public_exponent: int,
+        password: Optional[str],
+        jobs: int
+    ) -> Iterator[Tuple[str, str]]:
+        # Only keep a couple of tasks per worker in flight so memory stays flat
+        # no matter how many keys are requested
+        max_in_flight = jobs * 2
+        executor = ProcessPoolExecutor(max_workers=jobs)
+        try:
+            pending = set()
+            submitted = 0
+            while submitted < count or pending:
+                while submitted < count and len(pending) < max_in_flight:
+                    pending.add(executor.submit(
+                        _generate_serialized_keypair, key_size, public_exponent, password
+                    ))
+                    submitted += 1
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    @staticmethod
+    def _new_private_key(key_size: int, public_exponent: int) -> rsa.RSAPrivateKey:
+        """
+        Take a key from the key pool if one is configured and has a key ready,
+        otherwise generate one inline
+        """
+        if RSAService.key_pool is not None:
+            private_key = RSAService.key_pool.acquire(key_size, public_exponent)
+            if private_key is not None:
+                return private_key
+
+        return rsa.generate_private_key(
             public_exponent=public_exponent,
             key_size=key_size,
             backend=default_backend()
         )
 
-        # Get public key
-        public_key = private_key.public_key()
-
-        # Serialize private key
-        encryption_algorithm = (
-            serialization.BestAvailableEncryption(password.encode())
-            if password else serialization.NoEncryption()
-        )
-        
-        private_pem = private_key.private_bytes(
-            encoding=serialization.Encoding.PEM,
-            format=serialization.PrivateFormat.PKCS8,
-            encryption_algorithm=encryption_algorithm
-        )
-
-        # Serialize public key
-        public_pem = public_key.public_bytes(
-            encoding=serialization.Encoding.PEM,
-            format=serialization.PublicFormat.SubjectPublicKeyInfo
-        )
 
-        return public_pem.decode(), private_pem.decode()
+def _generate_serialized_keypair(
+    key_size: int,
+    public_exponent: int,
+    password: Optional[str]
+) -> Tuple[str, str]:
+    """Process pool task: generate and serialize one keypair"""
+    # Always generate inline here, a key pool inherited by a forked worker
+    # would hand out the same keys as the parent
+    private_key = rsa.generate_private_key(
+        public_exponent=public_exponent,
+        key_size=key_size,
+        backend=default_backend()
+    )
+    handle = KeyHandle(private_key, password)
+    return handle.spki_pem, handle.pkcs8_pem
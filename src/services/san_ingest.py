@@ -0,0 +1,214 @@
+"""
+Subject Alternative Name ingestion: normalizes, classifies and deduplicates
+large SAN lists in one pass and enforces size limits before anything is signed
+"""
+from cryptography import x509
+from typing import Iterable, Iterator, List, Optional, Tuple
+import ipaddress
+import re
+
+try:
+    import idna
+except ImportError:  # idna is optional; without it only IDNA 2003-safe labels are accepted
+    idna = None
+
+# Default limits, enforced on the SAN extension including the CN entry
+MAX_SANS = 10000
+MAX_SAN_BYTES = 512 * 1024
+
+_IPV4 = re.compile(r"(?:25[0-5]|2[0-4]\d|1\d\d|[1-9]?\d)(?:\.(?:25[0-5]|2[0-4]\d|1\d\d|[1-9]?\d)){3}")
+_IPV6 = re.compile(r"[0-9A-Fa-f:.]+")
+_HOST_LABEL = re.compile(r"[a-z0-9_](?:[a-z0-9_-]{0,61}[a-z0-9_])?")
+_EMAIL_LOCAL = re.compile(r"[A-Za-z0-9!#$%&'*+/=?^_`{|}~.-]+")
+_URI_SCHEME = re.compile(r"[a-z][a-z0-9+.-]*")
+# Characters the stdlib IDNA 2003 codec maps to a different name than IDNA 2008:
+# sharp s, final sigma, zero width joiner and non-joiner
+_IDNA_DEVIATIONS = re.compile("[\u00df\u03c2\u200c\u200d]")
+
+
+def ingest_sans(
+    names: Iterable[str],
+    common_name: Optional[str] = None,
+    max_count: int = MAX_SANS,
+    max_bytes: int = MAX_SAN_BYTES
+) -> List[x509.GeneralName]:
+    """
+    Build SAN entries from raw strings
+
+    Entries are classified by their shape: "scheme://..." is a URI,
+    "local@domain" an email address, dotted quads and anything with a ":"
+    IP addresses, and everything else a DNS name. Host names are lower-cased
+    and converted to IDNA, IP addresses are canonicalized, and duplicates
+    (including of the CN) are dropped.
+
+    Args:
+        names: SAN strings; blank entries are skipped
+        common_name: Added first when it is a valid host name or IP address
+        max_count: Most SAN entries allowed, including the CN entry
+        max_bytes: Most bytes of SAN values allowed, including the CN entry
+
+    Returns: SAN entries in first-seen order
+    """
+    seen = set()
+    san_list: List[x509.GeneralName] = []
+    total_bytes = 0
+
+    def add(kind: str, value) -> None:
+        nonlocal total_bytes
+        key = (kind, value)
+        if key in seen:
+            return
+        seen.add(key)
+        if len(san_list) >= max_count:
+            raise ValueError(f"Too many Subject Alternative Names: the limit is {max_count}")
+        total_bytes += len(value.packed) if kind == "ip" else len(value)
+        if total_bytes > max_bytes:
+            raise ValueError(f"Subject Alternative Names exceed the limit of {max_bytes} bytes")
+        san_list.append(_GENERAL_NAMES[kind](value))
+
+    if common_name:
+        entry = _classify(common_name.strip(), strict=False)
+        if entry is not None:
+            add(*entry)
+
+    for name in names:
+        name = name.strip() if name else ""
+        if name:
+            add(*_classify(name))
+    return san_list
+
+
+def read_san_file(path: str) -> Iterator[str]:
+    """SAN entries from a text file in the split_san_lines format"""
+    with open(path, encoding="utf-8") as f:
+        yield from split_san_lines(f)
+
+
+def split_san_lines(lines: Iterable[str]) -> Iterator[str]:
+    """
+    SAN entries from lines of text: one or more per line, separated by
+    commas or whitespace; "#" starts a comment
+    """
+    for line in lines:
+        line = line.split("#", 1)[0]
+        if line.strip():
+            yield from (entry for entry in re.split(r"[,\s]+", line) if entry)
+
+
+def normalize_host(host: str) -> Optional[str]:
+    """
+    Lower-case, IDNA 2008-encoded form of a host name, or None if it is not one.
+    A leading "*." wildcard label is kept.
+    """
+    host = host.rstrip(".")
+    if not host.isascii():
+        labels = host.split(".")
+        encoded = []
+        for label in labels:
+            if label.isascii():
+                encoded.append(label)
+                continue
+            encoded_label = _encode_label(label)
+            if encoded_label is None:
+                return None
+            encoded.append(encoded_label)
+        host = ".".join(encoded)
+    host = host.lower()
+    if not host or len(host) > 253:
+        return None
+    labels = host.split(".")
+    if labels[0] == "*" and len(labels) > 1:
+        labels = labels[1:]
+    for label in labels:
+        if not _HOST_LABEL.fullmatch(label):
+            return None
+    return host
+
+
+def _encode_label(label: str) -> Optional[str]:
+    """IDNA 2008 (UTS 46, non-transitional) A-label for a non-ASCII label, or None"""
+    try:
+        if idna is not None:
+            return idna.encode(label, uts46=True, transitional=False).decode("ascii")
+        # The stdlib codec is IDNA 2003 and would silently turn e.g. "straße"
+        # into "strasse", a different domain, so such labels are refused
+        if _IDNA_DEVIATIONS.search(label):
+            return None
+        return label.encode("idna").decode("ascii")
+    except UnicodeError:
+        return None
+
+
+def _classify(name: str, strict: bool = True) -> Optional[Tuple[str, object]]:
+    """
+    (kind, normalized value) for one SAN string; invalid entries raise
+    ValueError, or return None when strict is False
+    """
+    if "://" in name:
+        value = _normalize_uri(name)
+        kind = "uri"
+    elif "@" in name:
+        value = _normalize_email(name)
+        kind = "email"
+    elif _IPV4.fullmatch(name) or (":" in name and _IPV6.fullmatch(name)):
+        value = _parse_ip(name)
+        kind = "ip"
+    else:
+        value = normalize_host(name)
+        kind = "dns"
+    if value is None:
+        if not strict:
+            return None
+        raise ValueError(f"Invalid Subject Alternative Name: {name}")
+    return kind, value
+
+
+def _parse_ip(name: str):
+    # The pattern only admits IP-shaped strings, so a failure here is bad input
+    try:
+        return ipaddress.ip_address(name)
+    except ValueError:
+        return None
+
+
+def _normalize_email(name: str) -> Optional[str]:
+    local, _, domain = name.rpartition("@")
+    domain = normalize_host(domain)
+    if domain is None or domain.startswith("*") or not _EMAIL_LOCAL.fullmatch(local):
+        return None
+    # The local part is case-sensitive, only the domain is normalized
+    return f"{local}@{domain}"
+
+
+def _normalize_uri(name: str) -> Optional[str]:
+    scheme, _, rest = name.partition("://")
+    scheme = scheme.lower()
+    if not _URI_SCHEME.fullmatch(scheme) or any(c.isspace() for c in rest):
+        return None
+    authority_end = len(rest)
+    for separator in "/?#":
+        index = rest.find(separator)
+        if index != -1:
+            authority_end = min(authority_end, index)
+    authority, path = rest[:authority_end], rest[authority_end:]
+    userinfo, at, hostport = authority.rpartition("@")
+    host, colon, port = hostport.rpartition(":") if not hostport.endswith("]") else ("", "", "")
+    if not colon or not port.isdigit():
+        host, port = hostport, ""
+    if host.startswith("[") and host.endswith("]"):
+        normalized = host if _parse_ip(host[1:-1]) is not None else None
+    elif _IPV4.fullmatch(host):
+        normalized = host
+    else:
+        normalized = normalize_host(host)
+    if normalized is None or not path.isascii() or not userinfo.isascii():
+        return None
+    return f"{scheme}://{userinfo}{at}{normalized}{':' if port else ''}{port}{path}"
+
+
+_GENERAL_NAMES = {
+    "dns": x509.DNSName,
+    "ip": x509.IPAddress,
+    "email": x509.RFC822Name,
+    "uri": x509.UniformResourceIdentifier,
+}
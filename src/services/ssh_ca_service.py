@@ -0,0 +1,191 @@
+"""
+SSH certificate authority: issues OpenSSH user and host certificates
+"""
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+import secrets
+import time
+from .ssh_service import SSHService
+
+Timestamp = Union[int, datetime]
+
+
+class SSHCAService:
+    """
+    Signs ssh-ed25519, ecdsa and ssh-rsa public keys with a CA key that is
+    loaded once, so batches of thousands of keys share the same CA object.
+    """
+
+    CERT_TYPES = {
+        "user": serialization.SSHCertificateType.USER,
+        "host": serialization.SSHCertificateType.HOST,
+    }
+
+    # Same permissions ssh-keygen grants user certificates by default
+    DEFAULT_USER_EXTENSIONS = (
+        "permit-X11-forwarding",
+        "permit-agent-forwarding",
+        "permit-port-forwarding",
+        "permit-pty",
+        "permit-user-rc",
+    )
+
+    # Default certificate lifetime when valid_before is not given
+    DEFAULT_VALIDITY_SECONDS = 52 * 7 * 24 * 3600
+    # Backdate valid_after a little to tolerate clock skew between hosts
+    CLOCK_SKEW_SECONDS = 300
+
+    def __init__(self, ca_private_key: str, password: Optional[str] = None):
+        """
+        Args:
+            ca_private_key: CA private key in OpenSSH or PEM format
+            password: Password if the CA key is encrypted
+        """
+        if not ca_private_key:
+            raise ValueError("CA private key is required")
+        try:
+            if "OPENSSH PRIVATE KEY" in ca_private_key:
+                key = serialization.load_ssh_private_key(
+                    ca_private_key.encode(),
+                    password=password.encode() if password else None
+                )
+            else:
+                key = serialization.load_pem_private_key(
+                    ca_private_key.encode(),
+                    password=password.encode() if password else None
+                )
+        except Exception as e:
+            raise ValueError(f"Invalid CA private key: {str(e)}")
+        if not isinstance(key, (ed25519.Ed25519PrivateKey, ec.EllipticCurvePrivateKey, rsa.RSAPrivateKey)):
+            raise ValueError("CA key must be an Ed25519, ECDSA or RSA key")
+        self._ca_key = key
+
+    @staticmethod
+    def generate_ca_key(
+        key_type: str = "ed25519",
+        key_size: int = 4096,
+        comment: str = "ssh-ca",
+        password: str = None
+    ) -> Tuple[str, str]:
+        """
+        Generate a new CA keypair
+        Returns: (public_key, private_key) in OpenSSH format
+        """
+        handle = SSHService.generate_key(key_type, key_size, comment, password)
+        return handle.openssh_public, handle.openssh_private
+
+    @property
+    def ca_public_key(self) -> str:
+        """CA public key line, for TrustedUserCAKeys on hosts"""
+        return self._ca_key.public_key().public_bytes(
+            encoding=serialization.Encoding.OpenSSH,
+            format=serialization.PublicFormat.OpenSSH
+        ).decode()
+
+    def known_hosts_line(self, host_pattern: str = "*") -> str:
+        """
+        known_hosts line that trusts every host certificate issued by this CA
+        Returns: "@cert-authority <pattern> <ca public key>"
+        """
+        return f"@cert-authority {host_pattern} {self.ca_public_key}"
+
+    def sign(
+        self,
+        public_key: str,
+        principals: List[str],
+        cert_type: str = "user",
+        key_id: str = "",
+        valid_after: Optional[Timestamp] = None,
+        valid_before: Optional[Timestamp] = None,
+        serial: Optional[int] = None,
+        critical_options: Optional[Dict[str, str]] = None,
+        extensions: Optional[Iterable[str]] = None
+    ) -> str:
+        """
+        Issue an OpenSSH certificate for a public key
+
+        Args:
+            public_key: OpenSSH public key line (ssh-ed25519, ecdsa-sha2-* or ssh-rsa)
+            principals: User names (user certs) or host names (host certs)
+            cert_type: "user" or "host"
+            key_id: Identifier logged by sshd when the certificate is used
+            valid_after: Start of validity (epoch seconds or datetime), defaults to now
+            valid_before: End of validity, defaults to 52 weeks after valid_after
+            serial: Certificate serial, random if not given
+            critical_options: e.g. {"force-command": ..., "source-address": ...} (user certs only)
+            extensions: Extensions to grant, defaults to the ssh-keygen set for user certs
+
+        Returns:
+            Certificate line ("<type>-cert-v01@openssh.com <base64> [key_id]")
+
+        Raises:
+            ValueError: If the public key, principals or validity window are invalid
+        """
+        if cert_type not in self.CERT_TYPES:
+            raise ValueError(f"Unsupported certificate type: {cert_type}. Supported types are: user, host")
+        if not principals:
+            raise ValueError("At least one principal is required")
+        if cert_type == "host" and critical_options:
+            raise ValueError("Critical options are only defined for user certificates")
+
+        try:
+            subject_key = serialization.load_ssh_public_key(public_key.strip().encode())
+        except Exception as e:
+            raise ValueError(f"Invalid public key: {str(e)}")
+
+        now = int(time.time())
+        after = self._timestamp(valid_after) if valid_after is not None else now - self.CLOCK_SKEW_SECONDS
+        before = (
+            self._timestamp(valid_before) if valid_before is not None
+            else after + self.CLOCK_SKEW_SECONDS + self.DEFAULT_VALIDITY_SECONDS
+        )
+        if before <= after:
+            raise ValueError("valid_before must be later than valid_after")
+
+        if extensions is None:
+            extensions = self.DEFAULT_USER_EXTENSIONS if cert_type == "user" else ()
+
+        builder = (
+            serialization.SSHCertificateBuilder()
+            .public_key(subject_key)
+            .type(self.CERT_TYPES[cert_type])
+            .serial(serial if serial is not None else secrets.randbits(64))
+            .key_id(key_id.encode())
+            .valid_principals([p.encode() for p in principals])
+            .valid_after(after)
+            .valid_before(before)
+        )
+        # OpenSSH requires options and extensions in lexical order
+        for name, value in sorted((critical_options or {}).items()):
+            builder = builder.add_critical_option(name.encode(), value.encode())
+        for name in sorted(set(extensions)):
+            builder = builder.add_extension(name.encode(), b"")
+
+        try:
+            certificate = builder.sign(self._ca_key)
+        except Exception as e:
+            raise ValueError(f"Error signing certificate: {str(e)}")
+
+        line = certificate.public_bytes().decode()
+        return f"{line} {key_id}" if key_id else line
+
+    def sign_many(self, requests: Iterable[Dict]) -> Iterator[str]:
+        """
+        Sign a batch of keys with the already loaded CA key
+
+        Args:
+            requests: Iterable of keyword-argument dicts for sign(), consumed lazily
+
+        Returns:
+            Iterator of certificate lines, in request order
+        """
+        for request in requests:
+            yield self.sign(**request)
+
+    @staticmethod
+    def _timestamp(value: Timestamp) -> int:
+        if isinstance(value, datetime):
+            return int(value.timestamp())
+        return int(value)
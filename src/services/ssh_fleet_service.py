@@ -0,0 +1,181 @@
+"""
+Fleet SSH key generation: many host and user keys from one manifest
+"""
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+import csv
+import io
+import os
+import tarfile
+import time
+from .ssh_service import SSHService
+
+# (host, user) pairs; user is empty for host keys
+FleetEntry = Tuple[str, str]
+
+
+class SSHFleetService:
+    """
+    Generates SSH keys for a whole fleet in parallel and streams the results
+    to disk: private keys into a tar archive, public keys into combined
+    authorized_keys and known_hosts files.
+    """
+
+    @staticmethod
+    def read_manifest(path: str) -> Iterator[Dict[str, str]]:
+        """
+        Read a CSV manifest with a "host" column and an optional "user" column
+        Returns: Iterator of rows, read lazily from the file
+        """
+        with open(path, newline="") as f:
+            for row in csv.DictReader(f):
+                yield row
+
+    @staticmethod
+    def generate_fleet(
+        manifest: Iterable[Dict[str, str]],
+        output_dir: str,
+        key_type: str = "ed25519",
+        key_size: int = 2048,
+        password: str = None,
+        jobs: Optional[int] = None,
+        chunk_size: int = 256
+    ) -> Dict[str, int]:
+        """
+        Generate one key per manifest row
+
+        Rows with a "user" get a user key, written to authorized_keys with the
+        comment user@host. Rows without one get a host key, written to
+        known_hosts. All private keys go into private_keys.tar in output_dir.
+
+        Args:
+            manifest: Iterable of {"host": ..., "user": ...} rows; every row is
+                checked before the first key is generated
+            output_dir: Directory for private_keys.tar, authorized_keys and known_hosts
+            key_type: "ed25519" or "rsa"
+            key_size: RSA key size in bits
+            password: Optional password to encrypt every private key
+            jobs: Number of worker processes (defaults to the CPU count)
+            chunk_size: Number of keys generated per worker task
+
+        Returns:
+            Dictionary with the number of host and user keys written
+        """
+        if key_type.lower() not in ("rsa", "ed25519"):
+            raise ValueError(f"Unsupported key type: {key_type}. Supported types are: rsa, ed25519")
+        if key_type.lower() == "rsa" and key_size < 2048:
+            raise ValueError("Key size must be at least 2048 bits for security")
+        if chunk_size < 1:
+            raise ValueError("Chunk size must be at least 1")
+        if jobs is not None and jobs < 1:
+            raise ValueError("Jobs must be at least 1")
+        jobs = jobs or os.cpu_count() or 1
+        # A bad row fails the whole run, so find it before any output is written
+        entries = SSHFleetService._validate_manifest(manifest)
+
+        os.makedirs(output_dir, exist_ok=True)
+        counts = {"host_keys": 0, "user_keys": 0}
+        now = int(time.time())
+
+        with tarfile.open(os.path.join(output_dir, "private_keys.tar"), mode="w|") as archive, \
+                open(os.path.join(output_dir, "authorized_keys"), "w") as authorized_keys, \
+                open(os.path.join(output_dir, "known_hosts"), "w") as known_hosts:
+            chunks = SSHFleetService._chunk_manifest(entries, chunk_size)
+            for results in SSHFleetService._run_chunks(chunks, key_type.lower(), key_size, password, jobs):
+                for host, user, public_key, private_key in results:
+                    if user:
+                        name = f"users/{user}@{host}/id_{key_type.lower()}"
+                        authorized_keys.write(public_key + "\n")
+                        counts["user_keys"] += 1
+                    else:
+                        name = f"hosts/{host}/ssh_host_{key_type.lower()}_key"
+                        known_hosts.write(f"{host} {public_key}\n")
+                        counts["host_keys"] += 1
+
+                    data = private_key.encode()
+                    info = tarfile.TarInfo(name)
+                    info.size = len(data)
+                    info.mode = 0o600
+                    info.mtime = now
+                    archive.addfile(info, io.BytesIO(data))
+
+        return counts
+
+    @staticmethod
+    def _validate_manifest(manifest: Iterable[Dict[str, str]]) -> List[FleetEntry]:
+        """
+        Check every manifest row for a host, safe names and duplicate (host, user) pairs
+        Returns: (host, user) entries in manifest order
+        """
+        entries: List[FleetEntry] = []
+        seen: Dict[FleetEntry, int] = {}
+        for row_number, row in enumerate(manifest, start=1):
+            host = (row.get("host") or "").strip()
+            user = (row.get("user") or "").strip()
+            if not host:
+                raise ValueError(f"Manifest row {row_number} has no host")
+            for value in (host, user):
+                if "/" in value or value in (".", "..") or any(c.isspace() for c in value):
+                    raise ValueError(f"Manifest row {row_number} has an invalid name: {value!r}")
+            entry = (host, user)
+            if entry in seen:
+                raise ValueError(
+                    f"Manifest row {row_number} duplicates row {seen[entry]}: "
+                    f"{f'{user}@{host}' if user else host}"
+                )
+            seen[entry] = row_number
+            entries.append(entry)
+        return entries
+
+    @staticmethod
+    def _chunk_manifest(entries: List[FleetEntry], chunk_size: int) -> Iterator[List[FleetEntry]]:
+        for start in range(0, len(entries), chunk_size):
+            yield entries[start:start + chunk_size]
+
+    @staticmethod
+    def _run_chunks(
+        chunks: Iterator[List[FleetEntry]],
+        key_type: str,
+        key_size: int,
+        password: Optional[str],
+        jobs: int
+    ) -> Iterator[List[Tuple[str, str, str, str]]]:
+        # Bounded number of chunks in flight so memory stays flat for any fleet size
+        max_in_flight = jobs * 2
+        executor = ProcessPoolExecutor(max_workers=jobs)
+        try:
+            pending = set()
+            exhausted = False
+            while not exhausted or pending:
+                while not exhausted and len(pending) < max_in_flight:
+                    chunk = next(chunks, None)
+                    if chunk is None:
+                        exhausted = True
+                    else:
+                        pending.add(executor.submit(_generate_chunk, chunk, key_type, key_size, password))
+                if not pending:
+                    break
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+def _generate_chunk(
+    chunk: List[FleetEntry],
+    key_type: str,
+    key_size: int,
+    password: Optional[str]
+) -> List[Tuple[str, str, str, str]]:
+    """Process pool task: generate keys for one chunk of manifest rows"""
+    results = []
+    for host, user in chunk:
+        public_key, private_key = SSHService.generate_keypair(
+            key_type=key_type,
+            key_size=key_size,
+            comment=f"{user}@{host}" if user else "",
+            password=password
+        )
+        results.append((host, user, public_key, private_key))
+    return results
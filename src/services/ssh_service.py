@@ -1,66 +1,81 @@
-import paramiko
-from cryptography.hazmat.primitives.asymmetric import ed25519
-from cryptography.hazmat.primitives.serialization import (
-    Encoding,
-    PublicFormat,
-    PrivateFormat,
-    BestAvailableEncryption,
-    NoEncryption
-)
+from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
+from cryptography.hazmat.backends import default_backend
 from typing import Tuple
 import io
-import base64
+from .key_handle import KeyHandle
 
 class SSHService:
+    # Key generation backends accepted by generate_keypair
+    SUPPORTED_BACKENDS = ("cryptography", "paramiko")
+
     @staticmethod
     def generate_keypair(
         key_type: str = "rsa",
         key_size: int = 2048,
         comment: str = "",
-        password: str = None
+        password: str = None,
+        backend: str = "cryptography"
     ) -> Tuple[str, str]:
         """
         Generate an SSH keypair with customizable parameters
+        Args:
+            backend: "cryptography" (default) or "paramiko" for RSA keys
+                written by paramiko, kept for compatibility
         Returns: (public_key, private_key)
         """
+        if backend not in SSHService.SUPPORTED_BACKENDS:
+            raise ValueError(
+                f"Unsupported backend: {backend}. Supported backends are: {', '.join(SSHService.SUPPORTED_BACKENDS)}"
+            )
+        if backend == "paramiko" and key_type.lower() == "rsa":
+            return SSHService._generate_paramiko_rsa_keypair(key_size, comment, password)
+
+        handle = SSHService.generate_key(key_type, key_size, comment, password)
+
+        if key_type.lower() == "rsa":
+            # RSA private keys keep the traditional "BEGIN RSA PRIVATE KEY" PEM
+            return handle.openssh_public, handle.pkcs1_pem
+        return handle.openssh_public, handle.openssh_private
+
+    @staticmethod
+    def generate_key(
+        key_type: str = "rsa",
+        key_size: int = 2048,
+        comment: str = "",
+        password: str = None
+    ) -> KeyHandle:
+        """
+        Generate an SSH key without serializing it
+        Returns: KeyHandle that encodes the key (OpenSSH, PKCS1, PKCS8, ...) on demand
+        """
         if key_type.lower() == "rsa":
             # Generate RSA key
-            key = paramiko.RSAKey.generate(bits=key_size)
-            
-            # Get private key
-            priv_file = io.StringIO()
-            key.write_private_key(priv_file, password=password.encode() if password else None)
-            private_key = priv_file.getvalue()
-            
-            # Get public key in OpenSSH format
-            public_key = f"ssh-rsa {key.get_base64()} {comment}"
-            
-            return public_key, private_key
-            
+            private_key_obj = rsa.generate_private_key(
+                public_exponent=65537,
+                key_size=key_size,
+                backend=default_backend()
+            )
         elif key_type.lower() == "ed25519":
             # Generate Ed25519 key
             private_key_obj = ed25519.Ed25519PrivateKey.generate()
-            public_key_obj = private_key_obj.public_key()
-            
-            # Export private key
-            private_bytes = private_key_obj.private_bytes(
-                encoding=Encoding.PEM,
-                format=PrivateFormat.OpenSSH,
-                encryption_algorithm=BestAvailableEncryption(password.encode()) if password else NoEncryption()
-            )
-            private_key = private_bytes.decode()
-            
-            # Export public key
-            public_bytes = public_key_obj.public_bytes(
-                encoding=Encoding.Raw,
-                format=PublicFormat.Raw
-            )
-            
-            # Format OpenSSH public key
-            key_type_bytes = b"ssh-ed25519"
-            encoded_key = base64.b64encode(key_type_bytes + b"\x00\x00\x00 " + public_bytes).decode()
-            public_key = f"ssh-ed25519 {encoded_key} {comment}"
-            
-            return public_key, private_key
         else:
             raise ValueError(f"Unsupported key type: {key_type}. Supported types are: rsa, ed25519")
+
+        return KeyHandle(private_key_obj, password, comment)
+
+    @staticmethod
+    def _generate_paramiko_rsa_keypair(key_size: int, comment: str, password: str = None) -> Tuple[str, str]:
+        # paramiko is slow to import, so only load it when this mode is used
+        import paramiko
+
+        key = paramiko.RSAKey.generate(bits=key_size)
+
+        # Get private key
+        priv_file = io.StringIO()
+        key.write_private_key(priv_file, password=password.encode() if password else None)
+        private_key = priv_file.getvalue()
+
+        # Get public key in OpenSSH format
+        public_key = f"ssh-rsa {key.get_base64()} {comment}" if comment else f"ssh-rsa {key.get_base64()}"
+
+        return public_key, private_key
@@ -0,0 +1,165 @@
+"""
+Guaranteed-unique bulk codes from password templates, deduplicated as
+packed integers instead of strings
+"""
+from array import array
+from bisect import bisect_left
+from itertools import product
+from typing import Callable, Iterator, List, Optional, Tuple
+import math
+import os
+from .password_template import PasswordTemplate
+
+# Average number of codes per bucket in PackedCodeSet
+BUCKET_SIZE = 1024
+
+# Largest number of strings precomputed for one run of template positions
+SEGMENT_SPACE = 1 << 16
+
+
+class PackedCodeSet:
+    """
+    Set of integers in [0, space), split by value into buckets that each
+    hold a sorted array of offsets within the bucket. Inserting moves at
+    most one small bucket, and each code costs 4 bytes, or 8 bytes when
+    a bucket covers more than 2^32 values.
+    """
+
+    def __init__(self, space: int, expected: int):
+        """
+        Args:
+            space: Exclusive upper bound of the values
+            expected: Number of values that will be added, used to size the buckets
+        """
+        bucket_count = max(1, expected // BUCKET_SIZE)
+        self._width = -(-space // bucket_count)
+        if self._width > 1 << 64:
+            raise ValueError("Values per bucket must fit in 64 bits")
+        typecode = "I" if self._width <= 1 << 32 else "Q"
+        self._buckets = [array(typecode) for _ in range(bucket_count)]
+        self._len = 0
+
+    def add(self, value: int) -> bool:
+        """Add a value; Returns: False if it was already present"""
+        index, offset = divmod(value, self._width)
+        bucket = self._buckets[index]
+        i = bisect_left(bucket, offset)
+        if i < len(bucket) and bucket[i] == offset:
+            return False
+        bucket.insert(i, offset)
+        self._len += 1
+        return True
+
+    def __contains__(self, value: int) -> bool:
+        index, offset = divmod(value, self._width)
+        bucket = self._buckets[index]
+        i = bisect_left(bucket, offset)
+        return i < len(bucket) and bucket[i] == offset
+
+    def __len__(self) -> int:
+        return self._len
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the stored values, excluding per-bucket overhead"""
+        return sum(b.buffer_info()[1] * b.itemsize for b in self._buckets)
+
+
+def iter_unique_codes(
+    plan: PasswordTemplate,
+    n: int,
+    reject: Optional[Callable[[List[str]], List[bool]]] = None,
+    batch_size: int = 1 << 16
+) -> Iterator[str]:
+    """
+    Yield n distinct codes from a compiled template, each as likely as any
+    other code not yet produced
+
+    Every code is the mixed-radix number of its pool indices, so codes are
+    drawn, compared and stored as integers and only turned into text once
+    accepted, a few template positions at a time from precomputed tables.
+
+    Args:
+        plan: Compiled template
+        n: Number of codes
+        reject: Optional batch check; codes it flags (e.g. breached ones) are skipped
+        batch_size: Codes drawn per os.urandom call
+    """
+    segments = _segments(plan.pools)
+    space = math.prod(segment_space for segment_space, _ in segments)
+    if n < 0:
+        raise ValueError("Number of codes must not be negative")
+    if n > space:
+        raise ValueError(f"Template {plan.template!r} has only {space} distinct codes, {n} requested")
+
+    # Beyond 64 bits only the low 64 bits are kept: a fingerprint collision
+    # merely discards a fresh code, it can never let a duplicate through
+    key_space = min(space, 1 << 64)
+    seen = PackedCodeSet(key_space, n)
+    # (place value, combinations, strings) per segment, most significant first
+    places = []
+    place = 1
+    for segment_space, table in reversed(segments):
+        places.append((place, segment_space, table))
+        place *= segment_space
+    places.reverse()
+
+    produced = 0
+    while produced < n:
+        if len(seen) == key_space:
+            raise ValueError(f"Template {plan.template!r} ran out of acceptable codes after {produced}")
+        draws = _random_below(space, min(batch_size, n - produced))
+        fresh = [value for value in draws if seen.add(value % key_space)]
+        batch = [
+            "".join([table[value // place % segment_space] for place, segment_space, table in places])
+            for value in fresh
+        ]
+        if reject is not None and batch:
+            # Rejected codes stay in the set so they are never drawn again
+            batch = [code for code, rejected in zip(batch, reject(batch)) if not rejected]
+        produced += len(batch)
+        yield from batch
+
+
+def _segments(pools: Tuple[str, ...]) -> List[Tuple[int, List[str]]]:
+    """
+    Split template positions into runs of at most SEGMENT_SPACE combinations;
+    Returns: (combinations, every string of the run in mixed-radix order) per run
+    """
+    runs: List[List[str]] = [[]]
+    run_space = 1
+    for pool in pools:
+        if run_space * len(pool) > SEGMENT_SPACE:
+            runs.append([])
+            run_space = 1
+        runs[-1].append(pool)
+        run_space *= len(pool)
+    return [(math.prod(len(pool) for pool in run), ["".join(chars) for chars in product(*run)]) for run in runs]
+
+
+def _random_below(bound: int, count: int) -> List[int]:
+    """count uniform random integers in [0, bound)"""
+    if bound == 1:
+        return [0] * count
+    if bound <= 1 << 64:
+        # Common case: one 64-bit draw per value, converted in C
+        limit = (1 << 64) - (1 << 64) % bound
+        values = []
+        while len(values) < count:
+            draws = array("Q")
+            draws.frombytes(os.urandom((count - len(values) + 16) * draws.itemsize))
+            values.extend(d % bound for d in draws if d < limit)
+        del values[count:]
+        return values
+    width = ((bound - 1).bit_length() + 7) // 8
+    # Only draws below the largest multiple of bound map evenly onto it
+    limit = 256 ** width - 256 ** width % bound
+    values: List[int] = []
+    while len(values) < count:
+        raw = os.urandom((count - len(values)) * width * 2)
+        for i in range(0, len(raw), width):
+            draw = int.from_bytes(raw[i:i + width], "big")
+            if draw < limit:
+                values.append(draw % bound)
+    del values[count:]
+    return values
@@ -0,0 +1,191 @@
+"""
+Memory-mapped wordlists with a prebuilt offset index
+"""
+from array import array
+from typing import Dict, Optional
+import mmap
+import os
+import struct
+import sys
+import threading
+
+# Index file layout: header, then a (start, end) byte offset pair per word,
+# all little-endian. The header records the wordlist's size and mtime so a
+# stale index is detected and rebuilt.
+_INDEX_MAGIC = b"WLX1"
+_INDEX_HEADER = struct.Struct("<4sIQQ")  # magic, word count, source size, source mtime_ns
+
+DEFAULT_WORDLIST = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "eff_large_wordlist.txt"
+)
+
+
+class Wordlist:
+    """
+    Read-only wordlist backed by mmap.
+
+    Words stay in the mapped file and are decoded only when picked, so a
+    100k-word list costs a few pages and a flat offset table instead of
+    100k Python strings. Lines may be plain words or Diceware style
+    "<dice>\\t<word>"; blank lines are skipped.
+    """
+
+    def __init__(self, path: str, index_path: Optional[str] = None):
+        """
+        Args:
+            path: UTF-8 wordlist, one word per line
+            index_path: Where the offset index is cached (defaults to "<path>.idx")
+        """
+        self.path = path
+        self.index_path = index_path or f"{path}.idx"
+        self._file = open(path, "rb")
+        try:
+            stat = os.fstat(self._file.fileno())
+            if stat.st_size == 0:
+                raise ValueError(f"Wordlist is empty: {path}")
+            self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            self._file.close()
+            raise
+        self._index_file = None
+        self._index_map = None
+        self._offsets = self._load_index(stat.st_size, stat.st_mtime_ns)
+
+    def __len__(self) -> int:
+        return len(self._offsets) // 2
+
+    def __getitem__(self, i: int) -> str:
+        if not 0 <= i < len(self):
+            raise IndexError("Wordlist index out of range")
+        return self._data[self._offsets[2 * i]:self._offsets[2 * i + 1]].decode("utf-8")
+
+    def close(self) -> None:
+        """Unmap the wordlist and its index"""
+        # Release the memoryview before closing the mapping it points into
+        self._offsets = array("I")
+        for resource in (self._index_map, self._index_file, self._data, self._file):
+            if resource is not None:
+                resource.close()
+        self._index_map = self._index_file = None
+
+    def __enter__(self) -> "Wordlist":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _load_index(self, size: int, mtime_ns: int):
+        try:
+            offsets = self._map_index(size, mtime_ns)
+            if offsets is not None:
+                return offsets
+        except (OSError, ValueError):
+            pass  # Unreadable or corrupt index: rebuild it
+
+        offsets = self._scan()
+        try:
+            self._write_index(offsets, size, mtime_ns)
+        except OSError:
+            pass  # Read-only location: keep the in-memory index for this process
+        return offsets
+
+    def _map_index(self, size: int, mtime_ns: int):
+        """Map a cached index that matches the wordlist; Returns: memoryview of offsets or None"""
+        if not os.path.exists(self.index_path):
+            return None
+        index_file = open(self.index_path, "rb")
+        try:
+            index_map = mmap.mmap(index_file.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            index_file.close()
+            raise
+        if len(index_map) < _INDEX_HEADER.size:
+            index_map.close()
+            index_file.close()
+            return None
+        magic, count, indexed_size, indexed_mtime = _INDEX_HEADER.unpack_from(index_map)
+        expected_length = _INDEX_HEADER.size + count * 8
+        if (
+            magic != _INDEX_MAGIC
+            or (indexed_size, indexed_mtime) != (size, mtime_ns)
+            or len(index_map) != expected_length
+            or count == 0
+            or sys.byteorder != "little"
+        ):
+            index_map.close()
+            index_file.close()
+            return None
+        self._index_file, self._index_map = index_file, index_map
+        return memoryview(index_map)[_INDEX_HEADER.size:].cast("I")
+
+    def _scan(self) -> array:
+        """Build the offset table by scanning the mapped file once"""
+        offsets = array("I")
+        seen = set()
+        data = self._data
+        if len(data) >= 1 << 32:
+            raise ValueError("Wordlists larger than 4 GiB are not supported")
+        start = 0
+        while start < len(data):
+            end = data.find(b"\n", start)
+            if end == -1:
+                end = len(data)
+            word_start, word_end = start, end
+            if word_end > word_start and data[word_end - 1] == 0x0D:  # CRLF
+                word_end -= 1
+            tab = data.rfind(b"\t", word_start, word_end)
+            if tab != -1:  # Diceware "<dice>\t<word>"
+                word_start = tab + 1
+            word = data[word_start:word_end].strip()
+            if word:
+                word_start = data.find(word, word_start, word_end)
+                word_end = word_start + len(word)
+                try:
+                    word.decode("utf-8")
+                except UnicodeDecodeError:
+                    raise ValueError(f"Wordlist is not valid UTF-8 near byte {word_start}")
+                # A repeated word would make every passphrase weaker than reported
+                if word in seen:
+                    raise ValueError(f"Wordlist contains a duplicate word: {word.decode('utf-8')}")
+                seen.add(word)
+                offsets.append(word_start)
+                offsets.append(word_end)
+            start = end + 1
+        if not offsets:
+            raise ValueError(f"Wordlist has no words: {self.path}")
+        return offsets
+
+    def _write_index(self, offsets: array, size: int, mtime_ns: int) -> None:
+        if sys.byteorder != "little":
+            return
+        temp_path = f"{self.index_path}.{os.getpid()}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(_INDEX_HEADER.pack(_INDEX_MAGIC, len(offsets) // 2, size, mtime_ns))
+            offsets.tofile(f)
+        # Atomic so concurrent processes never map a half-written index
+        os.replace(temp_path, self.index_path)
+
+
+_wordlists: Dict[str, Wordlist] = {}
+_wordlists_lock = threading.Lock()
+
+
+def get_wordlist(path: Optional[str] = None) -> Wordlist:
+    """
+    Shared Wordlist for a path, opened once per process
+    Args:
+        path: Wordlist file, defaults to $KEYGEN_WORDLIST or the bundled EFF large list
+    """
+    path = os.path.abspath(path or os.environ.get("KEYGEN_WORDLIST") or DEFAULT_WORDLIST)
+    with _wordlists_lock:
+        wordlist = _wordlists.get(path)
+        if wordlist is None:
+            wordlist = _wordlists[path] = Wordlist(path)
+        return wordlist
+
+
+if __name__ == "__main__":
+    # Prebuild the index, e.g. while building an image: python wordlist.py <wordlist>...
+    for wordlist_path in sys.argv[1:] or [DEFAULT_WORDLIST]:
+        with Wordlist(wordlist_path) as built:
+            print(f"{wordlist_path}: {len(built)} words")
@@ -0,0 +1,99 @@
+import hashlib
+import os
+import tempfile
+import unittest
+from unittest import mock
+from src.services import breach_index
+from src.services.breach_index import BreachIndex, get_breach_index
+from src.services.passphrase_service import PasswordService
+
+BREACHED = ["password", "123456", "qwerty", "letmein", "pässwörd"]
+
+class TestBreachIndex(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.corpus = os.path.join(self.temp_dir.name, "pwned.txt")
+        self.index_path = os.path.join(self.temp_dir.name, "pwned.idx")
+        # HIBP style: upper-case SHA-1, ":<count>", CRLF, duplicates allowed
+        with open(self.corpus, "wb") as f:
+            for i, password in enumerate(BREACHED * 2):
+                f.write(f"{hashlib.sha1(password.encode('utf-8')).hexdigest().upper()}:{i + 1}\r\n".encode())
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_build_and_lookup(self):
+        self.assertEqual(len(BREACHED), BreachIndex.build([self.corpus], self.index_path))
+        with BreachIndex(self.index_path) as index:
+            self.assertEqual(len(BREACHED), len(index))
+            for password in BREACHED:
+                self.assertIn(password, index)
+            self.assertNotIn("correct horse battery staple", index)
+            self.assertEqual([True, False, True], index.check_many(["qwerty", "Qwerty", "password"]))
+
+    def test_external_merge_matches_in_memory_build(self):
+        passwords = [f"secret{i}" for i in range(1000)]
+        plaintext = os.path.join(self.temp_dir.name, "plain.txt")
+        with open(plaintext, "w") as f:
+            f.write("\n".join(passwords + passwords[:100]) + "\n")
+
+        BreachIndex.build([plaintext], self.index_path, plaintext=True, run_size=64)
+        self.assertFalse([e for e in os.listdir(self.temp_dir.name) if e.startswith("breach-run-")])
+        with BreachIndex(self.index_path) as index:
+            self.assertEqual(1000, len(index))
+            self.assertTrue(all(index.check_many(passwords)))
+            self.assertFalse(any(index.check_many([f"other{i}" for i in range(1000)])))
+
+    def test_invalid_input(self):
+        with open(self.corpus, "a") as f:
+            f.write("not-a-hash:1\n")
+        with self.assertRaises(ValueError):
+            BreachIndex.build([self.corpus], self.index_path)
+        self.assertFalse(os.path.exists(self.index_path))
+
+        with open(self.index_path, "wb") as f:
+            f.write(b"BPX1" + b"\0" * 100)
+        with self.assertRaises(ValueError):
+            BreachIndex(self.index_path)
+
+    def test_get_breach_index(self):
+        with mock.patch.dict(os.environ, {}, clear=True):
+            self.assertIsNone(get_breach_index())
+        BreachIndex.build([self.corpus], self.index_path)
+        with mock.patch.dict(breach_index._indexes, clear=True):
+            with mock.patch.dict(os.environ, {"KEYGEN_BREACH_INDEX": self.index_path}):
+                index = get_breach_index()
+                self.assertIs(index, get_breach_index())
+                self.assertIn("password", index)
+            index.close()
+
+        # A configured but unreadable index is an error, not a silently skipped check
+        with mock.patch.dict(os.environ, {"KEYGEN_BREACH_INDEX": os.path.join(self.temp_dir.name, "missing.idx")}):
+            with self.assertRaises(ValueError):
+                get_breach_index()
+            with self.assertRaises(ValueError):
+                PasswordService()
+
+    def test_password_service_rejects_breached_passwords(self):
+        BreachIndex.build([self.corpus], self.index_path)
+        with BreachIndex(self.index_path) as index:
+            service = PasswordService(breach_index=index)
+            self.assertEqual([True, False], service.check_passwords(["letmein", "x8#Lq!vZ"]))
+
+            # Breached PINs are redrawn
+            pins = service.generate_many_from_template(2000, "999999")
+            self.assertEqual(2000, len(pins))
+            self.assertNotIn("123456", pins)
+            self.assertEqual(20, len(service.generate_passwords(20, length=6)))
+
+            # A pool the corpus covers completely can never produce a password
+            with mock.patch.object(PasswordService, "MAX_BREACH_ROUNDS", 3):
+                with self.assertRaises(ValueError):
+                    service.generate_from_template("[q]werty")
+
+        with mock.patch.dict(os.environ, {}, clear=True):
+            with self.assertRaises(ValueError):
+                PasswordService().check_passwords(["password"])
+
+if __name__ == '__main__':
+    unittest.main()
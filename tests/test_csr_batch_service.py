@@ -0,0 +1,154 @@
+import os
+import shutil
+import tarfile
+import tempfile
+import unittest
+from cryptography import x509
+from cryptography.hazmat.primitives import serialization
+from cryptography.x509.oid import ExtendedKeyUsageOID, NameOID
+from src.services import csr_batch_service
+from src.services.csr_batch_service import CSRBatchService
+from src.services.ec_service import ECService
+
+class TestCSRBatchService(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir, True)
+        self.output_dir = os.path.join(self.temp_dir, "out")
+
+    def load_csr(self, path):
+        with open(path, "rb") as f:
+            return x509.load_pem_x509_csr(f.read())
+
+    def test_generate_batch(self):
+        manifest = [
+            {"common_name": "api.example.com", "organization": "Example Inc", "sans": "api-1.example.com;10.0.0.5"},
+            {"common_name": "db.example.com", "name": "db", "key": "rsa:2048", "country": "US"},
+            {"common_name": "edge.example.com", "key": "Ed25519", "sans": ["edge.example.net"]},
+        ]
+
+        summary = CSRBatchService.generate_batch(manifest, self.output_dir, jobs=2, chunk_size=1)
+        self.assertEqual({"succeeded": 3, "failed": 0, "errors": []}, summary)
+
+        self.assertEqual(
+            ["api.example.com.csr", "api.example.com.key", "db.csr", "db.key", "edge.example.com.csr", "edge.example.com.key"],
+            sorted(os.listdir(self.output_dir))
+        )
+        self.assertEqual(0o600, os.stat(os.path.join(self.output_dir, "db.key")).st_mode & 0o777)
+        csr = self.load_csr(os.path.join(self.output_dir, "api.example.com.csr"))
+        self.assertTrue(csr.is_signature_valid)
+        self.assertEqual("Example Inc", csr.subject.get_attributes_for_oid(NameOID.ORGANIZATION_NAME)[0].value)
+        sans = csr.extensions.get_extension_for_class(x509.SubjectAlternativeName).value
+        self.assertEqual(["api.example.com", "api-1.example.com"], sans.get_values_for_type(x509.DNSName))
+        self.assertEqual(2048, self.load_csr(os.path.join(self.output_dir, "db.csr")).public_key().key_size)
+
+    def test_failures_are_reported_per_row(self):
+        manifest = [
+            {"common_name": "ok.example.com"},
+            {"common_name": ""},
+            {"common_name": "bad-country.example.com", "country": "USA"},
+            {"common_name": "ok.example.com"},
+            {"common_name": "weak.example.com", "key": "rsa:1024"},
+            {"common_name": "missing.example.com", "key_file": os.path.join(self.temp_dir, "missing.pem")},
+            {"common_name": "last.example.com", "name": "../escape"},
+            {"common_name": "last.example.com"},
+        ]
+
+        summary = CSRBatchService.generate_batch(manifest, self.output_dir, jobs=1, chunk_size=3)
+        self.assertEqual(2, summary["succeeded"])
+        self.assertEqual(6, summary["failed"])
+        self.assertEqual([2, 3, 4, 5, 6, 7], [error["row"] for error in summary["errors"]])
+        self.assertIn("Duplicate", summary["errors"][2]["error"])
+        self.assertTrue(os.path.exists(os.path.join(self.output_dir, "last.example.com.csr")))
+
+    def test_profile_column(self):
+        manifest = [
+            {"common_name": "alice", "profile": "mtls-client"},
+            {"common_name": "bob", "profile": "mtls-client", "organization": "Example Inc"},
+            {"common_name": "carol", "profile": "no-such-profile"},
+        ]
+
+        summary = CSRBatchService.generate_batch(manifest, self.output_dir, jobs=1)
+        self.assertEqual(1, summary["succeeded"])
+        self.assertEqual([2, 3], [error["row"] for error in summary["errors"]])
+        csr = self.load_csr(os.path.join(self.output_dir, "alice.csr"))
+        self.assertEqual(
+            [ExtendedKeyUsageOID.CLIENT_AUTH],
+            list(csr.extensions.get_extension_for_class(x509.ExtendedKeyUsage).value)
+        )
+
+    def test_existing_key_and_tar_output(self):
+        _, private_key = ECService.generate_keypair("P-256", password="secret")
+        with open(os.path.join(self.temp_dir, "web.pem"), "w") as f:
+            f.write(private_key)
+        manifest_path = os.path.join(self.temp_dir, "manifest.csv")
+        with open(manifest_path, "w") as f:
+            f.write("name,common_name,key_file,sans\n")
+            f.write("web,web.example.com,web.pem,www.example.com static.example.com\n")
+            f.write("new,new.example.com,,\n")
+
+        archive_path = os.path.join(self.temp_dir, "csrs.tar")
+        summary = CSRBatchService.generate_batch(
+            CSRBatchService.read_manifest(manifest_path), archive_path, password="secret", jobs=1
+        )
+        self.assertEqual(2, summary["succeeded"])
+
+        with tarfile.open(archive_path) as archive:
+            self.assertEqual(["new.csr", "new.key", "web.csr"], sorted(archive.getnames()))
+            csr = x509.load_pem_x509_csr(archive.extractfile("web.csr").read())
+        key = serialization.load_pem_private_key(private_key.encode(), b"secret")
+        self.assertEqual(key.public_key().public_numbers(), csr.public_key().public_numbers())
+
+    @unittest.skipUnless(csr_batch_service.yaml, "PyYAML is not installed")
+    def test_read_yaml_manifest(self):
+        manifest_path = os.path.join(self.temp_dir, "manifest.yaml")
+        with open(manifest_path, "w") as f:
+            f.write(
+                "defaults:\n"
+                "  organization: Example Inc\n"
+                "  key: P-384\n"
+                "certificates:\n"
+                "  - common_name: a.example.com\n"
+                "    sans: [a1.example.com, 192.0.2.1]\n"
+                "  - common_name: b.example.com\n"
+                "    key_file: keys/b.pem\n"
+            )
+        rows = list(CSRBatchService.read_manifest(manifest_path))
+        self.assertEqual("Example Inc", rows[1]["organization"])
+        self.assertEqual(["a1.example.com", "192.0.2.1"], rows[0]["sans"])
+        self.assertEqual(os.path.join(self.temp_dir, "keys", "b.pem"), rows[1]["key_file"])
+
+    def test_sans_file(self):
+        sans_path = os.path.join(self.temp_dir, "sans.txt")
+        with open(sans_path, "w") as f:
+            f.write("\n".join(f"tenant{i}.example.com" for i in range(500)) + "\ntenant0.EXAMPLE.com\n")
+        manifest_path = os.path.join(self.temp_dir, "manifest.csv")
+        with open(manifest_path, "w") as f:
+            f.write("common_name,sans_file\ningress.example.com,sans.txt\n")
+        manifest = list(CSRBatchService.read_manifest(manifest_path))
+        self.assertEqual(sans_path, manifest[0]["sans_file"])
+
+        summary = CSRBatchService.generate_batch(manifest, self.output_dir, jobs=1)
+        self.assertEqual(1, summary["succeeded"])
+        csr = self.load_csr(os.path.join(self.output_dir, "ingress.example.com.csr"))
+        self.assertEqual(501, len(csr.extensions.get_extension_for_class(x509.SubjectAlternativeName).value))
+
+        summary = CSRBatchService.generate_batch(manifest, self.output_dir, jobs=1, allow_key_files=False)
+        self.assertEqual(1, summary["failed"])
+
+    def test_key_files_can_be_disallowed(self):
+        manifest = [{"common_name": "a.example.com", "key_file": "/etc/hostname"}, {"common_name": "b.example.com"}]
+        summary = CSRBatchService.generate_batch(manifest, self.output_dir, jobs=1, allow_key_files=False)
+        self.assertEqual(1, summary["succeeded"])
+        self.assertEqual(1, summary["errors"][0]["row"])
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            CSRBatchService.generate_batch([], self.output_dir, key_type="dsa")
+        with self.assertRaises(ValueError):
+            CSRBatchService.generate_batch([], self.output_dir, chunk_size=0)
+        with self.assertRaises(ValueError):
+            CSRBatchService.generate_batch([], self.output_dir, jobs=0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+from cryptography import x509
+from cryptography.x509.oid import ExtendedKeyUsageOID, NameOID
+from src.services import csr_profiles
+from src.services.csr_profiles import CSRProfile, get_profile, list_profiles, load_profiles
+from src.services.csr_service import CSRService
+from src.services.ec_service import ECService
+
+class TestCSRProfiles(unittest.TestCase):
+    def setUp(self):
+        self.private_key = ECService.generate_key("P-256").private_key
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir, True)
+
+    def test_profile_extensions_and_subject(self):
+        profile = CSRProfile(
+            "web",
+            subject={"country": "US", "organization": "Example Inc", "organizational_unit": "Platform"},
+            key_usage=["digital_signature", "key_encipherment"],
+            extended_key_usage=["server_auth", "1.3.6.1.4.1.311.20.2.2"],
+            ca=False,
+        )
+        csr = x509.load_pem_x509_csr(profile.build_csr(self.private_key, "app.example.com", ["www.example.com"]).encode())
+        self.assertTrue(csr.is_signature_valid)
+        self.assertEqual(
+            [(NameOID.COMMON_NAME, "app.example.com"), (NameOID.COUNTRY_NAME, "US"),
+             (NameOID.ORGANIZATION_NAME, "Example Inc"), (NameOID.ORGANIZATIONAL_UNIT_NAME, "Platform")],
+            [(attribute.oid, attribute.value) for attribute in csr.subject]
+        )
+
+        key_usage = csr.extensions.get_extension_for_class(x509.KeyUsage)
+        self.assertTrue(key_usage.critical)
+        self.assertTrue(key_usage.value.digital_signature and key_usage.value.key_encipherment)
+        self.assertFalse(key_usage.value.key_cert_sign)
+        eku = csr.extensions.get_extension_for_class(x509.ExtendedKeyUsage).value
+        self.assertEqual([ExtendedKeyUsageOID.SERVER_AUTH, x509.ObjectIdentifier("1.3.6.1.4.1.311.20.2.2")], list(eku))
+        basic_constraints = csr.extensions.get_extension_for_class(x509.BasicConstraints)
+        self.assertTrue(basic_constraints.critical)
+        self.assertFalse(basic_constraints.value.ca)
+        sans = csr.extensions.get_extension_for_class(x509.SubjectAlternativeName).value
+        self.assertEqual(["app.example.com", "www.example.com"], sans.get_values_for_type(x509.DNSName))
+
+    def test_builder_is_reused(self):
+        profile = get_profile("mtls-client")
+        first = x509.load_pem_x509_csr(profile.build_csr(self.private_key, "alice").encode())
+        second = x509.load_pem_x509_csr(profile.build_csr(self.private_key, "bob", ["10.0.0.1"]).encode())
+        # Per-request SANs must not leak into the shared builder
+        self.assertEqual(
+            ["alice"],
+            first.extensions.get_extension_for_class(x509.SubjectAlternativeName).value.get_values_for_type(x509.DNSName)
+        )
+        self.assertEqual("bob", second.subject.get_attributes_for_oid(NameOID.COMMON_NAME)[0].value)
+        self.assertEqual(
+            [ExtendedKeyUsageOID.CLIENT_AUTH],
+            list(second.extensions.get_extension_for_class(x509.ExtendedKeyUsage).value)
+        )
+
+    def test_generate_csr_from_pem(self):
+        key_pem = ECService().generate_keypair(curve="P-256", password="secret")[1]
+        with mock.patch.object(CSRService, "key_cache", None):
+            csr = get_profile("internal-web").generate_csr(key_pem, "intranet.example.com", password="secret")
+        self.assertTrue(x509.load_pem_x509_csr(csr.encode()).is_signature_valid)
+        with self.assertRaises(ValueError):
+            get_profile("internal-web").generate_csr(key_pem, "intranet.example.com", password="wrong")
+
+    def test_invalid_profiles(self):
+        with self.assertRaises(ValueError):
+            CSRProfile("bad", subject={"surname": "x"})
+        with self.assertRaises(ValueError):
+            CSRProfile("bad", key_usage=["sign_everything"])
+        with self.assertRaises(ValueError):
+            CSRProfile("bad", rsa_key_usage=["sign_everything"])
+        with self.assertRaises(ValueError):
+            CSRProfile("bad", extended_key_usage=["not-an-oid"])
+        with self.assertRaises(ValueError):
+            CSRProfile("bad", ca=False, path_length=0)
+        with self.assertRaises(ValueError):
+            get_profile("no-such-profile")
+        with self.assertRaises(ValueError):
+            get_profile("internal-web").build_csr(self.private_key, " ")
+
+    def test_load_profiles(self):
+        path = os.path.join(self.temp_dir, "profiles.json")
+        with open(path, "w") as f:
+            json.dump({"profiles": {
+                "edge": {"subject": {"organization": "Example Inc"}, "extended_key_usage": ["server_auth"]},
+                "broken": {"key_usage": ["bogus"]},
+            }}, f)
+        with mock.patch.dict(csr_profiles._profiles):
+            # A bad profile rejects the whole file
+            with self.assertRaises(ValueError):
+                load_profiles(path)
+            self.assertNotIn("edge", list_profiles())
+
+            with open(path, "w") as f:
+                json.dump({"edge": {"subject": {"organization": "Example Inc"}}}, f)
+            with mock.patch.object(csr_profiles, "_env_loaded", False):
+                with mock.patch.dict(os.environ, {"KEYGEN_CSR_PROFILES": path}):
+                    self.assertEqual(["edge", "internal-web", "mtls-client"], list_profiles())
+            self.assertEqual({"organization": "Example Inc"}, get_profile("edge").subject)
+
+    def test_bad_env_profiles_file(self):
+        path = os.path.join(self.temp_dir, "profiles.json")
+        with open(path, "w") as f:
+            f.write("{not json")
+        with mock.patch.dict(csr_profiles._profiles), mock.patch.object(csr_profiles, "_env_loaded", False):
+            with mock.patch.dict(os.environ, {"KEYGEN_CSR_PROFILES": path}):
+                # Reported on every call until the file is fixed, never silently dropped
+                for _ in range(2):
+                    with self.assertRaises(ValueError):
+                        list_profiles()
+                with open(path, "w") as f:
+                    json.dump({"edge": {}}, f)
+                self.assertIn("edge", list_profiles())
+        with self.assertRaises(ValueError):
+            load_profiles(os.path.join(self.temp_dir, "missing.json"))
+
+if __name__ == '__main__':
+    unittest.main()
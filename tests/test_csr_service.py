@@ -1,9 +1,10 @@
 import unittest
 from src.services.csr_service import CSRService
 from src.services.rsa_service import RSAService
+from src.services.ec_service import ECService
 from cryptography import x509
 from cryptography.hazmat.primitives import serialization
-from cryptography.hazmat.primitives.asymmetric import rsa, padding
+from cryptography.hazmat.primitives.asymmetric import rsa, ec, ed25519, padding
 from cryptography.x509.oid import NameOID
 from cryptography.hazmat.backends import default_backend
 
@@ -122,6 +123,27 @@ class TestCSRService(unittest.TestCase):
                 self.assertIsInstance(csr_public_key, rsa.RSAPublicKey)
                 self.assertEqual(csr_public_key.key_size, key_size)
 
+    def test_generate_csr_with_ec_keys(self):
+        # Each curve is signed with a matching hash
+        for curve, hash_name in [("P-256", "sha256"), ("P-384", "sha384"), ("Ed25519", None)]:
+            with self.subTest(curve=curve):
+                _, private_key = ECService.generate_keypair(curve=curve, password="testpassword")
+
+                csr_pem = CSRService.generate_csr(
+                    private_key_pem=private_key,
+                    common_name=f"test-{curve.lower()}.example.com",
+                    password="testpassword"
+                )
+
+                csr = x509.load_pem_x509_csr(csr_pem.encode())
+                self.assertTrue(csr.is_signature_valid)
+                if hash_name is None:
+                    self.assertIsNone(csr.signature_hash_algorithm)
+                    self.assertIsInstance(csr.public_key(), ed25519.Ed25519PublicKey)
+                else:
+                    self.assertEqual(csr.signature_hash_algorithm.name, hash_name)
+                    self.assertIsInstance(csr.public_key(), ec.EllipticCurvePublicKey)
+
     def test_invalid_private_key(self):
         # Test with invalid private key PEM
         with self.assertRaises(ValueError):
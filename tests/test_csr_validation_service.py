@@ -0,0 +1,74 @@
+import hashlib
+import unittest
+from cryptography import x509
+from cryptography.hazmat.primitives import serialization
+from src.services.csr_profiles import get_profile
+from src.services.csr_service import CSRService
+from src.services.csr_validation_service import CSRValidationService, ParsedCSR
+from src.services.ec_service import ECService
+from src.services.rsa_service import RSAService
+
+class TestParsedCSR(unittest.TestCase):
+    def setUp(self):
+        self.private_key = ECService.generate_key("P-256").private_key
+        self.csr_pem = CSRService.generate_csr_for_key(
+            self.private_key,
+            "test.example.com",
+            organization="Test Corp",
+            organizational_unit="IT",
+            subject_alternative_names=["www.example.com", "10.0.0.1"]
+        )
+
+    def test_fields(self):
+        parsed = ParsedCSR(self.csr_pem)
+        self.assertEqual("test.example.com", parsed.common_name)
+        self.assertTrue(parsed.valid)
+        self.assertEqual(
+            {"common_name": "test.example.com", "organization": "Test Corp", "organizational_unit": "IT"},
+            parsed.subject
+        )
+        self.assertEqual({"algorithm": "ECC", "key_size": 256, "curve": "secp256r1"}, parsed.public_key)
+        self.assertEqual(
+            [{"type": "DNS", "value": "test.example.com"}, {"type": "DNS", "value": "www.example.com"},
+             {"type": "IP", "value": "10.0.0.1"}],
+            parsed.subject_alternative_names
+        )
+        with self.assertRaises(AttributeError):
+            parsed.extra = 1
+
+    def test_fields_are_computed_once_on_demand(self):
+        parsed = ParsedCSR(self.csr_pem)
+        self.assertEqual("test.example.com", parsed.common_name)
+        for slot in ("_der", "_valid", "_fingerprints", "_extensions"):
+            self.assertFalse(hasattr(parsed, slot))
+        der = x509.load_pem_x509_csr(self.csr_pem.encode()).public_bytes(serialization.Encoding.DER)
+        self.assertEqual(hashlib.sha256(der).hexdigest(), parsed.fingerprints["sha256"])
+        self.assertIs(parsed.der, parsed.der)
+        self.assertIs(parsed.subject, parsed.subject)
+        self.assertEqual(["sha1", "sha256", "sha384", "sha512"], list(parsed.fingerprints))
+
+    def test_parse_csr_compatibility(self):
+        details = CSRValidationService.parse_csr(self.csr_pem)
+        self.assertEqual(
+            ["valid", "version", "subject", "public_key", "signature_algorithm", "fingerprints", "extensions"],
+            list(details)
+        )
+        self.assertEqual("ecdsa-with-SHA256", details["signature_algorithm"])
+        self.assertEqual(3, len(details["extensions"]["subject_alternative_name"]))
+        with self.assertRaises(ValueError):
+            CSRValidationService.parse_csr("-----BEGIN CERTIFICATE REQUEST-----\nAAAA\n-----END CERTIFICATE REQUEST-----")
+
+    def test_profile_extensions(self):
+        csr_pem = get_profile("internal-web").build_csr(self.private_key, "web.example.com")
+        extensions = CSRValidationService.parse_csr(csr_pem)["extensions"]
+        self.assertEqual(["digital_signature"], extensions["key_usage"])
+        self.assertEqual(["serverAuth"], extensions["extended_key_usage"])
+        self.assertEqual("CA: False", extensions["basic_constraints"])
+
+        rsa_key = RSAService.generate_key(2048).private_key
+        csr_pem = get_profile("internal-web").build_csr(rsa_key, "web.example.com")
+        extensions = CSRValidationService.parse_csr(csr_pem)["extensions"]
+        self.assertEqual(["digital_signature", "key_encipherment"], extensions["key_usage"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+import os
+import stat
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest import mock
+from src.services import gnupg_homes
+from src.services.pgp_service import PGPService
+
+class TestGnuPGHomes(unittest.TestCase):
+    def setUp(self):
+        self.base_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        for entry in os.listdir(self.base_dir):
+            gnupg_homes.remove_homedir(os.path.join(self.base_dir, entry), kill_agent=False)
+        os.rmdir(self.base_dir)
+
+    def test_default_base_dir_prefers_configured_dir(self):
+        with mock.patch.dict(os.environ, {"KEYGEN_GNUPG_HOME_DIR": self.base_dir}):
+            self.assertEqual(self.base_dir, gnupg_homes.default_base_dir())
+
+    def test_default_base_dir_uses_ram_dir(self):
+        with mock.patch.dict(os.environ, {}, clear=True), \
+                mock.patch.object(gnupg_homes, "RAM_DIRS", ("/nonexistent", self.base_dir)):
+            self.assertEqual(self.base_dir, gnupg_homes.default_base_dir())
+        with mock.patch.dict(os.environ, {}, clear=True), \
+                mock.patch.object(gnupg_homes, "RAM_DIRS", ("/nonexistent",)):
+            self.assertIsNone(gnupg_homes.default_base_dir())
+
+    def test_create_homedir(self):
+        path = gnupg_homes.create_homedir(self.base_dir)
+        self.assertEqual(self.base_dir, os.path.dirname(path))
+        self.assertTrue(os.path.basename(path).startswith(f"{gnupg_homes.HOMEDIR_PREFIX}{os.getpid()}-"))
+        self.assertEqual(0o700, stat.S_IMODE(os.stat(path).st_mode))
+
+    def test_sweep_removes_only_homedirs_of_exited_processes(self):
+        # Created by a process that has exited since
+        script = "import sys; from src.services import gnupg_homes; print(gnupg_homes.create_homedir(sys.argv[1]))"
+        stale = subprocess.run(
+            [sys.executable, "-c", script, self.base_dir], capture_output=True, text=True, check=True
+        ).stdout.strip()
+        live = gnupg_homes.create_homedir(self.base_dir)
+        unrelated = os.path.join(self.base_dir, "other-dir")
+        os.mkdir(unrelated)
+
+        self.assertEqual(1, gnupg_homes.sweep_stale_homedirs(self.base_dir))
+        self.assertFalse(os.path.exists(stale))
+        self.assertTrue(os.path.isdir(live))
+        self.assertTrue(os.path.isdir(unrelated))
+
+    def test_sweep_ignores_owner_pids(self):
+        finished = subprocess.Popen(["true"])
+        finished.wait()
+        # A live homedir whose name carries a dead PID (e.g. from another PID namespace)
+        live = gnupg_homes.create_homedir(self.base_dir)
+        renamed = os.path.join(self.base_dir, f"{gnupg_homes.HOMEDIR_PREFIX}{finished.pid}-live")
+        os.rename(live, renamed)
+        # Unlocked homedirs are only swept once idle for the grace period
+        legacy = os.path.join(self.base_dir, f"{gnupg_homes.HOMEDIR_PREFIX}{os.getpid()}-legacy")
+        os.mkdir(legacy)
+
+        self.assertEqual(0, gnupg_homes.sweep_stale_homedirs(self.base_dir))
+        self.assertTrue(os.path.isdir(renamed))
+        self.assertTrue(os.path.isdir(legacy))
+
+        with mock.patch.object(gnupg_homes, "UNLOCKED_GRACE_SECONDS", 0):
+            self.assertEqual(1, gnupg_homes.sweep_stale_homedirs(self.base_dir))
+        self.assertFalse(os.path.exists(legacy))
+        gnupg_homes.remove_homedir(renamed, kill_agent=False)
+        gnupg_homes._release_owner_lock(live)
+
+    def test_pgp_service_close(self):
+        with PGPService(base_dir=self.base_dir) as service:
+            homedir = service.gnupghome
+            self.assertEqual(self.base_dir, os.path.dirname(homedir))
+            keys = service.generate_keypair(
+                name="Test User",
+                email="test@example.com",
+                passphrase="testpassphrase",
+                key_type="EDDSA"
+            )
+            self.assertTrue(keys["fingerprint"])
+        self.assertFalse(os.path.exists(homedir))
+        with self.assertRaises(RuntimeError):
+            service.gpg
+        service.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,180 @@
+import math
+import os
+import tempfile
+import unittest
+from collections import Counter
+from unittest import mock
+from src.services import passphrase_service
+from src.services.passphrase_service import PassphraseService, PasswordService
+from src.services.wordlist import Wordlist, get_wordlist
+
+class TestPasswordService(unittest.TestCase):
+    def setUp(self):
+        self.service = PasswordService()
+        self.classes = (
+            self.service.uppercase_letters,
+            self.service.lowercase_letters,
+            self.service.digits,
+            self.service.special_chars,
+        )
+
+    def generators(self):
+        """Run a test against the NumPy path (when installed) and the pure Python path"""
+        yield "default", mock.patch.object(passphrase_service, "np", passphrase_service.np)
+        yield "pure-python", mock.patch.object(passphrase_service, "np", None)
+
+    def test_generate_password(self):
+        password = self.service.generate_password(length=16)
+        self.assertEqual(16, len(password))
+        for chars in self.classes:
+            self.assertTrue(any(c in chars for c in password))
+
+    def test_generate_passwords(self):
+        for name, patch in self.generators():
+            with self.subTest(name), patch:
+                passwords = self.service.generate_passwords(2000, length=8, excluded_chars="0O1lI")
+                self.assertEqual(2000, len(passwords))
+                self.assertGreater(len(set(passwords)), 1990)
+                for password in passwords:
+                    self.assertEqual(8, len(password))
+                    self.assertFalse(set(password) & set("0O1lI"))
+                    # At least one character of every selected type
+                    for chars in self.classes:
+                        self.assertTrue(any(c in chars for c in password))
+
+    def test_generate_passwords_is_uniform(self):
+        for name, patch in self.generators():
+            with self.subTest(name), patch:
+                # 7 digits do not divide 256, so a biased byte mapping would show up here
+                passwords = self.service.generate_passwords(
+                    20000, length=10, use_uppercase=False, use_lowercase=False,
+                    use_special=False, excluded_chars="789"
+                )
+                counts = Counter("".join(passwords))
+                self.assertEqual(set("0123456"), set(counts))
+                expected = 20000 * 10 / 7
+                for count in counts.values():
+                    self.assertLess(abs(count - expected) / expected, 0.05)
+
+                # The one-of-each rule must not favour any position
+                passwords = self.service.generate_passwords(20000, length=4)
+                first = Counter(p[0] in self.service.digits for p in passwords)
+                pool_size = sum(len(c) for c in self.classes)
+                self.assertGreater(first[True] / 20000, 10 / pool_size * 0.8)
+
+    def test_generate_passwords_validation(self):
+        with self.assertRaises(ValueError):
+            self.service.generate_passwords(1, length=3)
+        with self.assertRaises(ValueError):
+            self.service.generate_passwords(-1)
+        with self.assertRaises(ValueError):
+            self.service.generate_passwords(
+                1, use_uppercase=False, use_digits=False, use_special=False,
+                excluded_chars=self.service.lowercase_letters
+            )
+        self.assertEqual([], self.service.generate_passwords(0))
+
+class TestWordlist(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, "words.txt")
+
+    def tearDown(self):
+        for entry in os.listdir(self.temp_dir):
+            os.remove(os.path.join(self.temp_dir, entry))
+        os.rmdir(self.temp_dir)
+
+    def write(self, content: bytes):
+        with open(self.path, "wb") as f:
+            f.write(content)
+
+    def test_parses_plain_and_diceware_lines(self):
+        self.write(b"11111\tabacus\r\n\n11112\tabdomen\r\nzo\xc3\xab\nzoom")
+        with Wordlist(self.path) as wordlist:
+            self.assertEqual(["abacus", "abdomen", "zo\u00eb", "zoom"], [wordlist[i] for i in range(len(wordlist))])
+            with self.assertRaises(IndexError):
+                wordlist[4]
+
+    def test_index_is_reused_and_rebuilt_when_stale(self):
+        self.write(b"alpha\nbeta\n")
+        Wordlist(self.path).close()
+        self.assertTrue(os.path.exists(self.path + ".idx"))
+
+        with mock.patch.object(Wordlist, "_scan", side_effect=AssertionError("index not reused")):
+            with Wordlist(self.path) as wordlist:
+                self.assertEqual("beta", wordlist[1])
+
+        self.write(b"alpha\nbeta\ngamma\n")
+        with Wordlist(self.path) as wordlist:
+            self.assertEqual(3, len(wordlist))
+            self.assertEqual("gamma", wordlist[2])
+
+    def test_corrupt_index_is_rebuilt(self):
+        self.write(b"alpha\nbeta\n")
+        with open(self.path + ".idx", "wb") as f:
+            f.write(b"garbage")
+        with Wordlist(self.path) as wordlist:
+            self.assertEqual(["alpha", "beta"], [wordlist[0], wordlist[1]])
+
+    def test_invalid_wordlists(self):
+        for content in (b"", b"\n\n", b"alpha\nbeta\nalpha\n"):
+            with self.subTest(content=content):
+                self.write(content)
+                with self.assertRaises(ValueError):
+                    Wordlist(self.path)
+
+    def test_bundled_wordlist(self):
+        wordlist = get_wordlist()
+        self.assertEqual(7776, len(wordlist))
+        self.assertIs(wordlist, get_wordlist())
+
+class TestPassphraseService(unittest.TestCase):
+    def setUp(self):
+        self.service = PassphraseService()
+        self.words = set(self.service.wordlist[i] for i in range(len(self.service.wordlist)))
+
+    def test_generate_passphrase(self):
+        result = self.service.generate_passphrase(word_count=5, separator=" ")
+        words = result["passphrase"].split(" ")
+        self.assertEqual(5, len(words))
+        self.assertTrue(all(w in self.words for w in words))
+        self.assertAlmostEqual(5 * math.log2(7776), result["entropy_bits"], places=1)
+
+    def test_options(self):
+        passphrase = self.service.generate_passphrase(
+            word_count=4, capitalize=True, include_number=True, include_special=True
+        )["passphrase"]
+        words = passphrase.split("-")
+        self.assertEqual(4, len(words))
+        self.assertTrue(all(w[0].isupper() for w in words))
+        self.assertEqual(1, sum(c.isdigit() for c in passphrase))
+        self.assertEqual(1, sum(c in PassphraseService.SPECIAL_CHARS for c in passphrase))
+
+    def test_entropy_bits(self):
+        base = self.service.entropy_bits(6)
+        self.assertAlmostEqual(77.55, base, places=1)
+        self.assertAlmostEqual(base + math.log2(60), self.service.entropy_bits(6, include_number=True), places=1)
+        self.assertGreater(self.service.entropy_bits(6, include_special=True), base)
+
+    def test_generate_passphrases_uniform(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "words.txt")
+            with open(path, "w") as f:
+                f.write("red\ngreen\nblue\n")
+            with Wordlist(path) as wordlist:
+                passphrases = PassphraseService(wordlist).generate_passphrases(10000, word_count=3)
+        self.assertEqual(10000, len(passphrases))
+        counts = Counter(w for p in passphrases for w in p.split("-"))
+        self.assertEqual({"red", "green", "blue"}, set(counts))
+        for count in counts.values():
+            self.assertLess(abs(count - 10000) / 10000, 0.05)
+
+    def test_generate_passphrases_validation(self):
+        with self.assertRaises(ValueError):
+            self.service.generate_passphrases(-1)
+        with self.assertRaises(ValueError):
+            self.service.generate_passphrases(1, word_count=0)
+        self.assertEqual([], self.service.generate_passphrases(0))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import math
+import re
+import unittest
+from collections import Counter
+from unittest import mock
+from src.services import password_template
+from src.services.password_template import PasswordTemplate, compile_template
+from src.services.passphrase_service import PasswordService
+
+class TestPasswordTemplate(unittest.TestCase):
+    def test_placeholders_and_literals(self):
+        passwords = compile_template("Cvcc-9999-ssss").generate_many(200)
+        pattern = re.compile(r"[B-DF-HJ-NP-TV-Z][aeiou][b-df-hj-np-tv-z]{2}-\d{4}-[^A-Za-z0-9]{4}")
+        for password in passwords:
+            self.assertRegex(password, pattern)
+
+    def test_classes_and_repetition(self):
+        plan = compile_template("[A-Z]{3}-[0-9]{6}")
+        self.assertEqual(10, plan.length)
+        for password in plan.generate_many(200):
+            self.assertRegex(password, r"^[A-Z]{3}-[0-9]{6}$")
+        self.assertRegex(compile_template("[A-HJ-NP-Z2-9]{8}").generate(), r"^[A-HJ-NP-Z2-9]{8}$")
+        self.assertRegex(compile_template(r"[\]a-]{5}").generate(), r"^[\]a-]{5}$")
+        self.assertEqual("9-A{2}", compile_template(r"\9-\A\{2}").generate())
+        self.assertEqual("#+", compile_template("#+9{0}").generate())
+
+    def test_entropy_bits(self):
+        self.assertAlmostEqual(3 * math.log2(26) + 6 * math.log2(10), compile_template("[A-Z]{3}-[0-9]{6}").entropy_bits)
+        self.assertAlmostEqual(4 * math.log2(10), compile_template("9999").entropy_bits)
+        self.assertEqual(0, compile_template(r"-fi\xed-").entropy_bits)
+        self.assertAlmostEqual(math.log2(8), compile_template("9", excluded_chars="01").entropy_bits)
+
+    def test_exclusions(self):
+        passwords = compile_template("X{20}", excluded_chars="0O1I").generate_many(100)
+        self.assertFalse(set("".join(passwords)) & set("0O1I"))
+        # Literal characters are never excluded
+        self.assertEqual("0", compile_template(r"\0", excluded_chars="0").generate())
+        with self.assertRaises(ValueError):
+            compile_template("[01]", excluded_chars="01")
+
+    def test_uniform(self):
+        passwords = compile_template("[a-c]9").generate_many(30000)
+        letters = Counter(p[0] for p in passwords)
+        digits = Counter(p[1] for p in passwords)
+        self.assertEqual(set("abc"), set(letters))
+        self.assertEqual(10, len(digits))
+        for counts, expected in ((letters, 10000), (digits, 3000)):
+            for count in counts.values():
+                self.assertLess(abs(count - expected) / expected, 0.08)
+
+    def test_plan_is_compiled_once(self):
+        compile_template.cache_clear()
+        with mock.patch.object(password_template, "_pool", wraps=password_template._pool) as build_pool:
+            service = PasswordService()
+            service.generate_from_template("A{4}-9{4}")
+            service.generate_many_from_template(100, "A{4}-9{4}")
+            service.template_entropy_bits("A{4}-9{4}")
+        self.assertEqual(2, build_pool.call_count)
+        self.assertIsInstance(compile_template("A{4}-9{4}"), PasswordTemplate)
+
+    def test_invalid_templates(self):
+        for template in ("", "[a-", "[]", "[z-a]", "{3}", "A{x}", "A{", "abc\\", "é", "\t", "A{2000}", "*" * 1025):
+            with self.subTest(template=template):
+                with self.assertRaises(ValueError):
+                    compile_template(template)
+        with self.assertRaises(ValueError):
+            compile_template("A").generate_many(-1)
+        self.assertEqual([], compile_template("A").generate_many(0))
+
+if __name__ == '__main__':
+    unittest.main()
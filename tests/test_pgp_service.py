@@ -1,5 +1,14 @@
+import io
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
 import unittest
+from src.services import gnupg_homes
+from src.services.kdf_policy import KDFCostPolicy
 from src.services.pgp_service import PGPService
+from src.services.gpg_worker_pool import GPGWorkerPool
 
 class TestPGPService(unittest.TestCase):
     def setUp(self):
@@ -60,6 +69,131 @@ class TestPGPService(unittest.TestCase):
         self.assertIn("BEGIN PGP PUBLIC KEY BLOCK", keys["public_key"])
         self.assertIn("BEGIN PGP PRIVATE KEY BLOCK", keys["private_key"])
 
+    def test_generate_elliptic_curve_keypairs(self):
+        cases = (
+            ("EDDSA", None, "22", "ed25519", "cv25519"),
+            ("ECDSA", "nistp256", "19", "nistp256", "nistp256"),
+            ("ECDSA", "nistp384", "19", "nistp384", "nistp384"),
+        )
+        for key_type, key_curve, algo, curve, subkey_curve in cases:
+            with self.subTest(key_curve=curve):
+                keys = self.service.generate_keypair(
+                    name="Test User",
+                    email="test@example.com",
+                    passphrase="testpassphrase",
+                    key_type=key_type,
+                    key_curve=key_curve
+                )
+                self.assertIn("BEGIN PGP PUBLIC KEY BLOCK", keys["public_key"])
+                self.assertIn("BEGIN PGP PRIVATE KEY BLOCK", keys["private_key"])
+                self.assertEqual("Test User <test@example.com>", keys["user_id"])
+
+                key = self.service.gpg.list_keys(keys=[keys["fingerprint"]])[0]
+                self.assertEqual(algo, key["algo"])
+                self.assertEqual(curve, key["curve"])
+                self.assertEqual([subkey_curve], [sub["curve"] for sub in key["subkey_info"].values()])
+
+    def test_unsupported_curve(self):
+        with self.assertRaises(ValueError):
+            self.service.generate_keypair(
+                name="Test User",
+                email="test@example.com",
+                passphrase="testpassphrase",
+                key_type="ECDSA",
+                key_curve="ed25519"
+            )
+
+    def test_public_key_matches_gpg_export(self):
+        keys = self.service.generate_keypair(
+            name="Test User",
+            email="test@example.com",
+            passphrase="testpassphrase"
+        )
+
+        # The public block is derived from the secret export without calling gpg
+        self.assertEqual(keys["public_key"], self.service.gpg.export_keys(keys["fingerprint"], armor=True))
+
+    def test_native_backend_keys_import_into_gpg(self):
+        for key_type in ("RSA", "EDDSA"):
+            keys = self.service.generate_keypair(
+                name="Test User",
+                email="test@example.com",
+                passphrase="testpassphrase",
+                key_type=key_type,
+                subkey_type=None,
+                expire_date="365",
+                backend="native"
+            )
+            self.assertEqual("Test User <test@example.com>", keys["user_id"])
+
+            importer = PGPService()
+            gpg = importer.gpg
+            result = gpg.import_keys(keys["private_key"])
+            self.assertIn(keys["fingerprint"], result.fingerprints)
+
+            # Self-signatures verify and the passphrase unlocks the encryption subkey
+            encrypted = gpg.encrypt("secret", keys["fingerprint"], always_trust=True)
+            self.assertTrue(encrypted.ok)
+            decrypted = gpg.decrypt(str(encrypted), passphrase="testpassphrase")
+            self.assertEqual("secret", str(decrypted))
+
+            signed = gpg.sign("message", keyid=keys["fingerprint"], passphrase="testpassphrase")
+            self.assertTrue(gpg.verify(str(signed)).valid)
+
+    def test_native_backend_rejects_out_of_range_expiry(self):
+        for expire_date in ["200y", "50000", "2200-01-01"]:
+            with self.subTest(expire_date=expire_date):
+                with self.assertRaises(ValueError):
+                    self.service.generate_keypair(
+                        name="Test User",
+                        email="test@example.com",
+                        passphrase="testpassphrase",
+                        key_type="EDDSA",
+                        expire_date=expire_date,
+                        backend="native"
+                    )
+
+    def test_native_backend_rejects_unsupported_key_type(self):
+        with self.assertRaises(ValueError):
+            self.service.generate_keypair(
+                name="Test User",
+                email="test@example.com",
+                passphrase="testpassphrase",
+                key_type="DSA",
+                backend="native"
+            )
+
+    def test_generate_many(self):
+        identities = [
+            {"name": "Alice", "email": "alice@example.com", "passphrase": "shared"},
+            {"name": "Bob", "email": "bob@example.com", "passphrase": "shared", "comment": "Ops"},
+            {"name": "Carol", "email": "carol@example.com", "passphrase": "own", "expire_date": "365"},
+        ]
+        results = list(self.service.generate_many(identities, chunk_size=2, jobs=2))
+
+        self.assertEqual(
+            ["Alice <alice@example.com>", "Bob (Ops) <bob@example.com>", "Carol <carol@example.com>"],
+            [keys["user_id"] for keys in results]
+        )
+        self.assertEqual(3, len({keys["fingerprint"] for keys in results}))
+
+        importer = PGPService()
+        for keys, identity in zip(results, identities):
+            result = importer.gpg.import_keys(keys["private_key"])
+            self.assertEqual([keys["fingerprint"]], result.fingerprints[:1])
+            # Each private key holds exactly one identity and opens with its own passphrase
+            signed = importer.gpg.sign("message", keyid=keys["fingerprint"], passphrase=identity["passphrase"])
+            self.assertTrue(importer.gpg.verify(str(signed)).valid)
+        self.assertEqual(3, len(importer.gpg.list_keys(secret=True)))
+
+    def test_generate_many_validates_identities(self):
+        with self.assertRaises(ValueError):
+            list(self.service.generate_many([{"name": "Alice", "email": "alice@example.com"}]))
+        with self.assertRaises(ValueError):
+            list(self.service.generate_many([
+                {"name": "Alice\nKey-Type: DSA", "email": "alice@example.com", "passphrase": "pw"}
+            ]))
+
     def test_missing_required_fields(self):
         with self.assertRaises(ValueError):
             self.service.generate_keypair(
@@ -67,3 +201,145 @@ class TestPGPService(unittest.TestCase):
                 email="test@example.com",
                 passphrase="testpassphrase"
             )
+
+    def test_generate_keypairs_with_worker_pool(self):
+        pool = GPGWorkerPool(size=1, max_jobs=2)
+        self.addCleanup(pool.close)
+        service = PGPService(worker_pool=pool)
+
+        fingerprints = []
+        for i in range(3):
+            keys = service.generate_keypair(
+                name=f"Pool User {i}",
+                email=f"pool{i}@example.com",
+                passphrase="testpassphrase"
+            )
+            self.assertIn("BEGIN PGP PRIVATE KEY BLOCK", keys["private_key"])
+            self.assertEqual(f"Pool User {i} <pool{i}@example.com>", keys["user_id"])
+            fingerprints.append(keys["fingerprint"])
+        self.assertEqual(len(set(fingerprints)), 3)
+
+        # Keyrings are scrubbed between jobs, bookkeeping files stay
+        with pool.worker() as worker:
+            self.assertEqual(len(worker.gpg.list_keys()), 0)
+            self.assertEqual(len(worker.gpg.list_keys(secret=True)), 0)
+            for name in gnupg_homes.HOMEDIR_FILES:
+                self.assertTrue(os.path.exists(os.path.join(worker.gnupghome, name)))
+
+    def test_worker_pool_recycles_failed_worker(self):
+        pool = GPGWorkerPool(size=1)
+        self.addCleanup(pool.close)
+
+        with self.assertRaises(RuntimeError):
+            with pool.worker() as worker:
+                failed_home = worker.gnupghome
+                raise RuntimeError("job failed")
+
+        with pool.worker() as worker:
+            self.assertNotEqual(failed_home, worker.gnupghome)
+            self.assertTrue(worker.is_healthy())
+
+    def test_worker_pool_keeps_owner_lock(self):
+        base_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, base_dir, True)
+        pool = GPGWorkerPool(size=1, base_dir=base_dir)
+        self.addCleanup(pool.close)
+
+        service = PGPService(worker_pool=pool)
+        service.generate_keypair(name="Pool User", email="pool@example.com", passphrase="testpassphrase")
+        with pool.worker() as worker:
+            homedir = worker.gnupghome
+        self.assertTrue(os.path.exists(os.path.join(homedir, gnupg_homes.OWNER_LOCK)))
+
+        # An idle worker whose homedir has not changed for a long time is still owned
+        os.utime(homedir, (0, 0))
+        script = (
+            "import sys; from src.services import gnupg_homes; "
+            "print(gnupg_homes.sweep_stale_homedirs(sys.argv[1]))"
+        )
+        swept = subprocess.run(
+            [sys.executable, "-c", script, base_dir], capture_output=True, text=True, check=True
+        ).stdout.strip()
+        self.assertEqual("0", swept)
+        with pool.worker() as worker:
+            self.assertEqual(homedir, worker.gnupghome)
+            self.assertTrue(worker.is_healthy())
+
+class TestPGPFileOperations(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.keys = PGPService(kdf_policy=KDFCostPolicy(10)).generate_keypair(
+            name="Test User",
+            email="test@example.com",
+            passphrase="testpassphrase",
+            key_type="EDDSA",
+            backend="native"
+        )
+
+    def setUp(self):
+        self.service = PGPService()
+        self.work_dir = tempfile.mkdtemp()
+        self.data_path = os.path.join(self.work_dir, "backup.bin")
+        # Several chunks plus a partial one
+        self.data = os.urandom(PGPService.CHUNK_SIZE * 5 + 123)
+        with open(self.data_path, "wb") as f:
+            f.write(self.data)
+
+    def tearDown(self):
+        self.service.close()
+        shutil.rmtree(self.work_dir, ignore_errors=True)
+
+    def path(self, name):
+        return os.path.join(self.work_dir, name)
+
+    def test_encrypt_decrypt_round_trip(self):
+        result = self.service.encrypt_file(self.data_path, self.path("backup.gpg"), self.keys["public_key"])
+        self.assertEqual(self.keys["fingerprint"], result["fingerprint"])
+
+        # File objects work as input as well as paths
+        with open(self.path("backup.gpg"), "rb") as encrypted:
+            self.service.decrypt_file(
+                encrypted, self.path("backup.out"), self.keys["private_key"], "testpassphrase"
+            )
+        with open(self.path("backup.out"), "rb") as f:
+            self.assertEqual(self.data, f.read())
+
+    def test_decrypt_with_wrong_passphrase(self):
+        self.service.encrypt_file(self.data_path, self.path("backup.gpg"), self.keys["public_key"])
+        # Succeed once first so a cached passphrase would be noticed
+        self.service.decrypt_file(
+            self.path("backup.gpg"), self.path("backup.out"), self.keys["private_key"], "testpassphrase"
+        )
+        with self.assertRaises(ValueError):
+            self.service.decrypt_file(
+                self.path("backup.gpg"), self.path("bad.out"), self.keys["private_key"], "wrongpassphrase"
+            )
+        self.assertFalse(os.path.exists(self.path("bad.out")))
+
+    def test_sign_and_verify(self):
+        for armor, name in ((True, "backup.asc"), (False, "backup.sig")):
+            with self.subTest(armor=armor):
+                self.service.sign_file(
+                    self.data_path, self.path(name), self.keys["private_key"], "testpassphrase", armor=armor
+                )
+                result = self.service.verify_file(self.path(name), self.data_path, self.keys["public_key"])
+                self.assertTrue(result["valid"])
+                self.assertEqual(self.keys["fingerprint"], result["fingerprint"])
+
+        # A signature over different data does not verify
+        tampered = self.path("tampered.bin")
+        with open(tampered, "wb") as f:
+            f.write(self.data[:-1])
+        with open(self.path("backup.asc"), "rb") as signature:
+            self.assertFalse(self.service.verify_file(signature, tampered, self.keys["public_key"])["valid"])
+
+    def test_stream_input(self):
+        self.service.encrypt_file(
+            io.BytesIO(self.data), self.path("stream.asc"), self.keys["public_key"], armor=True
+        )
+        with open(self.path("stream.asc")) as f:
+            self.assertIn("BEGIN PGP MESSAGE", f.read())
+
+    def test_key_required(self):
+        with self.assertRaises(ValueError):
+            self.service.encrypt_file(self.data_path, self.path("backup.gpg"), "not a key")
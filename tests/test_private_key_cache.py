@@ -0,0 +1,75 @@
+import unittest
+from unittest import mock
+from cryptography.hazmat.primitives import serialization
+from src.services import private_key_cache
+from src.services.csr_service import CSRService
+from src.services.ec_service import ECService
+from src.services.private_key_cache import PrivateKeyCache
+
+class TestPrivateKeyCache(unittest.TestCase):
+    def setUp(self):
+        _, self.private_key_pem = ECService.generate_keypair("P-256", password="secret")
+        self.cache = PrivateKeyCache(max_entries=2, ttl=60)
+
+    def count_loads(self):
+        return mock.patch.object(
+            private_key_cache.serialization,
+            "load_pem_private_key",
+            wraps=serialization.load_pem_private_key
+        )
+
+    def test_repeat_loads_skip_the_kdf(self):
+        with self.count_loads() as load:
+            first = self.cache.load(self.private_key_pem, "secret")
+            second = self.cache.load(self.private_key_pem, "secret")
+        self.assertIs(first, second)
+        self.assertEqual(1, load.call_count)
+
+    def test_wrong_password_is_not_served_from_cache(self):
+        self.cache.load(self.private_key_pem, "secret")
+        with self.assertRaises(ValueError):
+            self.cache.load(self.private_key_pem, "wrong")
+        with self.assertRaises(TypeError):
+            self.cache.load(self.private_key_pem)
+
+    def test_ttl_and_size_limit(self):
+        with mock.patch.object(private_key_cache.time, "monotonic", return_value=1000.0) as clock, \
+                self.count_loads() as load:
+            self.cache.load(self.private_key_pem, "secret")
+            clock.return_value = 1059.0
+            self.cache.load(self.private_key_pem, "secret")
+            self.assertEqual(1, load.call_count)
+            clock.return_value = 1061.0
+            self.assertEqual(0, len(self.cache))
+            self.cache.load(self.private_key_pem, "secret")
+            self.assertEqual(2, load.call_count)
+
+        keys = [ECService.generate_keypair("P-256")[1] for _ in range(3)]
+        for key in keys:
+            self.cache.load(key)
+        self.assertEqual(2, len(self.cache))
+        with self.count_loads() as load:
+            self.cache.load(keys[2])
+            self.cache.load(keys[0])
+        self.assertEqual(1, load.call_count)
+
+    def test_purge(self):
+        self.cache.load(self.private_key_pem, "secret")
+        self.cache.purge()
+        self.assertEqual(0, len(self.cache))
+
+    def test_csr_service_uses_cache(self):
+        with mock.patch.object(CSRService, "key_cache", self.cache), self.count_loads() as load:
+            for name in ("a.example.com", "b.example.com", "c.example.com"):
+                csr = CSRService.generate_csr(self.private_key_pem, name, password="secret")
+                self.assertIn("BEGIN CERTIFICATE REQUEST", csr)
+        self.assertEqual(1, load.call_count)
+
+    def test_invalid_settings(self):
+        with self.assertRaises(ValueError):
+            PrivateKeyCache(max_entries=0)
+        with self.assertRaises(ValueError):
+            PrivateKeyCache(ttl=0)
+
+if __name__ == '__main__':
+    unittest.main()
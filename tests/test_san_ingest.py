@@ -0,0 +1,102 @@
+import ipaddress
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+from cryptography import x509
+from src.services import san_ingest
+from src.services.csr_service import CSRService
+from src.services.ec_service import ECService
+from src.services.san_ingest import ingest_sans, normalize_host, read_san_file
+
+class TestSANIngest(unittest.TestCase):
+    def test_classify_and_normalize(self):
+        sans = ingest_sans(
+            [
+                "WWW.Example.com.",
+                "*.Example.COM",
+                "10.0.0.1",
+                "2001:DB8::1",
+                "Admin@Example.COM",
+                "HTTPS://Example.com:8443/Path",
+                "bücher.example",
+            ],
+            common_name="example.com"
+        )
+        self.assertEqual(
+            [
+                x509.DNSName("example.com"),
+                x509.DNSName("www.example.com"),
+                x509.DNSName("*.example.com"),
+                x509.IPAddress(ipaddress.ip_address("10.0.0.1")),
+                x509.IPAddress(ipaddress.ip_address("2001:db8::1")),
+                x509.RFC822Name("Admin@example.com"),
+                x509.UniformResourceIdentifier("https://example.com:8443/Path"),
+                x509.DNSName("xn--bcher-kva.example"),
+            ],
+            sans
+        )
+
+    def test_idna_deviation_characters(self):
+        # IDNA 2003 would map these onto different registered names (strasse.de)
+        if san_ingest.idna is not None:
+            self.assertEqual("xn--strae-oqa.de", normalize_host("Straße.de"))
+            # The final sigma survives the round trip instead of becoming σασ
+            self.assertEqual("σας.gr", san_ingest.idna.decode(normalize_host("σας.gr")))
+        with mock.patch.object(san_ingest, "idna", None):
+            self.assertIsNone(normalize_host("straße.de"))
+            with self.assertRaises(ValueError):
+                ingest_sans(["straße.de"])
+            self.assertEqual("xn--bcher-kva.example", normalize_host("bücher.example"))
+
+    def test_deduplicates(self):
+        sans = ingest_sans(
+            ["Example.com", "example.com.", "10.0.0.1", "10.0.0.1", "::1", "0:0::1", "", "  "],
+            common_name="example.com"
+        )
+        self.assertEqual(3, len(sans))
+        # IP addresses and host names never collide
+        self.assertEqual(2, len(ingest_sans(["1.2.3.4"], common_name="4.3.2.1.in-addr.arpa")))
+
+    def test_invalid_entries(self):
+        for name in ["bad host", "host:8080", "-leading.example.com", "a@b@", "1.2.3.4:", "ftp://", "256.1.1.1:"]:
+            with self.subTest(name=name):
+                with self.assertRaises(ValueError):
+                    ingest_sans([name])
+        # A CN that is not a host name stays out of the SANs instead of failing
+        self.assertEqual([x509.DNSName("example.com")], ingest_sans(["example.com"], common_name="My Server"))
+        self.assertIsNone(normalize_host("x" * 64 + ".example.com"))
+
+    def test_limits(self):
+        names = [f"host{i}.example.com" for i in range(100)]
+        self.assertEqual(100, len(ingest_sans(names + names, max_count=100)))
+        with self.assertRaises(ValueError):
+            ingest_sans(names, common_name="example.com", max_count=100)
+        with self.assertRaises(ValueError):
+            ingest_sans(names, max_bytes=1000)
+
+        private_key = ECService.generate_key("P-256").private_key
+        with mock.patch.object(CSRService, "max_sans", 10):
+            with self.assertRaises(ValueError):
+                CSRService.generate_csr_for_key(private_key, "example.com", subject_alternative_names=names)
+
+    def test_read_san_file(self):
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir, True)
+        path = os.path.join(temp_dir, "sans.txt")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("# tenants\napi.example.com, www.example.com\n\n10.0.0.1 10.0.0.2  # lab\nBücher.example\n")
+        names = list(read_san_file(path))
+        self.assertEqual(["api.example.com", "www.example.com", "10.0.0.1", "10.0.0.2", "Bücher.example"], names)
+
+        private_key = ECService.generate_key("P-256").private_key
+        csr = x509.load_pem_x509_csr(
+            CSRService.generate_csr_for_key(private_key, "api.example.com", subject_alternative_names=names).encode()
+        )
+        sans = csr.extensions.get_extension_for_class(x509.SubjectAlternativeName).value
+        self.assertEqual(["api.example.com", "www.example.com", "xn--bcher-kva.example"], sans.get_values_for_type(x509.DNSName))
+        self.assertEqual(2, len(sans.get_values_for_type(x509.IPAddress)))
+
+if __name__ == '__main__':
+    unittest.main()
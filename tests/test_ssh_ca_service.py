@@ -0,0 +1,64 @@
+import unittest
+from src.services.ssh_ca_service import SSHCAService
+from src.services.ssh_service import SSHService
+from cryptography.hazmat.primitives import serialization
+
+class TestSSHCAService(unittest.TestCase):
+    def setUp(self):
+        self.ca_public_key, ca_private_key = SSHCAService.generate_ca_key(password="capassword")
+        self.ca = SSHCAService(ca_private_key, password="capassword")
+
+    def test_sign_user_certificate(self):
+        public_key, _ = SSHService.generate_keypair(key_type="ed25519", comment="alice@example.com")
+
+        cert_line = self.ca.sign(
+            public_key,
+            principals=["alice"],
+            key_id="alice@example.com",
+            valid_after=1_700_000_000,
+            valid_before=1_700_086_400,
+            critical_options={"source-address": "10.0.0.0/8"}
+        )
+        self.assertTrue(cert_line.startswith("ssh-ed25519-cert-v01@openssh.com "))
+
+        cert = serialization.load_ssh_public_identity(cert_line.encode())
+        cert.verify_cert_signature()
+        self.assertEqual(cert.type, serialization.SSHCertificateType.USER)
+        self.assertEqual(cert.valid_principals, [b"alice"])
+        self.assertEqual(cert.valid_before - cert.valid_after, 86400)
+        self.assertEqual(cert.critical_options, {b"source-address": b"10.0.0.0/8"})
+        self.assertIn(b"permit-pty", cert.extensions)
+        self.assertEqual(
+            cert.signature_key().public_bytes(
+                serialization.Encoding.OpenSSH, serialization.PublicFormat.OpenSSH
+            ).decode(),
+            self.ca.ca_public_key
+        )
+
+    def test_sign_many_host_certificates(self):
+        requests = []
+        for host in ["web1.example.com", "web2.example.com"]:
+            public_key, _ = SSHService.generate_keypair(key_type="rsa", key_size=2048)
+            requests.append({"public_key": public_key, "principals": [host], "cert_type": "host"})
+
+        certs = list(self.ca.sign_many(requests))
+        self.assertEqual(len(certs), 2)
+        for cert_line, request in zip(certs, requests):
+            cert = serialization.load_ssh_public_identity(cert_line.encode())
+            cert.verify_cert_signature()
+            self.assertEqual(cert.type, serialization.SSHCertificateType.HOST)
+            self.assertEqual(cert.valid_principals, [request["principals"][0].encode()])
+            self.assertEqual(cert.extensions, {})
+
+        self.assertTrue(self.ca.known_hosts_line("*.example.com").startswith("@cert-authority *.example.com ssh-ed25519 "))
+
+    def test_invalid_requests(self):
+        public_key, _ = SSHService.generate_keypair(key_type="ed25519")
+        with self.assertRaises(ValueError):
+            self.ca.sign(public_key, principals=[])
+        with self.assertRaises(ValueError):
+            self.ca.sign(public_key, principals=["alice"], valid_after=200, valid_before=100)
+        with self.assertRaises(ValueError):
+            self.ca.sign("ssh-ed25519 invalid", principals=["alice"])
+        with self.assertRaises(ValueError):
+            SSHCAService("invalid-key")
@@ -0,0 +1,79 @@
+import os
+import random
+import tempfile
+import unittest
+from collections import Counter
+from unittest import mock
+from src.services import unique_codes
+from src.services.password_template import compile_template
+from src.services.passphrase_service import PasswordService
+from src.services.unique_codes import PackedCodeSet, iter_unique_codes
+
+class TestPackedCodeSet(unittest.TestCase):
+    def test_add_and_contains(self):
+        values = random.sample(range(0, 10 ** 12, 2), 5000)
+        codes = PackedCodeSet(10 ** 12, len(values))
+        for value in values:
+            self.assertTrue(codes.add(value))
+        for value in values[:100]:
+            self.assertFalse(codes.add(value))
+            self.assertIn(value, codes)
+        self.assertNotIn(values[0] + 1, codes)
+        self.assertEqual(len(values), len(codes))
+
+    def test_memory_per_code(self):
+        codes = PackedCodeSet(26 ** 3 * 10 ** 6, 50000)
+        for value in random.sample(range(26 ** 3 * 10 ** 6), 50000):
+            codes.add(value)
+        self.assertLessEqual(codes.nbytes / len(codes), 4)
+        # Spaces too large for 32-bit offsets fall back to 8 bytes per code
+        wide = PackedCodeSet(1 << 64, 10)
+        wide.add((1 << 64) - 1)
+        self.assertEqual(8, wide.nbytes)
+        with self.assertRaises(ValueError):
+            PackedCodeSet(1 << 80, 10)
+
+class TestUniqueCodes(unittest.TestCase):
+    def test_codes_are_unique_and_match_template(self):
+        codes = list(iter_unique_codes(compile_template("[A-Z]{2}-9{2}"), 5000))
+        self.assertEqual(5000, len(set(codes)))
+        for code in codes:
+            self.assertRegex(code, r"^[A-Z]{2}-[0-9]{2}$")
+
+    def test_whole_space_can_be_drawn(self):
+        codes = list(iter_unique_codes(compile_template("[a-c]9"), 30, batch_size=7))
+        self.assertEqual({f"{c}{d}" for c in "abc" for d in range(10)}, set(codes))
+        with self.assertRaises(ValueError):
+            list(iter_unique_codes(compile_template("[a-c]9"), 31))
+
+    def test_uniform(self):
+        # Small segments so codes span several precomputed tables
+        with mock.patch.object(unique_codes, "SEGMENT_SPACE", 10):
+            codes = list(iter_unique_codes(compile_template("9-9-9"), 300))
+        first = Counter(code[0] for code in codes)
+        self.assertEqual(10, len(first))
+        for count in first.values():
+            self.assertTrue(10 < count < 50)
+
+    def test_large_space_uses_wide_draws(self):
+        codes = list(iter_unique_codes(compile_template("*{40}"), 100))
+        self.assertEqual(100, len(set(codes)))
+        self.assertTrue(all(len(code) == 40 for code in codes))
+
+    def test_reject(self):
+        codes = list(iter_unique_codes(compile_template("9"), 5, reject=lambda batch: [c in "02468" for c in batch]))
+        self.assertEqual(set("13579"), set(codes))
+        with self.assertRaises(ValueError):
+            list(iter_unique_codes(compile_template("9"), 6, reject=lambda batch: [c in "02468" for c in batch]))
+
+    def test_write_unique_from_template(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "codes.txt")
+            self.assertEqual(2000, PasswordService().write_unique_from_template(2000, "X{4}-X{4}", path))
+            with open(path) as f:
+                codes = f.read().splitlines()
+        self.assertEqual(2000, len(set(codes)))
+        self.assertEqual([], list(PasswordService().generate_unique_from_template(0, "X")))
+
+if __name__ == '__main__':
+    unittest.main()